@@ -0,0 +1,76 @@
+"""Versioned model artifacts.
+
+``train.py`` writes each trained model as ``gdm_model-<version>.pkl`` next to
+a ``gdm_model-<version>.json`` manifest (data, chosen hyperparameters,
+cross-validation metrics). The version is the first 12 hex digits of the
+pickle's sha256, the same id /api/health reports for any model file.
+
+MODEL_PATH may point at either file; loading through the manifest checks
+that the pickle is the one it describes.
+"""
+import hashlib
+import json
+import os
+from typing import Optional, Tuple
+
+import joblib
+
+ARTIFACT_PREFIX = "gdm_model"
+
+
+class ArtifactMismatch(ValueError):
+    """The model file is not the one its manifest was written for"""
+
+
+def file_sha256(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def version_of(sha256: str) -> str:
+    return sha256[:12]
+
+
+def write_artifact(model, manifest: dict, output_dir: str) -> Tuple[str, str]:
+    """Save model and manifest under their version; returns (model_path, manifest_path)"""
+    os.makedirs(output_dir, exist_ok=True)
+    staging = os.path.join(output_dir, f".{ARTIFACT_PREFIX}-{os.getpid()}.pkl")
+    joblib.dump(model, staging)
+    sha256 = file_sha256(staging)
+    version = version_of(sha256)
+    model_path = os.path.join(output_dir, f"{ARTIFACT_PREFIX}-{version}.pkl")
+    os.replace(staging, model_path)
+
+    manifest = {"version": version, "model_file": os.path.basename(model_path), "sha256": sha256, **manifest}
+    manifest_path = os.path.join(output_dir, f"{ARTIFACT_PREFIX}-{version}.json")
+    with open(manifest_path, "w") as f:
+        json.dump(manifest, f, indent=2, default=str)
+    return model_path, manifest_path
+
+
+def resolve_model(path: str) -> Tuple[str, Optional[dict]]:
+    """(model file, manifest or None) for a .pkl or a manifest .json path.
+
+    A .pkl with a manifest of the same name beside it gets that manifest.
+    """
+    if path.endswith(".json"):
+        manifest_path = path
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        return os.path.join(os.path.dirname(manifest_path), manifest["model_file"]), manifest
+    manifest_path = os.path.splitext(path)[0] + ".json"
+    if os.path.exists(manifest_path):
+        with open(manifest_path) as f:
+            return path, json.load(f)
+    return path, None
+
+
+def verify(model_path: str, manifest: Optional[dict]) -> str:
+    """Version of model_path, checked against its manifest when there is one"""
+    sha256 = file_sha256(model_path)
+    if manifest is not None and manifest.get("sha256") != sha256:
+        raise ArtifactMismatch(f"{model_path} does not match its manifest (version {manifest.get('version')})")
+    return version_of(sha256)
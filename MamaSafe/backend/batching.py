@@ -0,0 +1,124 @@
+"""Micro-batching scheduler for /api/predict.
+
+Concurrent prediction requests are collected for a short window and scored
+together with a single predict_proba call, so the fixed per-call cost of the
+model is paid once per batch instead of once per request.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Upper bounds of the batch-size histogram buckets ("+Inf" catches the rest)
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64, 128, 256)
+
+
+class BatcherOverloaded(Exception):
+    """Raised when the pending queue is full and a request cannot be accepted"""
+
+
+class MicroBatcher:
+    def __init__(
+        self,
+        score_fn: Callable[[np.ndarray], np.ndarray],
+        window_ms: float = 3.0,
+        max_batch_size: int = 32,
+        max_queue_depth: int = 1000,
+    ):
+        self.score_fn = score_fn
+        self.window = window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self.max_queue_depth = max_queue_depth
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+        self._histogram: Dict[str, int] = {str(b): 0 for b in BATCH_SIZE_BUCKETS}
+        self._histogram["+Inf"] = 0
+        self.batches = 0
+        self.rows = 0
+        self.rejected = 0
+        self.errors = 0
+
+    def _ensure_started(self):
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done() or self._loop is not loop:
+            self._loop = loop
+            self._queue = asyncio.Queue(maxsize=self.max_queue_depth)
+            self._worker = loop.create_task(self._run())
+
+    async def submit(self, row: np.ndarray) -> np.ndarray:
+        """Queue one feature row and wait for its predict_proba output row"""
+        self._ensure_started()
+        future = self._loop.create_future()
+        try:
+            self._queue.put_nowait((row, future))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            raise BatcherOverloaded(f"Prediction queue is full ({self.max_queue_depth} pending)")
+        return await future
+
+    async def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+
+    async def _collect(self) -> List[Tuple[np.ndarray, asyncio.Future]]:
+        batch = [await self._queue.get()]
+        deadline = time.monotonic() + self.window
+        while len(batch) < self.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+            except asyncio.TimeoutError:
+                break
+        return batch
+
+    async def _run(self):
+        while True:
+            batch = await self._collect()
+            self._record(len(batch))
+            features = np.vstack([row for row, _ in batch])
+            try:
+                # Keep the event loop free while the model runs
+                probabilities = await asyncio.to_thread(self.score_fn, features)
+            except Exception as e:
+                self.errors += 1
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for (_, future), proba in zip(batch, probabilities):
+                if not future.done():
+                    future.set_result(proba)
+
+    def _record(self, size: int):
+        self.batches += 1
+        self.rows += size
+        for bound in BATCH_SIZE_BUCKETS:
+            if size <= bound:
+                self._histogram[str(bound)] += 1
+                return
+        self._histogram["+Inf"] += 1
+
+    def stats(self) -> dict:
+        return {
+            "window_ms": self.window * 1000.0,
+            "max_batch_size": self.max_batch_size,
+            "max_queue_depth": self.max_queue_depth,
+            "queue_size": self._queue.qsize() if self._queue is not None else 0,
+            "batches": self.batches,
+            "rows": self.rows,
+            "mean_batch_size": round(self.rows / self.batches, 2) if self.batches else 0.0,
+            "rejected": self.rejected,
+            "errors": self.errors,
+            "batch_size_histogram": dict(self._histogram),
+        }
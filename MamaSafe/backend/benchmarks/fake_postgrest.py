@@ -0,0 +1,374 @@
+"""Offline stand-in for the Supabase REST API (PostgREST), for load runs.
+
+Implements the subset of PostgREST that main.py and supabase-py use, over
+in-memory tables seeded with deterministic data:
+
+* GET / HEAD with ``select`` (columns and one level of embedded resources),
+  ``eq/neq/gt/gte/lt/lte/in/is`` filters (optionally ``not.``), ``or=(...)``
+  trees, multi-column ``order``, ``limit``/``offset`` (also on embeds),
+  ``Prefer: count=exact`` and ``Accept: application/vnd.pgrst.object+json``
+* POST inserts and upserts (``Prefer: resolution=merge-duplicates``)
+* PATCH updates and DELETE with the same filters
+
+Every request sleeps for ``--latency-ms`` (plus optional jitter) before it is
+answered, to model the round trip to a hosted project.
+
+    python benchmarks/fake_postgrest.py --port 54321 --latency-ms 40 --patients 500
+
+Point the API at it with SUPABASE_URL=http://127.0.0.1:54321.
+"""
+import argparse
+import asyncio
+import random
+import re
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns", "or", "and"}
+
+# Equality filters on these columns are answered from a hash index so the
+# stand-in itself stays cheap next to the API under test
+INDEXED_COLUMNS = ("id", "patient_id", "chw_id")
+
+# (table, column) -> referenced table, for embedded resources
+FOREIGN_KEYS = {
+    ("patients", "chw_id"): "chw",
+    ("profiles", "chw_id"): "chw",
+    ("predictions", "patient_id"): "patients",
+    ("health_data", "patient_id"): "patients",
+    ("notifications", "patient_id"): "patients",
+    ("notifications", "chw_id"): "chw",
+}
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def seed(patients: int = 200, chws: int = 10, history: int = 20, rng_seed: int = 7) -> Dict[str, List[dict]]:
+    """Deterministic tables shaped like the MamaSafe schema"""
+    rng = random.Random(rng_seed)
+    start = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    tables: Dict[str, List[dict]] = {name: [] for name in ("chw", "patients", "profiles", "health_data", "predictions", "notifications")}
+
+    for c in range(chws):
+        tables["chw"].append({
+            "id": f"chw-{c:03d}", "full_name": f"CHW {c}", "phone": f"+25078800{c:04d}",
+            "email": f"chw{c}@example.org", "region": f"Region {c % 5}",
+            "created_at": (start + timedelta(minutes=c)).isoformat(),
+        })
+
+    for p in range(patients):
+        patient_id = f"patient-{p:05d}"
+        chw_id = f"chw-{p % chws:03d}" if chws else None
+        created = start + timedelta(hours=p)
+        tables["patients"].append({
+            "id": patient_id, "full_name": f"Patient {p}", "age": rng.randint(18, 45),
+            "height": round(rng.uniform(150, 180), 1), "weight": round(rng.uniform(50, 95), 1),
+            "phone": f"+25078{p:07d}", "chw_id": chw_id, "created_at": created.isoformat(),
+        })
+        tables["profiles"].append({
+            "id": patient_id, "full_name": f"Patient {p}", "role": "patient",
+            "region": f"Region {p % 5}", "chw_id": chw_id, "created_at": created.isoformat(),
+        })
+        for h in range(history):
+            stamp = (created + timedelta(days=h)).isoformat()
+            glucose = round(rng.uniform(70, 200), 1)
+            tables["health_data"].append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))), "patient_id": patient_id,
+                "blood_pressure_systolic": rng.randint(95, 160), "blood_pressure_diastolic": rng.randint(60, 100),
+                "blood_glucose": glucose, "created_at": stamp,
+            })
+            high = glucose > 150
+            tables["predictions"].append({
+                "id": str(uuid.UUID(int=rng.getrandbits(128))), "patient_id": patient_id,
+                "risk_level": "High" if high else "Low", "risk_percentage": round(rng.uniform(50, 95) if high else rng.uniform(5, 49), 2),
+                "confidence": round(rng.uniform(50, 95), 2), "factors": "", "recommendations": "", "created_at": stamp,
+            })
+            if high and chw_id:
+                tables["notifications"].append({
+                    "id": str(uuid.UUID(int=rng.getrandbits(128))), "chw_id": chw_id, "patient_id": patient_id,
+                    "title": "🚨 High Risk GDM Alert", "message": "Seeded alert",
+                    "notification_type": "high_risk_alert", "is_read": rng.random() < 0.5, "created_at": stamp,
+                })
+    return tables
+
+
+# ---------------------------------------------------------------- parsing
+
+def _split_top_level(text: str) -> List[str]:
+    """Split on commas that are not inside parentheses or double quotes"""
+    parts, depth, quoted, current = [], 0, False, []
+    for ch in text:
+        if ch == '"':
+            quoted = not quoted
+        elif not quoted and ch == "(":
+            depth += 1
+        elif not quoted and ch == ")":
+            depth -= 1
+        if ch == "," and depth == 0 and not quoted:
+            parts.append("".join(current).strip())
+            current = []
+        else:
+            current.append(ch)
+    if current:
+        parts.append("".join(current).strip())
+    return [p for p in parts if p]
+
+
+def _unquote(value: str) -> str:
+    return value[1:-1] if len(value) >= 2 and value[0] == value[-1] == '"' else value
+
+
+def _coerce(value: str, sample):
+    if isinstance(sample, bool):
+        return value.lower() == "true"
+    if isinstance(sample, (int, float)) and not isinstance(sample, bool):
+        try:
+            return float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def _match(row: dict, column: str, expression: str) -> bool:
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[4:]
+    op, _, arg = expression.partition(".")
+    value = row.get(column)
+    if op == "is":
+        result = value is None if arg == "null" else value is _coerce(arg, True)
+    elif op == "in":
+        options = [_unquote(v) for v in _split_top_level(arg.strip("()"))]
+        result = value is not None and any(_coerce(o, value) == value for o in options)
+    else:
+        arg = _unquote(arg)
+        if value is None:
+            result = False
+        else:
+            target = _coerce(arg, value)
+            result = {
+                "eq": lambda: value == target, "neq": lambda: value != target,
+                "gt": lambda: value > target, "gte": lambda: value >= target,
+                "lt": lambda: value < target, "lte": lambda: value <= target,
+            }.get(op, lambda: False)()
+    return not result if negate else result
+
+
+def _match_logic(row: dict, tree: str, combine=any) -> bool:
+    results = []
+    for item in _split_top_level(tree.strip()[1:-1]):
+        if item.startswith("and("):
+            results.append(_match_logic(row, item[3:], all))
+        elif item.startswith("or("):
+            results.append(_match_logic(row, item[2:], any))
+        else:
+            column, _, expression = item.partition(".")
+            results.append(_match(row, column, expression))
+    return combine(results)
+
+
+def _parse_select(select: str):
+    """Return (columns or None for '*', [(alias, target, columns)])"""
+    columns, embeds, star = [], [], False
+    for item in _split_top_level(select or "*"):
+        m = re.match(r"^(?:(\w+):)?([\w!]+)\((.*)\)$", item)
+        if m:
+            alias, target, inner = m.groups()
+            target = target.split("!")[0]
+            embeds.append((alias or target, target, _split_top_level(inner)))
+        elif item == "*":
+            star = True
+        else:
+            columns.append(item)
+    return (None if star else columns), embeds
+
+
+def _order(rows: List[dict], spec: Optional[str]) -> List[dict]:
+    if not spec:
+        return rows
+    for part in reversed(spec.split(",")):
+        column, _, direction = part.partition(".")
+        desc = direction.startswith("desc")
+        present = [r for r in rows if r.get(column) is not None]
+        missing = [r for r in rows if r.get(column) is None]
+        rows = sorted(present, key=lambda r: r[column], reverse=desc) + missing
+    return rows
+
+
+def _project(row: dict, columns: Optional[List[str]]) -> dict:
+    if columns is None:
+        return dict(row)
+    return {c.split(":")[-1]: row.get(c.split(":")[-1]) for c in columns if c != "count"}
+
+
+# ---------------------------------------------------------------- app
+
+def create_app(tables: Dict[str, List[dict]], latency_ms: float = 0.0, jitter_ms: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Fake PostgREST")
+    app.state.tables = tables
+    app.state.requests = 0
+    app.state.indexes = {}
+
+    async def delay():
+        app.state.requests += 1
+        wait = latency_ms + (random.uniform(0, jitter_ms) if jitter_ms else 0.0)
+        if wait > 0:
+            await asyncio.sleep(wait / 1000.0)
+
+    def index(table: str, column: str) -> Dict[str, List[dict]]:
+        key = (table, column)
+        if key not in app.state.indexes:
+            built: Dict[str, List[dict]] = {}
+            for row in app.state.tables.get(table, []):
+                built.setdefault(str(row.get(column)), []).append(row)
+            app.state.indexes[key] = built
+        return app.state.indexes[key]
+
+    def changed(table: str):
+        for key in [k for k in app.state.indexes if k[0] == table]:
+            del app.state.indexes[key]
+
+    def filtered(table: str, params) -> List[dict]:
+        rows = app.state.tables.setdefault(table, [])
+        filters = [(k, v) for k, v in params.multi_items() if k not in RESERVED_PARAMS and "." not in k]
+        for i, (key, value) in enumerate(filters):
+            if key in INDEXED_COLUMNS and value.startswith("eq."):
+                rows = index(table, key).get(_unquote(value[3:]), [])
+                del filters[i]
+                break
+        for key, value in filters:
+            rows = [r for r in rows if _match(r, key, value)]
+        if "or" in params:
+            rows = [r for r in rows if _match_logic(r, params["or"], any)]
+        return rows
+
+    def embed(table: str, row: dict, embeds, params) -> dict:
+        for alias, target, columns in embeds:
+            columns = None if "*" in columns else columns
+            # Many-to-one, named by the FK column (chw:chw_id(...)) or the parent table
+            fk_column = target if (table, target) in FOREIGN_KEYS else next(
+                (col for (tbl, col), ref in FOREIGN_KEYS.items() if tbl == table and ref == target), None)
+            if fk_column is not None:
+                parent_table = FOREIGN_KEYS[(table, fk_column)]
+                parent = next(iter(index(parent_table, "id").get(str(row.get(fk_column)), [])), None)
+                row[alias] = _project(parent, columns) if parent else None
+                continue
+            # One-to-many: children pointing at this row
+            child_fk = next((col for (tbl, col), ref in FOREIGN_KEYS.items() if tbl == target and ref == table), None)
+            children = index(target, child_fk).get(str(row.get("id")), []) if child_fk else []
+            children = _order(children, params.get(f"{target}.order"))
+            if f"{target}.limit" in params:
+                children = children[: int(params[f"{target}.limit"])]
+            row[alias] = [_project(c, columns) for c in children]
+        return row
+
+    def respond(request: Request, rows: List[dict], total: Optional[int] = None, status: int = 200) -> Response:
+        headers = {}
+        prefer = request.headers.get("prefer", "")
+        if "count=exact" in prefer:
+            count = total if total is not None else len(rows)
+            headers["Content-Range"] = f"0-{len(rows) - 1}/{count}" if rows else f"*/{count}"
+        if request.method == "HEAD":
+            return Response(status_code=status, headers=headers)
+        if "return=minimal" in prefer:
+            return Response(status_code=204 if status == 200 else status, headers=headers)
+        if request.headers.get("accept", "").startswith("application/vnd.pgrst.object+json"):
+            if len(rows) != 1:
+                return JSONResponse(status_code=406, content={
+                    "code": "PGRST116", "message": "JSON object requested, multiple (or no) rows returned",
+                    "details": f"The result contains {len(rows)} rows", "hint": None,
+                })
+            return JSONResponse(status_code=status, content=rows[0], headers=headers)
+        return JSONResponse(status_code=status, content=rows, headers=headers)
+
+    @app.api_route("/rest/v1/{table}", methods=["GET", "HEAD"])
+    async def read(table: str, request: Request):
+        await delay()
+        params = request.query_params
+        rows = _order(filtered(table, params), params.get("order"))
+        total = len(rows)
+        offset = int(params.get("offset", 0))
+        rows = rows[offset:]
+        if "limit" in params:
+            rows = rows[: int(params["limit"])]
+        select = params.get("select", "*")
+        if select.strip() == "count":
+            return respond(request, [{"count": total}], total)
+        columns, embeds = _parse_select(select)
+        out = [embed(table, _project(r, columns), embeds, params) for r in rows]
+        return respond(request, out, total)
+
+    @app.post("/rest/v1/{table}")
+    async def insert(table: str, request: Request):
+        await delay()
+        body = await request.json()
+        items = body if isinstance(body, list) else [body]
+        rows = app.state.tables.setdefault(table, [])
+        upsert = "resolution=merge-duplicates" in request.headers.get("prefer", "")
+        key = request.query_params.get("on_conflict") or "id"
+        by_key = {r.get(key): r for r in rows} if upsert else {}
+        written = []
+        for item in items:
+            existing = by_key.get(item.get(key)) if upsert and item.get(key) is not None else None
+            if existing is not None:
+                existing.update(item)
+                written.append(dict(existing))
+                continue
+            row = {"id": str(uuid.uuid4()), "created_at": _now().isoformat(), **item}
+            rows.append(row)
+            by_key[row.get(key)] = row
+            written.append(dict(row))
+        changed(table)
+        return respond(request, written, status=201)
+
+    @app.patch("/rest/v1/{table}")
+    async def update(table: str, request: Request):
+        await delay()
+        changes = await request.json()
+        rows = filtered(table, request.query_params)
+        for row in rows:
+            row.update(changes)
+        changed(table)
+        return respond(request, [dict(r) for r in rows])
+
+    @app.delete("/rest/v1/{table}")
+    async def delete(table: str, request: Request):
+        await delay()
+        doomed = filtered(table, request.query_params)
+        ids = {id(r) for r in doomed}
+        app.state.tables[table] = [r for r in app.state.tables.get(table, []) if id(r) not in ids]
+        changed(table)
+        return respond(request, [dict(r) for r in doomed])
+
+    @app.get("/_stats")
+    async def stats():
+        return {"requests": app.state.requests, "tables": {k: len(v) for k, v in app.state.tables.items()}}
+
+    return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=54321)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--chws", type=int, default=10)
+    parser.add_argument("--history", type=int, default=20, help="health_data/prediction rows per patient")
+    args = parser.parse_args()
+
+    app = create_app(seed(args.patients, args.chws, args.history), args.latency_ms, args.jitter_ms)
+    uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
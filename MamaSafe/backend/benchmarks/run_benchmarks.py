@@ -0,0 +1,323 @@
+"""Endpoint latency/throughput benchmark against an offline Supabase stand-in.
+
+Starts ``benchmarks/fake_postgrest.py`` (seeded data, injected per-query
+latency) and the API pointed at it, waits for /api/health/ready, then drives
+each route for a fixed number of requests at a fixed concurrency and reports
+requests/s and p50/p95/p99 latency per route. The SSE stream is excluded
+since it never completes.
+
+    python benchmarks/run_benchmarks.py --concurrency 32 --requests 500 --output before.json
+    python benchmarks/run_benchmarks.py --output after.json --compare before.json
+
+With --storage sqlite the API serves the same seeded rows from a local
+SQLite store (STORAGE_BACKEND=sqlite) instead, and no latency is injected.
+
+Results are written as JSON together with the git commit, so runs from
+different commits can be compared with --compare. Use --routes to run a
+subset (e.g. ``--routes predict,chw_patients``).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FAKE_SERVER = os.path.join(BACKEND_DIR, "benchmarks", "fake_postgrest.py")
+
+# Each scenario builds (method, path, params, json body) from a seeded RNG
+Scenario = Callable[[random.Random, dict], Tuple[str, str, Optional[dict], Optional[dict]]]
+
+
+def _patient(rng: random.Random, seed_size: dict) -> str:
+    return f"patient-{rng.randrange(seed_size['patients']):05d}"
+
+
+def _chw(rng: random.Random, seed_size: dict) -> str:
+    return f"chw-{rng.randrange(seed_size['chws']):03d}"
+
+
+def _reading(rng: random.Random, seed_size: dict) -> dict:
+    return {
+        "age": rng.randint(18, 45),
+        "blood_pressure_systolic": rng.randint(95, 160),
+        "blood_pressure_diastolic": rng.randint(60, 100),
+        "blood_glucose": rng.randint(70, 200),
+        "patient_id": _patient(rng, seed_size),
+    }
+
+
+def _visit(rng: random.Random, seed_size: dict) -> dict:
+    return {
+        "age": rng.randint(18, 45),
+        "blood_pressure_systolic": [rng.randint(95, 160) for _ in range(4)],
+        "blood_pressure_diastolic": [rng.randint(60, 100) for _ in range(4)],
+        "blood_glucose": [rng.randint(70, 200) for _ in range(4)],
+        "patient_id": _patient(rng, seed_size),
+    }
+
+
+def _notification(rng: random.Random, seed_size: dict) -> str:
+    return rng.choice(seed_size["notification_ids"])
+
+
+SCENARIOS: Dict[str, Scenario] = {
+    "health": lambda r, s: ("GET", "/api/health", None, None),
+    "predict": lambda r, s: ("POST", "/api/predict", None, _reading(r, s)),
+    "predict_batch": lambda r, s: ("POST", "/api/predict/batch", None, {"readings": [_reading(r, s) for _ in range(20)]}),
+    "predict_visits": lambda r, s: ("POST", "/api/predict/visits", None, {"visits": [_visit(r, s) for _ in range(20)]}),
+    "predictions": lambda r, s: ("GET", f"/api/predictions/{_patient(r, s)}", None, None),
+    "predictions_latest": lambda r, s: ("GET", f"/api/predictions/latest/{_patient(r, s)}", None, None),
+    "patient": lambda r, s: ("GET", f"/api/patients/{_patient(r, s)}", None, None),
+    "patient_update": lambda r, s: ("PUT", f"/api/patients/{_patient(r, s)}", None, {"phone": f"+25078{r.randrange(10**7):07d}"}),
+    "health_data": lambda r, s: ("GET", f"/api/patients/{_patient(r, s)}/health-data", {"limit": 50}, None),
+    "health_data_default": lambda r, s: ("GET", f"/api/patients/{_patient(r, s)}/health-data", None, None),
+    "trends": lambda r, s: ("GET", f"/api/patients/{_patient(r, s)}/trends", None, None),
+    "chw": lambda r, s: ("GET", f"/api/chw/{_chw(r, s)}", None, None),
+    "chw_patients": lambda r, s: ("GET", f"/api/chw/patients/{_chw(r, s)}", {"limit": 50}, None),
+    "chw_patients_default": lambda r, s: ("GET", f"/api/chw/patients/{_chw(r, s)}", None, None),
+    "chw_triage": lambda r, s: ("GET", f"/api/chw/{_chw(r, s)}/triage", {"limit": 50}, None),
+    "chw_triage_default": lambda r, s: ("GET", f"/api/chw/{_chw(r, s)}/triage", None, None),
+    "assign_patient": lambda r, s: ("POST", f"/api/chw/{_chw(r, s)}/assign-patient", {"patient_id": _patient(r, s)}, None),
+    "assign_patients_bulk": lambda r, s: ("POST", f"/api/chw/{_chw(r, s)}/assign-patients", None, {
+        "patient_ids": sorted({_patient(r, s) for _ in range(100)}),
+    }),
+    "notifications": lambda r, s: ("GET", f"/api/notifications/{_chw(r, s)}", {"limit": 50}, None),
+    "notifications_default": lambda r, s: ("GET", f"/api/notifications/{_chw(r, s)}", None, None),
+    "notification_mark_read": lambda r, s: ("PUT", f"/api/notifications/{_notification(r, s)}/mark-read", None, None),
+    "notifications_summary": lambda r, s: ("GET", f"/api/notifications/{_chw(r, s)}/summary", None, None),
+    "notification_send": lambda r, s: ("POST", "/api/notifications/send", None, {
+        "chw_id": _chw(r, s), "patient_id": _patient(r, s), "title": "Benchmark", "message": "Benchmark alert",
+    }),
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BACKEND_DIR,
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def _wait_until(url: str, timeout: float, expect_status: int = 200):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=1.0).status_code == expect_status:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.05)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(pct / 100.0 * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+
+async def run_scenario(client: httpx.AsyncClient, name: str, scenario: Scenario, seed_size: dict,
+                       total: int, concurrency: int, warmup: int, rng_seed: int) -> dict:
+    rng = random.Random(rng_seed)
+    plans = [scenario(rng, seed_size) for _ in range(total + warmup)]
+    latencies: List[float] = []
+    statuses: Dict[str, int] = {}
+    errors = 0
+    cursor = 0
+
+    async def send(plan) -> Tuple[float, Optional[int]]:
+        method, path, params, body = plan
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, params=params, json=body)
+            return (time.perf_counter() - started) * 1000, response.status_code
+        except httpx.HTTPError:
+            return (time.perf_counter() - started) * 1000, None
+
+    for plan in plans[:warmup]:
+        await send(plan)
+
+    async def worker():
+        nonlocal cursor, errors
+        while cursor < len(plans) - warmup:
+            plan = plans[warmup + cursor]
+            cursor += 1
+            elapsed, status = await send(plan)
+            latencies.append(elapsed)
+            statuses[str(status)] = statuses.get(str(status), 0) + 1
+            if status is None or status >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": len(latencies),
+        "rps": round(len(latencies) / wall, 1) if wall else 0.0,
+        "p50_ms": round(_percentile(latencies, 50), 2),
+        "p95_ms": round(_percentile(latencies, 95), 2),
+        "p99_ms": round(_percentile(latencies, 99), 2),
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "errors": errors,
+        "status_codes": statuses,
+    }
+
+
+def compare(current: dict, baseline: dict) -> str:
+    lines = [f"{'route':<24}{'rps':>10}{'Δrps':>9}{'p50':>10}{'Δp50':>9}{'p99':>10}{'Δp99':>9}"]
+
+    def delta(new, old):
+        return f"{(new - old) / old * 100:+.0f}%" if old else "n/a"
+
+    for name, result in current["routes"].items():
+        old = baseline.get("routes", {}).get(name)
+        if old is None:
+            lines.append(f"{name:<24}{result['rps']:>10}{'new':>9}{result['p50_ms']:>10}{'':>9}{result['p99_ms']:>10}")
+            continue
+        lines.append(
+            f"{name:<24}{result['rps']:>10}{delta(result['rps'], old['rps']):>9}"
+            f"{result['p50_ms']:>10}{delta(result['p50_ms'], old['p50_ms']):>9}"
+            f"{result['p99_ms']:>10}{delta(result['p99_ms'], old['p99_ms']):>9}"
+        )
+    header = f"baseline {baseline.get('meta', {}).get('commit')} -> current {current['meta'].get('commit')}"
+    return header + "\n" + "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=300, help="measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--warmup", type=int, default=10, help="unmeasured requests per route")
+    parser.add_argument("--latency-ms", type=float, default=20.0, help="injected per-query database latency")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--chws", type=int, default=10)
+    parser.add_argument("--history", type=int, default=20)
+    parser.add_argument("--routes", help="comma-separated subset of: " + ",".join(SCENARIOS))
+    parser.add_argument("--storage", choices=("supabase", "sqlite"), default="supabase",
+                        help="backend the API runs against: the fake PostgREST server or a seeded SQLite file")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the servers to start")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON from an earlier run to compare against")
+    args = parser.parse_args()
+
+    names = args.routes.split(",") if args.routes else list(SCENARIOS)
+    unknown = [n for n in names if n not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(unknown)}")
+    # The fake server seeds the same rows from the same arguments, so the
+    # notification ids mark-read targets are known up front
+    from fake_postgrest import seed
+    tables = seed(args.patients, args.chws, args.history)
+    seed_size = {"patients": args.patients, "chws": args.chws,
+                 "notification_ids": [row["id"] for row in tables["notifications"]]}
+
+    fake_port, api_port = _free_port(), _free_port()
+    work_dir = tempfile.mkdtemp(prefix="mamasafe-bench-")
+    env = dict(os.environ)
+    env.update({
+        "SUPABASE_URL": f"http://127.0.0.1:{fake_port}",
+        "SUPABASE_KEY": env.get("SUPABASE_KEY", "benchmark-key"),
+        "SPOOL_PATH": os.path.join(work_dir, "spool.sqlite3"),
+    })
+    fake = None
+    if args.storage == "sqlite":
+        # Same seeded rows, served by the API from a local SQLite store
+        sys.path.insert(0, BACKEND_DIR)
+        from storage import SqliteStore
+        env.update({"STORAGE_BACKEND": "sqlite", "SQLITE_PATH": os.path.join(work_dir, "mamasafe.sqlite3")})
+        store = SqliteStore(env["SQLITE_PATH"])
+        for table, rows in tables.items():
+            if table != "profiles":
+                store.load(table, rows)
+        store.close()
+    else:
+        fake = subprocess.Popen(
+            [sys.executable, FAKE_SERVER, "--port", str(fake_port), "--latency-ms", str(args.latency_ms),
+             "--jitter-ms", str(args.jitter_ms), "--patients", str(args.patients), "--chws", str(args.chws),
+             "--history", str(args.history)],
+            cwd=BACKEND_DIR,
+        )
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(api_port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{api_port}"
+    try:
+        if fake is not None:
+            _wait_until(f"http://127.0.0.1:{fake_port}/_stats", args.timeout)
+        _wait_until(f"{base_url}/api/health/ready", args.timeout)
+
+        async def run_all():
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+                results = {}
+                for index, name in enumerate(names):
+                    results[name] = await run_scenario(
+                        client, name, SCENARIOS[name], seed_size,
+                        args.requests, args.concurrency, args.warmup, args.seed + index,
+                    )
+                    r = results[name]
+                    print(f"{name:<24}{r['rps']:>9} req/s  p50 {r['p50_ms']:>8} ms  p95 {r['p95_ms']:>8} ms  "
+                          f"p99 {r['p99_ms']:>8} ms  errors {r['errors']}")
+                return results
+
+        routes = asyncio.run(run_all())
+    finally:
+        for proc in (api, fake):
+            if proc is None:
+                continue
+            proc.terminate()
+            try:
+                proc.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                proc.kill()
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "storage": args.storage,
+            "latency_ms": args.latency_ms,
+            "jitter_ms": args.jitter_ms,
+            "seed_size": {**seed_size, "history": args.history},
+        },
+        "routes": routes,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    if args.compare:
+        with open(args.compare) as f:
+            print(compare(report, json.load(f)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,131 @@
+"""Cold-start benchmark for the API.
+
+Measures, in fresh processes:
+
+* import time of ``main`` (what uvicorn pays before it can bind the port),
+* time from launching uvicorn to the first accepted connection (/api/health),
+* time from launching uvicorn to the first successful POST /api/predict.
+
+By default the server runs in write-behind mode with a throwaway spool, so
+/api/predict succeeds without a reachable Supabase project. Pass --live-db to
+require a real database round trip instead.
+
+    python benchmarks/startup.py --runs 5 --output startup.json
+    python benchmarks/startup.py --max-import-ms 1500 --max-first-predict-ms 8000
+
+Exits with status 1 when a median exceeds its --max-* budget.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SAMPLE_INPUT = {
+    "age": 28,
+    "blood_pressure_systolic": 120,
+    "blood_pressure_diastolic": 80,
+    "blood_glucose": 95,
+    "patient_id": "benchmark-patient",
+}
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def measure_import(env: dict) -> float:
+    code = "import time; t = time.perf_counter(); import main; print((time.perf_counter() - t) * 1000)"
+    result = subprocess.run(
+        [sys.executable, "-c", code], cwd=BACKEND_DIR, env=env,
+        capture_output=True, text=True, check=True,
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def measure_server(env: dict, timeout: float) -> dict:
+    port = _free_port()
+    base_url = f"http://127.0.0.1:{port}"
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    timings = {"first_connection_ms": None, "first_predict_ms": None}
+    try:
+        with httpx.Client(base_url=base_url, timeout=timeout) as client:
+            while time.perf_counter() - started < timeout:
+                try:
+                    if timings["first_connection_ms"] is None:
+                        client.get("/api/health")
+                        timings["first_connection_ms"] = (time.perf_counter() - started) * 1000
+                    if client.post("/api/predict", json=SAMPLE_INPUT).status_code == 200:
+                        timings["first_predict_ms"] = (time.perf_counter() - started) * 1000
+                        break
+                except httpx.TransportError:
+                    pass
+                time.sleep(0.01)
+    finally:
+        server.terminate()
+        server.wait(timeout=10)
+    return timings
+
+
+def _median(values):
+    values = [v for v in values if v is not None]
+    return round(statistics.median(values), 1) if values else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the first prediction")
+    parser.add_argument("--live-db", action="store_true", help="don't use write-behind mode")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--max-import-ms", type=float)
+    parser.add_argument("--max-first-predict-ms", type=float)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        env = dict(os.environ)
+        if not args.live_db:
+            env.update(PREDICT_WRITE_BEHIND="true", SPOOL_PATH=os.path.join(tmp, "spool.sqlite3"))
+
+        runs = []
+        for i in range(args.runs):
+            run = {"import_ms": measure_import(env), **measure_server(env, args.timeout)}
+            runs.append(run)
+            print(f"run {i + 1}: " + ", ".join(f"{k}={v:.1f}" if v is not None else f"{k}=n/a" for k, v in run.items()))
+
+    report = {
+        "runs": runs,
+        "median": {key: _median([r[key] for r in runs]) for key in runs[0]},
+        "python": sys.version.split()[0],
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    print(json.dumps(report["median"], indent=2))
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    failed = False
+    for key, budget in (("import_ms", args.max_import_ms), ("first_predict_ms", args.max_first_predict_ms)):
+        value = report["median"][key]
+        if budget is not None and (value is None or value > budget):
+            print(f"❌ {key} = {value} exceeds budget of {budget} ms")
+            failed = True
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+"""Memory and throughput of multi-worker serving, per worker count.
+
+For each worker count, starts the API in each mode against a seeded SQLite
+store (STORAGE_BACKEND=sqlite, so the database is not the bottleneck),
+drives the routes and then reads every server process's memory from
+/proc/<pid>/smaps_rollup:
+
+* ``preload``: ``serve.py``, which loads the model before forking;
+* ``uvicorn``: ``uvicorn main:app --workers N``, one fresh interpreter per
+  worker.
+
+RSS counts shared pages in full for every process that maps them, so it
+overstates what N workers cost; PSS splits each shared page between its
+sharers and sums to the real total, and USS is what a process holds alone.
+The report gives per-worker RSS/PSS/USS, the total PSS of the deployment
+and requests/s with the speedup over one worker.
+
+    python benchmarks/workers.py --workers 1,2,4 --routes predict,predict_batch
+    MODEL_PATH=models/gdm_model-<version>.pkl python benchmarks/workers.py --output workers.json
+
+The load generator runs on the same machine, so leave it a core: speedups
+flatten once workers plus client exceed the CPUs. Linux only (/proc).
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import httpx
+
+from run_benchmarks import BACKEND_DIR, SCENARIOS, _free_port, _git_commit, _wait_until, run_scenario
+
+MODES = ("preload", "uvicorn")
+MEMORY_FIELDS = {"Rss": "rss_mb", "Pss": "pss_mb", "Private_Clean": "uss_mb", "Private_Dirty": "uss_mb"}
+
+
+def memory(pid: int) -> Dict[str, float]:
+    """RSS, PSS and USS of one process in MB"""
+    result = {"rss_mb": 0.0, "pss_mb": 0.0, "uss_mb": 0.0}
+    with open(f"/proc/{pid}/smaps_rollup") as f:
+        for line in f:
+            name, _, value = line.partition(":")
+            if name in MEMORY_FIELDS:
+                result[MEMORY_FIELDS[name]] += int(value.split()[0]) / 1024
+    return {key: round(value, 1) for key, value in result.items()}
+
+
+def children(pid: int) -> List[int]:
+    found = []
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                # ppid is the second field after the parenthesised command name
+                ppid = int(f.read().rsplit(")", 1)[1].split()[1])
+            with open(f"/proc/{entry}/cmdline", "rb") as f:
+                cmdline = f.read()
+        except (OSError, ValueError, IndexError):
+            continue
+        if ppid == pid and b"resource_tracker" not in cmdline:
+            found.append(int(entry))
+    return sorted(found)
+
+
+def command(mode: str, workers: int, port: int) -> List[str]:
+    if mode == "preload":
+        return [sys.executable, "serve.py", "--workers", str(workers), "--port", str(port), "--log-level", "warning"]
+    return [sys.executable, "-m", "uvicorn", "main:app", "--workers", str(workers), "--port", str(port),
+            "--log-level", "warning"]
+
+
+def seed_store(path: str, args):
+    sys.path.insert(0, BACKEND_DIR)
+    from fake_postgrest import seed
+    from storage import SqliteStore
+    store = SqliteStore(path)
+    for table, rows in seed(args.patients, args.chws, args.history).items():
+        if table != "profiles":
+            store.load(table, rows)
+    store.close()
+
+
+def measure(mode: str, workers: int, names: List[str], args, work_dir: str) -> dict:
+    port = _free_port()
+    env = dict(os.environ)
+    env.update({
+        "STORAGE_BACKEND": "sqlite",
+        "SQLITE_PATH": os.path.join(work_dir, f"{mode}-{workers}.sqlite3"),
+        "SPOOL_PATH": os.path.join(work_dir, f"{mode}-{workers}-spool.sqlite3"),
+        "LOG_LEVEL": "WARNING",
+    })
+    seed_store(env["SQLITE_PATH"], args)
+    seed_size = {"patients": args.patients, "chws": args.chws}
+    server = subprocess.Popen(command(mode, workers, port), cwd=BACKEND_DIR, env=env,
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_until(f"{base_url}/api/health/ready", args.timeout)
+        # Every worker answers readiness on its own; give the rest time to warm up
+        deadline = time.monotonic() + args.timeout
+        while len(children(server.pid)) < workers and workers > 1 and time.monotonic() < deadline:
+            time.sleep(0.1)
+        time.sleep(args.settle)
+
+        async def run_all():
+            limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+            async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=30.0) as client:
+                return {
+                    name: await run_scenario(client, name, SCENARIOS[name], seed_size,
+                                             args.requests, args.concurrency, args.warmup, args.seed + index)
+                    for index, name in enumerate(names)
+                }
+
+        routes = asyncio.run(run_all())
+        # uvicorn with one worker serves from the process it started in
+        worker_pids = children(server.pid) or [server.pid]
+        worker_memory = [memory(pid) for pid in worker_pids]
+        parent_memory = memory(server.pid) if worker_pids != [server.pid] else None
+    finally:
+        server.terminate()
+        try:
+            server.wait(timeout=15)
+        except subprocess.TimeoutExpired:
+            server.kill()
+
+    def mean(key):
+        return round(sum(m[key] for m in worker_memory) / len(worker_memory), 1)
+
+    total_pss = sum(m["pss_mb"] for m in worker_memory) + (parent_memory["pss_mb"] if parent_memory else 0.0)
+    return {
+        "mode": mode,
+        "workers": workers,
+        "worker_processes": len(worker_memory),
+        "worker_rss_mb": mean("rss_mb"),
+        "worker_pss_mb": mean("pss_mb"),
+        "worker_uss_mb": mean("uss_mb"),
+        "parent": parent_memory,
+        "total_pss_mb": round(total_pss, 1),
+        "routes": routes,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", default=",".join(str(n) for n in sorted({1, 2, os.cpu_count() or 1})),
+                        help="comma-separated worker counts (default: 1, 2 and the CPU count)")
+    parser.add_argument("--modes", default=",".join(MODES), help="comma-separated subset of: " + ",".join(MODES))
+    parser.add_argument("--routes", default="predict,predict_batch",
+                        help="comma-separated subset of: " + ",".join(SCENARIOS))
+    parser.add_argument("--requests", type=int, default=1000, help="measured requests per route")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=50, help="unmeasured requests per route")
+    parser.add_argument("--patients", type=int, default=200)
+    parser.add_argument("--chws", type=int, default=10)
+    parser.add_argument("--history", type=int, default=20)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--settle", type=float, default=1.0, help="seconds to wait after the server is ready")
+    parser.add_argument("--timeout", type=float, default=60.0, help="seconds to wait for the server to start")
+    parser.add_argument("--output", help="write results as JSON to this file")
+    args = parser.parse_args()
+
+    counts = [int(n) for n in args.workers.split(",")]
+    modes = args.modes.split(",")
+    names = args.routes.split(",")
+    unknown = [n for n in names if n not in SCENARIOS] + [m for m in modes if m not in MODES]
+    if unknown:
+        parser.error(f"unknown routes or modes: {', '.join(unknown)}")
+
+    work_dir = tempfile.mkdtemp(prefix="mamasafe-workers-")
+    runs = []
+    print(f"{'mode':<9}{'workers':>8}{'RSS/w':>9}{'PSS/w':>9}{'USS/w':>9}{'PSS total':>11}  route rps (speedup)")
+    for mode in modes:
+        baseline = {}
+        for workers in counts:
+            run = measure(mode, workers, names, args, work_dir)
+            runs.append(run)
+            throughput = []
+            for name, result in run["routes"].items():
+                baseline.setdefault(name, result["rps"])
+                speedup = result["rps"] / baseline[name] if baseline[name] else 0.0
+                result["speedup"] = round(speedup, 2)
+                throughput.append(f"{name} {result['rps']} ({speedup:.2f}x, {result['errors']} errors)")
+            print(f"{mode:<9}{workers:>8}{run['worker_rss_mb']:>9}{run['worker_pss_mb']:>9}"
+                  f"{run['worker_uss_mb']:>9}{run['total_pss_mb']:>11}  " + ", ".join(throughput))
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+            "python": platform.python_version(),
+            "cpus": os.cpu_count(),
+            "model_path": os.getenv("MODEL_PATH") or "gdm_model.pkl",
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+        },
+        "runs": runs,
+    }
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
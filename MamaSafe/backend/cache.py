@@ -0,0 +1,185 @@
+"""Read-through caching for rarely-changing rows (patient and CHW profiles).
+
+``TTLCache`` is an in-process LRU whose entries also expire after ``ttl``
+seconds. ``ReadThroughCache`` puts it in front of a loader coroutine and can
+optionally sit on a shared Redis store (REDIS_URL) so that several workers
+share warm entries. Redis support needs the optional ``redis`` package;
+without it the cache is process-local.
+
+``invalidate`` drops the key from this worker's in-process cache and from
+Redis, but not from other workers' in-process caches, which go on serving
+their copy until it expires. With a shared store the in-process entries
+therefore only live for ``local_ttl`` seconds (default ``SHARED_LOCAL_TTL``),
+which bounds how stale another worker can be after an edit; Redis entries
+keep the full ``ttl``. Without one, every worker (e.g. each of serve.py's)
+is its own cache and may serve a profile up to ``ttl`` seconds after it was
+changed elsewhere.
+
+Within a worker, a lookup that was already reading when ``invalidate`` ran
+returns what it read but does not cache it, so the pre-edit row cannot be
+stored after the invalidation.
+"""
+import json
+import logging
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+_MISSING = object()
+
+# In-process lifetime of entries that are also in the shared store
+SHARED_LOCAL_TTL = 5.0
+
+log = logging.getLogger(__name__)
+
+
+class TTLCache:
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[str, tuple]" = OrderedDict()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key: str, default=None):
+        item = self._data.get(key)
+        if item is None:
+            return default
+        expires_at, value = item
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self.expirations += 1
+            return default
+        self._data.move_to_end(key)
+        return value
+
+    def set(self, key: str, value: Any):
+        self._data[key] = (time.monotonic() + self.ttl, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+            self.evictions += 1
+
+    def delete(self, key: str) -> bool:
+        return self._data.pop(key, None) is not None
+
+    def clear(self):
+        self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class ReadThroughCache:
+    def __init__(self, maxsize: int = 10000, ttl: float = 300.0, redis_url: Optional[str] = None, namespace: str = "mamasafe",
+                 local_ttl: Optional[float] = None):
+        self.ttl = ttl
+        self.namespace = namespace
+        self.shared = None
+        if redis_url:
+            try:
+                import redis.asyncio as redis
+                self.shared = redis.from_url(redis_url)
+            except ImportError:
+                log.warning("⚠️ REDIS_URL is set but the 'redis' package is not installed; using in-process cache only")
+        if self.shared is None:
+            local_ttl = ttl
+        elif local_ttl is None:
+            local_ttl = min(ttl, SHARED_LOCAL_TTL)
+        self.local = TTLCache(maxsize=maxsize, ttl=local_ttl)
+        # key -> [lookups in flight, invalidations since the first started]
+        self._in_flight: Dict[str, List[int]] = {}
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self.shared_errors = 0
+        self.stale_loads = 0
+
+    def _shared_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def get_or_load(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        """Return the cached value for key, calling loader on a miss.
+
+        ``None`` results (e.g. row not found) are not cached.
+        """
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            self.hits += 1
+            return value
+
+        state = self._in_flight.setdefault(key, [0, 0])
+        state[0] += 1
+        generation = state[1]
+        try:
+            value, from_shared = await self._read(key, loader)
+        finally:
+            state[0] -= 1
+            if not state[0]:
+                del self._in_flight[key]
+        if state[1] != generation:
+            # Invalidated while reading; what we read may predate the edit
+            self.stale_loads += 1
+            return value
+        if value is not None:
+            self.local.set(key, value)
+            if self.shared is not None and not from_shared:
+                try:
+                    await self.shared.set(self._shared_key(key), json.dumps(value, default=str), ex=int(self.ttl))
+                except Exception as e:
+                    self.shared_errors += 1
+                    log.warning("⚠️ Shared cache write failed: %s", e)
+        return value
+
+    async def _read(self, key: str, loader: Callable[[], Awaitable[Any]]):
+        """(value, whether it came from the shared store) for a local miss"""
+        if self.shared is not None:
+            try:
+                raw = await self.shared.get(self._shared_key(key))
+            except Exception as e:
+                self.shared_errors += 1
+                log.warning("⚠️ Shared cache read failed: %s", e)
+                raw = None
+            if raw is not None:
+                self.shared_hits += 1
+                return json.loads(raw), True
+
+        self.misses += 1
+        return await loader(), False
+
+    async def invalidate(self, *keys: str):
+        for key in keys:
+            self.local.delete(key)
+            state = self._in_flight.get(key)
+            if state is not None:
+                state[1] += 1
+        self.invalidations += len(keys)
+        if self.shared is not None and keys:
+            try:
+                await self.shared.delete(*(self._shared_key(k) for k in keys))
+            except Exception as e:
+                self.shared_errors += 1
+                log.warning("⚠️ Shared cache invalidation failed: %s", e)
+
+    def clear(self):
+        self.local.clear()
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.shared_hits + self.misses
+        return {
+            "size": len(self.local),
+            "maxsize": self.local.maxsize,
+            "ttl_s": self.ttl,
+            "local_ttl_s": self.local.ttl,
+            "shared_store": self.shared is not None,
+            "hits": self.hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.hits + self.shared_hits) / lookups, 3) if lookups else 0.0,
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+            "invalidations": self.invalidations,
+            "shared_errors": self.shared_errors,
+            "stale_loads": self.stale_loads,
+        }
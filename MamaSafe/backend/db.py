@@ -0,0 +1,40 @@
+"""Non-blocking access to the Supabase client.
+
+The supabase-py client is synchronous: ``.execute()`` blocks on the HTTP round
+trip to PostgREST. Routes build their queries as before (building is local and
+cheap) and hand them to ``run_query``, which executes them on a bounded thread
+pool so the event loop keeps serving other requests meanwhile.
+
+All threads share the one client created in main.py, and with it the single
+httpx session (HTTP/2, keep-alive connection pool) postgrest-py opens for it,
+so many queries can be in flight without opening a connection per request.
+"""
+import asyncio
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+# Upper bound on concurrent database calls per worker
+DB_MAX_WORKERS = int(os.getenv("DB_MAX_WORKERS", "16"))
+
+_executor = None
+
+
+def _get_executor() -> ThreadPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(max_workers=DB_MAX_WORKERS, thread_name_prefix="supabase")
+    return _executor
+
+
+async def run_query(query):
+    """Execute a postgrest query builder on the pool and return its response"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_executor(), query.execute)
+
+
+def shutdown_db():
+    """Release the pool threads; in-flight queries are left to finish"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False)
+        _executor = None
@@ -0,0 +1,93 @@
+"""In-process pub/sub for pushing CHW alerts over Server-Sent Events.
+
+Every notification created by this worker is published to the CHW's channel
+and fanned out to that CHW's open streams. Each channel keeps its last
+``history_size`` events so a client that reconnects with ``Last-Event-ID``
+gets whatever it missed before switching to live events.
+
+Event ids are ``<boot>-<seq>``, where boot is the broker's start time and
+pid, so workers started in the same second differ; an id from another
+process cannot be replayed, so such clients just receive live events. Events
+only reach streams connected to the worker that published them.
+"""
+import asyncio
+import json
+import os
+import time
+from collections import defaultdict, deque
+from contextlib import contextmanager
+from typing import Deque, Dict, List, Optional, Set, Tuple
+
+# Put on a subscriber's queue when it falls too far behind; the stream is
+# closed and the client resumes from its last event id
+OVERFLOW = object()
+
+
+class AlertBroker:
+    def __init__(self, history_size: int = 100, queue_size: int = 100):
+        self.history_size = history_size
+        self.queue_size = queue_size
+        self.boot = f"{int(time.time())}.{os.getpid()}"
+        self._seq = 0
+        self._history: Dict[str, Deque[Tuple[int, dict]]] = defaultdict(lambda: deque(maxlen=self.history_size))
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+        self.published = 0
+        self.overflows = 0
+
+    def _event_id(self, seq: int) -> str:
+        return f"{self.boot}-{seq}"
+
+    def _parse_event_id(self, event_id: Optional[str]) -> Optional[int]:
+        if not event_id:
+            return None
+        boot, _, seq = event_id.partition("-")
+        if boot != self.boot or not seq.isdigit():
+            return None
+        return int(seq)
+
+    def publish(self, chw_id: str, data: dict) -> str:
+        """Record an event on the CHW's channel and push it to open streams"""
+        self._seq += 1
+        event = {"id": self._event_id(self._seq), "data": data}
+        self._history[chw_id].append((self._seq, event))
+        self.published += 1
+        for queue in list(self._subscribers.get(chw_id, ())):
+            try:
+                queue.put_nowait(event)
+            except asyncio.QueueFull:
+                self.overflows += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(OVERFLOW)
+        return event["id"]
+
+    def replay(self, chw_id: str, last_event_id: Optional[str]) -> List[dict]:
+        """Buffered events newer than last_event_id (none if it can't be resumed)"""
+        seq = self._parse_event_id(last_event_id)
+        if seq is None:
+            return []
+        return [event for event_seq, event in self._history.get(chw_id, ()) if event_seq > seq]
+
+    @contextmanager
+    def subscribe(self, chw_id: str, last_event_id: Optional[str] = None):
+        """Yield (missed events, queue of live events) for one stream"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers[chw_id].add(queue)
+        try:
+            yield self.replay(chw_id, last_event_id), queue
+        finally:
+            self._subscribers[chw_id].discard(queue)
+            if not self._subscribers[chw_id]:
+                del self._subscribers[chw_id]
+
+    def stats(self) -> dict:
+        return {
+            "channels": len(self._history),
+            "subscribers": sum(len(s) for s in self._subscribers.values()),
+            "published": self.published,
+            "overflows": self.overflows,
+        }
+
+
+def format_sse(event: dict, event_type: str = "notification") -> str:
+    return f"id: {event['id']}\nevent: {event_type}\ndata: {json.dumps(event['data'], default=str)}\n\n"
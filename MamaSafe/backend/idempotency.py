@@ -0,0 +1,167 @@
+"""Idempotency keys for retried writes (/api/predict).
+
+A client that may retry sends ``Idempotency-Key: <unique id>`` with the
+request. The first request with a key runs normally and its response is kept
+for ``ttl`` seconds together with a fingerprint of the request body; a retry
+with the same key and body gets that response back without being scored or
+saved again. Reusing a key for a different body raises ``KeyReused``.
+
+A retry that arrives while the original is still running waits for it
+instead of running a second time. Errors are never stored, so a request
+that failed can be retried for real. If the original is cancelled (e.g. its
+client disconnected) the key is released and one of the waiting retries
+runs the request itself; the others wait for that one.
+
+Responses live in a bounded in-process ``TTLCache``; with REDIS_URL (and the
+optional ``redis`` package) they are also written to Redis so a retry that
+lands on another worker is replayed too. Waiting for an in-flight original
+only works within one worker.
+"""
+import asyncio
+import hashlib
+import json
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from cache import TTLCache
+from metrics import Counter
+
+log = logging.getLogger(__name__)
+
+IDEMPOTENCY_REQUESTS = Counter(
+    "mamasafe_idempotency_requests_total", "Requests carrying an Idempotency-Key, by outcome", ("outcome",),
+)
+
+MAX_KEY_LENGTH = 255
+
+
+class KeyReused(Exception):
+    """The key was already used for a request with a different body"""
+
+
+def fingerprint(payload: Any) -> str:
+    return hashlib.sha256(json.dumps(payload, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def valid_key(key: str) -> bool:
+    return 0 < len(key) <= MAX_KEY_LENGTH and key.isprintable()
+
+
+class IdempotencyStore:
+    def __init__(self, maxsize: int = 10000, ttl: float = 86400.0, redis_url: Optional[str] = None,
+                 namespace: str = "mamasafe:idempotency"):
+        self.local = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.namespace = namespace
+        self.shared = None
+        if redis_url:
+            try:
+                import redis.asyncio as redis
+                self.shared = redis.from_url(redis_url)
+            except ImportError:
+                log.warning("⚠️ REDIS_URL is set but the 'redis' package is not installed; idempotency keys are per worker")
+        self._inflight: Dict[str, Tuple[str, asyncio.Future]] = {}
+        self.stored = 0
+        self.replayed = 0
+        self.waited = 0
+        self.reused = 0
+        self.shared_errors = 0
+
+    def _shared_key(self, key: str) -> str:
+        return f"{self.namespace}:{key}"
+
+    async def _lookup(self, key: str) -> Optional[dict]:
+        entry = self.local.get(key)
+        if entry is not None or self.shared is None:
+            return entry
+        try:
+            raw = await self.shared.get(self._shared_key(key))
+        except Exception as e:
+            self.shared_errors += 1
+            log.warning("⚠️ Shared idempotency read failed: %s", e)
+            return None
+        if raw is None:
+            return None
+        entry = json.loads(raw)
+        self.local.set(key, entry)
+        return entry
+
+    async def _store(self, key: str, entry: dict):
+        self.local.set(key, entry)
+        self.stored += 1
+        if self.shared is None:
+            return
+        try:
+            await self.shared.set(self._shared_key(key), json.dumps(entry, default=str), ex=int(self.local.ttl))
+        except Exception as e:
+            self.shared_errors += 1
+            log.warning("⚠️ Shared idempotency write failed: %s", e)
+
+    def _count(self, outcome: str):
+        setattr(self, outcome, getattr(self, outcome) + 1)
+        IDEMPOTENCY_REQUESTS.inc(outcome=outcome)
+
+    async def run(self, key: str, body_fingerprint: str, handler: Callable[[], Awaitable[dict]]) -> Tuple[dict, bool]:
+        """(response, replayed): the stored response for key, or handler's, which is then stored"""
+        while True:
+            entry = await self._lookup(key)
+            if entry is not None:
+                if entry["fingerprint"] != body_fingerprint:
+                    self._count("reused")
+                    raise KeyReused(key)
+                self._count("replayed")
+                return entry["response"], True
+
+            pending = self._inflight.get(key)
+            if pending is None:
+                break
+            pending_fingerprint, future = pending
+            if pending_fingerprint != body_fingerprint:
+                self._count("reused")
+                raise KeyReused(key)
+            self._count("waited")
+            try:
+                # The original's error, if it fails, is this request's error too
+                return await asyncio.shield(future), True
+            except asyncio.CancelledError:
+                if not future.cancelled() or asyncio.current_task().cancelling():
+                    # This request was cancelled, not (only) the original
+                    raise
+            # The original was cancelled and released the key; take it over
+
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = (body_fingerprint, future)
+        try:
+            response = await handler()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Retrieved here so an error nobody waited for is not reported as unhandled
+            future.exception()
+            raise
+        finally:
+            self._inflight.pop(key, None)
+        future.set_result(response)
+        IDEMPOTENCY_REQUESTS.inc(outcome="stored")
+        await self._store(key, {"fingerprint": body_fingerprint, "response": response})
+        return response, False
+
+    def clear(self):
+        self.local.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self.local),
+            "maxsize": self.local.maxsize,
+            "ttl_s": self.local.ttl,
+            "shared_store": self.shared is not None,
+            "in_flight": len(self._inflight),
+            "stored": self.stored,
+            "replayed": self.replayed,
+            "waited": self.waited,
+            "reused": self.reused,
+            "evictions": self.local.evictions,
+            "expirations": self.local.expirations,
+            "shared_errors": self.shared_errors,
+        }
@@ -0,0 +1,168 @@
+"""Structured, non-blocking logging.
+
+Log calls on the request path only build a record and put it on an in-memory
+queue; a ``QueueListener`` thread formats it (JSON, one object per line,
+tracebacks included) and writes it to stdout. A full queue drops the record
+and counts it instead of blocking the event loop.
+
+Every record carries the id of the request it was logged under (taken from
+an incoming ``X-Request-ID`` header or generated) and any ``extra=`` fields.
+Below WARNING, records are sampled per request: LOG_SAMPLE_RATES maps path
+prefixes to the fraction of requests whose info/debug lines are kept, e.g.
+``/api/predict=0.1,/api/health=0``. Warnings and errors are always kept.
+"""
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional, Tuple
+
+from metrics import Counter
+
+LOG_RECORDS_DROPPED = Counter("mamasafe_log_records_dropped_total", "Log records dropped because the log queue was full")
+
+QUIET_LOGGERS = ("httpx", "httpcore", "hpack")
+
+_request_id: ContextVar[Optional[str]] = ContextVar("request_id", default=None)
+_sampled: ContextVar[bool] = ContextVar("log_sampled", default=True)
+
+# LogRecord attributes that are not user-supplied extra fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "request_id"}
+
+
+def parse_sample_rates(spec: str) -> Dict[str, float]:
+    """Parse ``/prefix=rate,...`` into {prefix: rate}"""
+    rates = {}
+    for item in filter(None, (part.strip() for part in spec.split(","))):
+        prefix, _, rate = item.partition("=")
+        rates[prefix.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+
+class RequestSampler:
+    """Decides once per request whether its info/debug lines are logged"""
+
+    def __init__(self, rates: Dict[str, float], default: float = 1.0):
+        # Longest prefix first, so /api/predict/batch can override /api/predict
+        self.rates: Tuple[Tuple[str, float], ...] = tuple(sorted(rates.items(), key=lambda item: -len(item[0])))
+        self.default = default
+
+    def rate(self, path: str) -> float:
+        for prefix, rate in self.rates:
+            if path.startswith(prefix):
+                return rate
+        return self.default
+
+    def sample(self, path: str) -> bool:
+        rate = self.rate(path)
+        return rate >= 1.0 or (rate > 0.0 and random.random() < rate)
+
+
+def bind_request(path: str, request_id: Optional[str], sampler: RequestSampler) -> str:
+    """Bind a request id and sampling decision to the current request's context"""
+    request_id = request_id or uuid.uuid4().hex
+    _request_id.set(request_id)
+    _sampled.set(sampler.sample(path))
+    return request_id
+
+
+def current_request_id() -> Optional[str]:
+    return _request_id.get()
+
+
+class ContextFilter(logging.Filter):
+    """Stamps the request id and drops unsampled low-level records, in the caller's context"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno < logging.WARNING and not _sampled.get():
+            return False
+        record.request_id = _request_id.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        if getattr(record, "request_id", None):
+            entry["request_id"] = record.request_id
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the listener thread unformatted; never waits on a full queue"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only merge the message arguments here; formatting (and the
+        # traceback) happens on the listener thread
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            LOG_RECORDS_DROPPED.inc()
+
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+
+def configure_logging(level: str = "INFO", sample_rates: str = "", default_rate: float = 1.0,
+                      json_output: bool = True, queue_size: int = 10000) -> RequestSampler:
+    """Route the root logger through the background queue; returns the request sampler"""
+    global _listener
+    stop_logging()
+
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(JsonFormatter() if json_output else logging.Formatter("%(levelname)s %(name)s [%(request_id)s] %(message)s"))
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=queue_size))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.handlers = [h for h in root.handlers if not isinstance(h, NonBlockingQueueHandler)]
+    root.addHandler(handler)
+    root.setLevel(level.upper())
+    # supabase-py's HTTP client logs every query at INFO
+    for name in QUIET_LOGGERS:
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener = logging.handlers.QueueListener(handler.queue, output, respect_handler_level=True)
+    _listener.start()
+    return RequestSampler(parse_sample_rates(sample_rates), default_rate)
+
+
+def configure_from_env() -> RequestSampler:
+    return configure_logging(
+        level=os.getenv("LOG_LEVEL", "INFO"),
+        sample_rates=os.getenv("LOG_SAMPLE_RATES", ""),
+        default_rate=float(os.getenv("LOG_SAMPLE_DEFAULT", "1.0")),
+        json_output=os.getenv("LOG_FORMAT", "json").lower() == "json",
+        queue_size=int(os.getenv("LOG_QUEUE_SIZE", "10000")),
+    )
+
+
+@atexit.register
+def stop_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
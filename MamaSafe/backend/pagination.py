@@ -0,0 +1,80 @@
+"""Keyset pagination over (created_at, id), newest first.
+
+List endpoints return at most ``limit`` rows plus an opaque ``next_cursor``
+that encodes the last row's sort key. The next page is fetched with a
+``(created_at, id) < cursor`` filter instead of an OFFSET, so every page costs
+the same however deep the client scrolls. Clients that need every row follow
+``next_cursor`` (see the mobile app's ``ApiService``) or ask for the NDJSON
+stream: ``stream_ndjson`` walks the pages and yields each row as soon as its
+page arrives, so memory per request stays at one page regardless of history
+length.
+"""
+import base64
+import json
+from typing import AsyncIterator, Callable, List, Optional, Tuple
+
+from db import run_query
+from serialization import dumps
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+def encode_cursor(row: dict) -> str:
+    raw = json.dumps([row["created_at"], row["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, row_id = json.loads(raw)
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+    return str(created_at), str(row_id)
+
+
+def keyset(query, cursor: Optional[str], limit: int, ascending: bool = False):
+    """Apply the keyset filter, ordering and limit to a postgrest query.
+
+    One extra row is requested to tell whether another page follows. With
+    ``ascending`` the rows after the cursor are walked oldest first instead.
+    """
+    if cursor:
+        created_at, row_id = decode_cursor(cursor)
+        op = "gt" if ascending else "lt"
+        query = query.or_(
+            f'created_at.{op}."{created_at}",'
+            f'and(created_at.eq."{created_at}",id.{op}."{row_id}")'
+        )
+    desc = not ascending
+    return query.order('created_at', desc=desc).order('id', desc=desc).limit(limit + 1)
+
+
+async def fetch_page(build_query: Callable, cursor: Optional[str], limit: int,
+                     ascending: bool = False) -> Tuple[List[dict], Optional[str]]:
+    """Fetch one page; returns (rows, next_cursor or None on the last page)"""
+    response = await run_query(keyset(build_query(), cursor, limit, ascending))
+    rows = list(response.data or [])
+    if len(rows) > limit:
+        rows = rows[:limit]
+        return rows, encode_cursor(rows[-1])
+    return rows, None
+
+
+async def stream_ndjson(fetch: Callable, cursor: Optional[str], page_size: int) -> AsyncIterator[bytes]:
+    """Yield every row after cursor as one JSON line, a page at a time.
+
+    ``fetch(cursor, limit)`` returns ``(rows, next_cursor)`` for one page, e.g.
+    a store's ``page_*`` method.
+    """
+    while True:
+        rows, cursor = await fetch(cursor, page_size)
+        for row in rows:
+            yield dumps(row) + b"\n"
+        if cursor is None:
+            return
@@ -0,0 +1,256 @@
+"""Model registry: hot-swapping the serving model and shadow-scoring a candidate.
+
+``load_model`` reads an artifact (a .pkl or a train.py manifest), checks it
+against its manifest and compiles its fast-path scorer; callers run it off
+the event loop. ``ModelRegistry.install`` then swaps the result in with one
+synchronous step, so a request already scoring finishes with the model it
+started with, the next one gets the new model, and no worker restarts.
+
+A shadow model sees the same features as live predictions without touching
+the response: ``observe`` only puts them on a bounded queue (dropping, and
+counting, when it is full) and a background task scores the queued rows in
+batches, recording agreement with the served labels, the probability gap
+and its own scoring latency.
+
+``watch`` polls a model path and activates it whenever the file changes
+(e.g. a symlink re-pointed at a new train.py artifact).
+"""
+import asyncio
+import logging
+import os
+import time
+from datetime import datetime
+from typing import Callable, Optional
+
+import joblib
+import numpy as np
+
+from artifacts import resolve_model, verify
+from metrics import Counter, Histogram
+from scoring import compile_model
+
+log = logging.getLogger(__name__)
+
+MODEL_RELOADS = Counter("mamasafe_model_reloads_total", "Model activations by outcome", ("outcome",))
+SHADOW_PREDICTIONS = Counter(
+    "mamasafe_shadow_predictions_total", "Live predictions re-scored by the shadow model, by agreement",
+    ("version", "outcome"),
+)
+SHADOW_DROPPED = Counter("mamasafe_shadow_dropped_total", "Predictions not shadow-scored because the queue was full")
+SHADOW_SECONDS = Histogram(
+    "mamasafe_shadow_batch_seconds", "Time the shadow model took to score one batch", ("version",),
+)
+
+
+class LoadedModel:
+    """A model with its compiled scorer and provenance; never mutated once built"""
+
+    def __init__(self, model, scorer, version: str, path: str, manifest: Optional[dict] = None):
+        self.model = model
+        self.scorer = scorer
+        self.version = version
+        self.path = path
+        self.manifest = manifest
+        self.loaded_at = datetime.now().isoformat()
+
+    def info(self) -> dict:
+        info = {
+            "version": self.version,
+            "path": self.path,
+            "scorer": self.scorer.kind,
+            "loaded_at": self.loaded_at,
+        }
+        if self.manifest:
+            info["trained_at"] = self.manifest.get("created_at")
+            info["cv"] = self.manifest.get("best", {}).get("cv")
+        return info
+
+
+def load_model(path: str, check_rows: Optional[np.ndarray] = None) -> LoadedModel:
+    """Read, verify and compile a model artifact (blocking)"""
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"MODEL FILE MISSING: {path}")
+    pkl_path, manifest = resolve_model(path)
+    log.info("Model path: %s (%d bytes)", pkl_path, os.path.getsize(pkl_path))
+    version = verify(pkl_path, manifest)
+    model = joblib.load(pkl_path)
+    log.info("Model loaded successfully!", extra={
+        "model_type": type(model).__name__,
+        "model_classes": str(getattr(model, 'classes_', 'N/A')),
+        "model_version": version,
+        "model_cv": manifest["best"]["cv"] if manifest else None
+    })
+    # Compile the fast path here too, off the request path
+    return LoadedModel(model, compile_model(model, check_rows), version, path, manifest)
+
+
+class ShadowStats:
+    def __init__(self):
+        self.compared = 0
+        self.agreed = 0
+        self.abs_diff_sum = 0.0
+        self.abs_diff_max = 0.0
+        self.batches = 0
+        self.seconds = 0.0
+        self.errors = 0
+
+    def record(self, agree: np.ndarray, abs_diff: np.ndarray, seconds: float):
+        self.compared += len(agree)
+        self.agreed += int(agree.sum())
+        self.abs_diff_sum += float(abs_diff.sum())
+        self.abs_diff_max = max(self.abs_diff_max, float(abs_diff.max()))
+        self.batches += 1
+        self.seconds += seconds
+
+    def as_dict(self) -> dict:
+        return {
+            "compared": self.compared,
+            "agreement": round(self.agreed / self.compared, 4) if self.compared else None,
+            "mean_abs_probability_diff": round(self.abs_diff_sum / self.compared, 6) if self.compared else None,
+            "max_abs_probability_diff": round(self.abs_diff_max, 6),
+            "mean_ms_per_row": round(self.seconds * 1000 / self.compared, 4) if self.compared else None,
+            "batches": self.batches,
+            "errors": self.errors,
+        }
+
+
+class ModelRegistry:
+    def __init__(self, check_rows: Callable[[], np.ndarray], on_install: Callable[[LoadedModel], None],
+                 queue_size: int = 1000, batch_size: int = 64):
+        self.check_rows = check_rows
+        self.on_install = on_install
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        self.active: Optional[LoadedModel] = None
+        self.shadow: Optional[LoadedModel] = None
+        self.shadow_stats = ShadowStats()
+        self.dropped = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._shadow_task: Optional[asyncio.Task] = None
+        self._watch_task: Optional[asyncio.Task] = None
+        self._lock: Optional[asyncio.Lock] = None
+
+    async def load(self, path: str) -> LoadedModel:
+        return await asyncio.to_thread(load_model, path, self.check_rows())
+
+    def install(self, loaded: LoadedModel):
+        """Make loaded the serving model; synchronous, so no request sees a half-swapped state"""
+        self.active = loaded
+        self.on_install(loaded)
+        log.info("🔁 Serving model %s", loaded.version)
+
+    async def activate(self, path: str) -> LoadedModel:
+        """Load path off the event loop and swap it in; the current model keeps serving on failure"""
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        async with self._lock:
+            try:
+                loaded = await self.load(path)
+            except Exception:
+                MODEL_RELOADS.inc(outcome="failure")
+                raise
+            self.install(loaded)
+            MODEL_RELOADS.inc(outcome="success")
+            return loaded
+
+    # ---- shadow scoring
+
+    async def start_shadow(self, path: str) -> LoadedModel:
+        loaded = await self.load(path)
+        self.shadow = loaded
+        self.shadow_stats = ShadowStats()
+        if self._queue is None:
+            self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if self._shadow_task is None or self._shadow_task.done():
+            self._shadow_task = asyncio.create_task(self._score_shadow())
+        log.info("👥 Shadow model %s started", loaded.version)
+        return loaded
+
+    def stop_shadow(self):
+        self.shadow = None
+
+    def observe(self, features: np.ndarray, labels, probabilities):
+        """Queue live predictions for the shadow model; never blocks"""
+        shadow = self.shadow
+        if shadow is None or self._queue is None:
+            return
+        try:
+            self._queue.put_nowait((
+                shadow, np.asarray(features, dtype=float), np.asarray(labels), np.asarray(probabilities, dtype=float)
+            ))
+        except asyncio.QueueFull:
+            self.dropped += 1
+            SHADOW_DROPPED.inc()
+
+    async def _score_shadow(self):
+        while True:
+            items = [await self._queue.get()]
+            while len(items) < self.batch_size and not self._queue.empty():
+                items.append(self._queue.get_nowait())
+            shadow = self.shadow
+            # Rows queued for a shadow model that has since been replaced are skipped
+            items = [item for item in items if item[0] is shadow]
+            if not items:
+                continue
+            X = np.vstack([item[1] for item in items])
+            served_labels = np.concatenate([item[2] for item in items])
+            served_probabilities = np.concatenate([item[3] for item in items])
+            try:
+                started = time.perf_counter()
+                labels, probabilities = await asyncio.to_thread(shadow.scorer.score, X)
+                seconds = time.perf_counter() - started
+            except Exception as e:
+                self.shadow_stats.errors += 1
+                log.warning("⚠️ Shadow scoring failed: %s", e)
+                continue
+            agree = labels == served_labels
+            self.shadow_stats.record(agree, np.abs(probabilities - served_probabilities), seconds)
+            SHADOW_SECONDS.observe(seconds, version=shadow.version)
+            SHADOW_PREDICTIONS.inc(int(agree.sum()), version=shadow.version, outcome="agree")
+            SHADOW_PREDICTIONS.inc(int((~agree).sum()), version=shadow.version, outcome="disagree")
+
+    # ---- file watcher
+
+    def watch(self, path: str, interval: float):
+        """Re-activate path whenever its file changes, polling every interval seconds"""
+        if self._watch_task is None or self._watch_task.done():
+            self._watch_task = asyncio.create_task(self._watch(path, interval))
+
+    async def _watch(self, path: str, interval: float):
+        def signature():
+            try:
+                stat = os.stat(path)
+                return stat.st_ino, stat.st_mtime_ns, stat.st_size
+            except OSError:
+                return None
+
+        seen = signature()
+        while True:
+            await asyncio.sleep(interval)
+            current = signature()
+            if current is None or current == seen:
+                continue
+            seen = current
+            try:
+                await self.activate(path)
+            except Exception as e:
+                log.error("❌ Model reload from %s failed, still serving %s: %s",
+                          path, self.active.version if self.active else None, e)
+
+    async def stop(self):
+        for task in (self._shadow_task, self._watch_task):
+            if task is not None:
+                task.cancel()
+        self._shadow_task = self._watch_task = None
+        # Both belong to the loop that is shutting down
+        self._queue = self._lock = None
+
+    def stats(self) -> dict:
+        return {
+            "active": self.active.info() if self.active else None,
+            "shadow": self.shadow.info() if self.shadow else None,
+            "shadow_stats": self.shadow_stats.as_dict(),
+            "shadow_dropped": self.dropped,
+            "shadow_queue": self._queue.qsize() if self._queue is not None else 0,
+            "watching": self._watch_task is not None and not self._watch_task.done(),
+        }
@@ -0,0 +1,316 @@
+"""Bulk re-scoring of stored predictions after a model change.
+
+Every prediction row keeps the inputs it was scored from (age, blood
+pressure and glucose, see ``main._prediction_record``). The job walks the
+predictions in ascending (created_at, id) keyset order, scores each chunk
+from those stored inputs with one vectorized ``predict_proba`` call in a
+process pool, and bulk-upserts the results under the predictions' own ids
+and created_at. Rows are overwritten in place, so latest predictions,
+triage and history show the new model without gaining rows. Rows saved
+before the inputs were kept, or whose inputs are out of range, are left
+untouched and counted as skipped: they are never re-scored from a reading
+or age looked up elsewhere. No CHW alerts are sent.
+
+After each chunk is written, the job checkpoints its cursor, counts and model
+version to a JSON file. A job started from that checkpoint carries on after
+the last prediction written, so an
+interrupted run resumes, and a finished one only re-scores predictions made
+since. A checkpoint written with another model version is refused unless the
+job is restarted from the beginning.
+
+Worker processes (``jobs``) load the model once each; while they score, the
+next pages are already being fetched. Chunks are written in order, so the
+checkpoint never moves past an unwritten chunk. With ``jobs=0`` chunks are
+scored on a thread of the calling process instead.
+
+    python rescore.py --model models/gdm_model-<version>.json --jobs 4
+    python rescore.py --restart --chunk-size 5000 --checkpoint rescore.json
+
+The storage backend is configured as for the API (STORAGE_BACKEND,
+SUPABASE_URL, ...). POST /api/admin/rescore runs the same job in the
+background of the API, and GET /api/admin/rescore reports its progress.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import multiprocessing
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from typing import Callable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from artifacts import resolve_model, verify
+from metrics import Counter
+from pagination import encode_cursor
+from registry import load_model
+
+log = logging.getLogger(__name__)
+
+RESCORE_ROWS = Counter("mamasafe_rescore_rows_total", "Predictions processed by the re-scoring job, by outcome", ("outcome",))
+
+# Stored inputs of a prediction, in model feature order
+INPUT_FEATURES = ["age", "blood_pressure_systolic", "blood_pressure_diastolic", "blood_glucose"]
+PREDICTION_COLUMNS = ["id", "patient_id", "created_at", *INPUT_FEATURES]
+
+
+class CheckpointMismatch(ValueError):
+    """The checkpoint was written by a job with another model version"""
+
+
+def _value(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def feature_matrix(rows: List[dict], ranges: Sequence[Tuple[float, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """(features, mask of scorable rows): rows missing an input or outside ranges are left out"""
+    X = np.array([
+        [_value(row.get(name)) for name in INPUT_FEATURES]
+        for row in rows
+    ], dtype=float).reshape(len(rows), len(INPUT_FEATURES))
+    low, high = np.array(ranges, dtype=float).T
+    with np.errstate(invalid="ignore"):
+        scorable = ((X >= low) & (X <= high)).all(axis=1)
+    return X[scorable], scorable
+
+
+def load_checkpoint(path: Optional[str]) -> Optional[dict]:
+    if not path or not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_checkpoint(path: Optional[str], state: dict):
+    """Write state atomically, so a crash leaves the previous checkpoint intact"""
+    if not path:
+        return
+    staging = f"{path}.tmp"
+    with open(staging, "w") as f:
+        json.dump(state, f, indent=2, default=str)
+    os.replace(staging, path)
+
+
+# Model of each worker process, loaded once by the pool initializer
+_scorer = None
+
+
+def _init_worker(model_path: str):
+    global _scorer
+    _scorer = load_model(model_path).scorer
+
+
+def _score(X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    return _scorer.score(X)
+
+
+class RescoreJob:
+    def __init__(self, store, model_path: str, build_record: Callable[[dict, bool, float], dict],
+                 ranges: Sequence[Tuple[float, float]], checkpoint_path: Optional[str] = None,
+                 chunk_size: int = 1000, jobs: int = 1):
+        self.store = store
+        self.model_path = model_path
+        self.build_record = build_record
+        self.ranges = ranges
+        self.checkpoint_path = checkpoint_path
+        self.chunk_size = chunk_size
+        self.jobs = jobs
+        self.state: dict = {"status": "pending"}
+        self._cancelled = False
+        self._started: Optional[float] = None
+
+    def cancel(self):
+        """Stop after the chunk being written; the checkpoint stays resumable"""
+        self._cancelled = True
+
+    def _fresh_state(self, version: str) -> dict:
+        return {
+            "model_path": self.model_path,
+            "model_version": version,
+            "cursor": None,
+            "predictions": 0,
+            "scored": 0,
+            "skipped": 0,
+            "written": 0,
+            "chunks": 0,
+            "created_at": datetime.now().isoformat(),
+        }
+
+    def status(self) -> dict:
+        status = dict(self.state)
+        if self._started is not None and status.get("status") == "running":
+            elapsed = time.perf_counter() - self._started
+            status["elapsed_s"] = round(elapsed, 1)
+            status["predictions_per_s"] = round(self.state.get("run_predictions", 0) / elapsed, 1) if elapsed else 0.0
+        return status
+
+    async def prepare(self, restart: bool = False):
+        """Check the model against the checkpoint and set up the state to run from"""
+        pkl_path, manifest = resolve_model(self.model_path)
+        version = await asyncio.to_thread(verify, pkl_path, manifest)
+        checkpoint = None if restart else load_checkpoint(self.checkpoint_path)
+        if checkpoint is not None and checkpoint.get("model_version") != version:
+            raise CheckpointMismatch(
+                f"{self.checkpoint_path} was written with model {checkpoint.get('model_version')}, "
+                f"not {version}; restart to re-score everything"
+            )
+        self.state = {**(checkpoint or self._fresh_state(version)), "status": "ready", "run_predictions": 0,
+                      "started_at": None, "finished_at": None, "error": None}
+
+    async def run(self, restart: bool = False) -> dict:
+        if self.state.get("status") != "ready":
+            await self.prepare(restart)
+        self.state.update(status="running", started_at=datetime.now().isoformat())
+        self._started = time.perf_counter()
+        log.info("🧮 Re-scoring with model %s from %s", self.state["model_version"],
+                 "the beginning" if self.state["cursor"] is None else "the checkpoint")
+        try:
+            if self.jobs > 0:
+                pool = ProcessPoolExecutor(max_workers=self.jobs, mp_context=multiprocessing.get_context("spawn"),
+                                           initializer=_init_worker, initargs=(self.model_path,))
+                with pool:
+                    await self._run(lambda X: asyncio.get_running_loop().run_in_executor(pool, _score, X))
+            else:
+                scorer = (await asyncio.to_thread(load_model, self.model_path)).scorer
+                await self._run(lambda X: asyncio.to_thread(scorer.score, X))
+        except asyncio.CancelledError:
+            self.state["status"] = "cancelled"
+            raise
+        except Exception as e:
+            self.state.update(status="failed", error=str(e))
+            log.error("❌ Re-scoring failed after %d predictions: %s", self.state["predictions"], e)
+            raise
+        finally:
+            elapsed = time.perf_counter() - self._started
+            self.state.update(
+                finished_at=datetime.now().isoformat(),
+                elapsed_s=round(elapsed, 1),
+                predictions_per_s=round(self.state["run_predictions"] / elapsed, 1) if elapsed else 0.0,
+            )
+            save_checkpoint(self.checkpoint_path, self.state)
+        return self.status()
+
+    async def _fetch(self, cursor: Optional[str], score) -> tuple:
+        rows, next_cursor = await self.store.page_all_predictions(cursor, self.chunk_size, columns=PREDICTION_COLUMNS)
+        X, scorable = feature_matrix(rows, self.ranges)
+        scored = score(X) if len(X) else None
+        return rows, X, scorable, asyncio.ensure_future(scored) if scored is not None else None, next_cursor
+
+    async def _run(self, score):
+        cursor = self.state["cursor"]
+        pending = deque()
+        exhausted = False
+        try:
+            while True:
+                # Keep every worker busy, plus one chunk ready behind them
+                while not exhausted and len(pending) <= max(self.jobs, 1):
+                    chunk = await self._fetch(cursor, score)
+                    pending.append(chunk)
+                    rows, next_cursor = chunk[0], chunk[4]
+                    if rows:
+                        cursor = encode_cursor(rows[-1])
+                    exhausted = next_cursor is None
+                if not pending:
+                    break
+                await self._write(*pending.popleft())
+                if self._cancelled:
+                    self.state["status"] = "cancelled"
+                    log.info("⏹️ Re-scoring stopped after %d predictions", self.state["predictions"])
+                    return
+        finally:
+            for chunk in pending:
+                if chunk[3] is not None:
+                    chunk[3].cancel()
+        self.state["status"] = "completed"
+        log.info("✅ Re-scored %d predictions (%d skipped)", self.state["scored"], self.state["skipped"])
+
+    async def _write(self, rows, X, scorable, scored, next_cursor):
+        if not rows:
+            return
+        records = []
+        if scored is not None:
+            labels, probabilities = await scored
+            scorable_rows = [row for row, keep in zip(rows, scorable) if keep]
+            for row, features, label, probability in zip(scorable_rows, X, labels, probabilities):
+                inputs = {"patient_id": row["patient_id"], **dict(zip(INPUT_FEATURES, features))}
+                # Same id and time as the row being re-scored, so it is overwritten in place
+                records.append({
+                    **self.build_record(inputs, bool(label), float(probability)),
+                    "id": row["id"],
+                    "created_at": row["created_at"],
+                })
+            await self.store.upsert_predictions(records)
+
+        skipped = len(rows) - len(records)
+        RESCORE_ROWS.inc(len(records), outcome="scored")
+        RESCORE_ROWS.inc(skipped, outcome="skipped")
+        self.state["predictions"] += len(rows)
+        self.state["run_predictions"] += len(rows)
+        self.state["scored"] += len(records)
+        self.state["skipped"] += skipped
+        self.state["written"] += len(records)
+        self.state["chunks"] += 1
+        self.state["cursor"] = encode_cursor(rows[-1])
+        self.state["last_prediction_at"] = rows[-1]["created_at"]
+        save_checkpoint(self.checkpoint_path, self.state)
+        log.info("🧮 Re-scored chunk %d", self.state["chunks"], extra={
+            "predictions": self.state["predictions"], "skipped": self.state["skipped"],
+            "predictions_per_s": self.status().get("predictions_per_s"),
+        })
+
+
+async def _main(args) -> int:
+    import main as app
+
+    store = await app.open_store()
+    job = RescoreJob(store, args.model or app.model_path, app.rescored_record, app.FEATURE_RANGES,
+                     checkpoint_path=args.checkpoint, chunk_size=args.chunk_size, jobs=args.jobs)
+
+    async def report():
+        while True:
+            await asyncio.sleep(args.progress_every)
+            status = job.status()
+            print(f"{status.get('predictions', 0)} predictions, {status.get('scored', 0)} re-scored, "
+                  f"{status.get('skipped', 0)} skipped, {status.get('predictions_per_s', 0)} predictions/s", flush=True)
+
+    reporter = asyncio.create_task(report())
+    try:
+        status = await job.run(restart=args.restart)
+    except CheckpointMismatch as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+    finally:
+        reporter.cancel()
+    print(json.dumps({key: status.get(key) for key in (
+        "status", "model_version", "predictions", "scored", "skipped", "chunks", "elapsed_s", "predictions_per_s"
+    )}))
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model", help="model .pkl or train.py manifest (default: MODEL_PATH)")
+    parser.add_argument("--checkpoint", default=os.getenv("RESCORE_CHECKPOINT") or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), "rescore-checkpoint.json"))
+    parser.add_argument("--chunk-size", type=int, default=1000, help="predictions per page and per upsert")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="scoring processes; 0 scores in-process")
+    parser.add_argument("--restart", action="store_true", help="ignore the checkpoint and re-score everything")
+    parser.add_argument("--progress-every", type=float, default=10.0, help="seconds between progress lines")
+    args = parser.parse_args(argv)
+    if args.chunk_size < 1 or args.jobs < 0:
+        parser.error("--chunk-size must be positive and --jobs not negative")
+    return asyncio.run(_main(args))
+
+
+if __name__ == "__main__":
+    # main.py imports this module; let it find this copy rather than run it twice
+    sys.modules.setdefault("rescore", sys.modules[__name__])
+    sys.exit(main())
@@ -0,0 +1,64 @@
+"""In-memory patient -> CHW routing index for the high-risk alert path.
+
+The index is bulk-loaded when the app warms up, refreshed periodically, and
+updated directly when this service assigns a patient. Alert code resolves a
+patient's CHW from it in O(1); patients it doesn't know about fall back to a
+database lookup, whose answer is then remembered.
+
+Each worker has its own index, and an assignment only updates the index of
+the worker that made it. With ``ttl``, entries older than that many seconds
+count as misses, so other workers re-read the assignment from the database
+and route alerts to the old CHW for at most ``ttl`` seconds rather than
+until their next bulk refresh.
+"""
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+
+class RoutingIndex:
+    def __init__(self, ttl: Optional[float] = None):
+        self.ttl = ttl
+        # patient_id -> (chw_id, time.monotonic() when recorded)
+        self._chw_by_patient: Dict[str, Tuple[str, float]] = {}
+        self.loaded_at: Optional[float] = None
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+
+    def lookup(self, patient_id: str) -> Optional[str]:
+        entry = self._chw_by_patient.get(patient_id)
+        if entry is not None and self.ttl and time.monotonic() - entry[1] > self.ttl:
+            self._chw_by_patient.pop(patient_id, None)
+            self.expirations += 1
+            entry = None
+        if entry is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return entry[0]
+
+    def assign(self, patient_id: str, chw_id: Optional[str]):
+        if chw_id:
+            self._chw_by_patient[patient_id] = (chw_id, time.monotonic())
+        else:
+            self._chw_by_patient.pop(patient_id, None)
+
+    def replace(self, pairs: Iterable[Tuple[str, str]]):
+        """Swap in a freshly loaded mapping in one step"""
+        now = time.monotonic()
+        self._chw_by_patient = {patient_id: (chw_id, now) for patient_id, chw_id in pairs if chw_id}
+        self.loaded_at = time.time()
+
+    def __len__(self):
+        return len(self._chw_by_patient)
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self),
+            "ttl_s": self.ttl,
+            "loaded_at": self.loaded_at,
+            "age_s": round(time.time() - self.loaded_at, 1) if self.loaded_at else None,
+            "hits": self.hits,
+            "misses": self.misses,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,196 @@
+"""Fast-path scorers compiled from the fitted sklearn model.
+
+Going through sklearn for one row costs far more than the arithmetic itself:
+input validation, per-estimator dispatch and (for forests) one Python call per
+tree. ``compile_model`` pulls the fitted parameters out of the pipeline once
+and scores with a handful of NumPy operations instead:
+
+* scalers (StandardScaler, MinMaxScaler) become one affine transform,
+* LogisticRegression becomes a dot product and a sigmoid,
+* tree ensembles (RandomForest, ExtraTrees, DecisionTree) become stacked node
+  arrays that are walked for every tree and row at once.
+
+Each compiled scorer is checked against the sklearn model before it is used;
+any model it cannot compile, or that fails the check, falls back to
+``SklearnScorer``.
+"""
+import logging
+from typing import Optional, Tuple
+
+import numpy as np
+
+TREE_LEAF = -1
+
+log = logging.getLogger(__name__)
+
+
+class CannotCompile(Exception):
+    """Raised for model types the fast path does not support"""
+
+
+class SklearnScorer:
+    """Scores through the model itself, with a single predict_proba call"""
+    kind = "sklearn"
+
+    def __init__(self, model):
+        self.model = model
+        self.classes_ = np.asarray(model.classes_)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.predict_proba(X))
+
+    def score(self, X: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Return (labels, positive-class probabilities) from one pass"""
+        proba = self.predict_proba(X)
+        return self.classes_[np.argmax(proba, axis=1)], proba[:, 1]
+
+
+class LinearScorer(SklearnScorer):
+    kind = "linear"
+
+    def __init__(self, model, scale: np.ndarray, offset: np.ndarray, estimator):
+        super().__init__(model)
+        # Fold the scaler into the weights: w . (x * a + b) + c = (w * a) . x + (w . b + c)
+        coef = estimator.coef_[0]
+        self.coef = coef * scale
+        self.intercept = float(coef @ offset + estimator.intercept_[0])
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        positive = 1.0 / (1.0 + np.exp(-(np.asarray(X, dtype=float) @ self.coef + self.intercept)))
+        return np.column_stack([1.0 - positive, positive])
+
+
+class ForestScorer(SklearnScorer):
+    kind = "forest"
+
+    def __init__(self, model, scale: np.ndarray, offset: np.ndarray, trees):
+        super().__init__(model)
+        self.scale = scale
+        self.offset = offset
+        self.n_trees = len(trees)
+        self.max_depth = max(t.tree_.max_depth for t in trees)
+        width = max(t.tree_.node_count for t in trees)
+        n_classes = len(self.classes_)
+
+        # Every tree padded to the same width and stored flat, so node i of
+        # tree t lives at t * width + i
+        left = np.zeros((self.n_trees, width), dtype=np.intp)
+        right = np.zeros((self.n_trees, width), dtype=np.intp)
+        feature = np.zeros((self.n_trees, width), dtype=np.intp)
+        threshold = np.zeros((self.n_trees, width), dtype=np.float64)
+        leaf_proba = np.zeros((self.n_trees, width, n_classes), dtype=np.float64)
+        for t, estimator in enumerate(trees):
+            tree = estimator.tree_
+            n = tree.node_count
+            nodes = np.arange(n)
+            is_leaf = tree.children_left == TREE_LEAF
+            # Leaves point at themselves so every row can take max_depth steps
+            left[t, :n] = np.where(is_leaf, nodes, tree.children_left)
+            right[t, :n] = np.where(is_leaf, nodes, tree.children_right)
+            feature[t, :n] = np.where(is_leaf, 0, tree.feature)
+            threshold[t, :n] = tree.threshold
+            values = tree.value[:, 0, :]
+            leaf_proba[t, :n] = values / values.sum(axis=1, keepdims=True)
+
+        base = (np.arange(self.n_trees) * width)[:, None]
+        self.left = (left + base).ravel()
+        self.right = (right + base).ravel()
+        self.feature = feature.ravel()
+        self.threshold = threshold.ravel()
+        self.leaf_proba = leaf_proba.reshape(-1, n_classes)
+        self.roots = base.ravel()
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        X = np.asarray(X, dtype=float) * self.scale + self.offset
+        # sklearn compares float32 features against the split thresholds
+        X = X.astype(np.float32).astype(np.float64)
+        rows = np.arange(X.shape[0])[:, None]
+        nodes = np.broadcast_to(self.roots, (X.shape[0], self.n_trees))
+        for _ in range(self.max_depth):
+            go_left = X[rows, self.feature[nodes]] <= self.threshold[nodes]
+            nodes = np.where(go_left, self.left[nodes], self.right[nodes])
+        return self.leaf_proba[nodes].mean(axis=1)
+
+
+def _supported_estimators():
+    # sklearn is imported on first compile rather than at import, which
+    # keeps it out of the app's cold-start path
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+    return (LogisticRegression, RandomForestClassifier, ExtraTreesClassifier, DecisionTreeClassifier)
+
+
+def _unwrap(model):
+    """Split a fitted model into (scale, offset, final estimator)"""
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import MinMaxScaler, StandardScaler
+
+    if not isinstance(model, (Pipeline,) + _supported_estimators()):
+        raise CannotCompile(f"Unsupported model: {type(model).__name__}")
+    n_features = model.n_features_in_
+    scale = np.ones(n_features)
+    offset = np.zeros(n_features)
+
+    if isinstance(model, Pipeline):
+        steps = [step for _, step in model.steps]
+        estimator = steps[-1]
+        for step in steps[:-1]:
+            if step is None or step == "passthrough" or hasattr(step, "fit_resample"):
+                # Samplers such as SMOTE only run while fitting
+                continue
+            if isinstance(step, StandardScaler):
+                step_scale = step.scale_ if step.scale_ is not None else np.ones(n_features)
+                step_mean = step.mean_ if step.mean_ is not None and step.with_mean else np.zeros(n_features)
+                a, b = 1.0 / step_scale, -step_mean / step_scale
+            elif isinstance(step, MinMaxScaler) and not step.clip:
+                a, b = step.scale_, step.min_
+            else:
+                raise CannotCompile(f"Unsupported pipeline step: {type(step).__name__}")
+            scale, offset = scale * a, offset * a + b
+    else:
+        estimator = model
+
+    return scale, offset, estimator
+
+
+def _compile(model) -> SklearnScorer:
+    from sklearn.ensemble import ExtraTreesClassifier, RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.tree import DecisionTreeClassifier
+
+    scale, offset, estimator = _unwrap(model)
+    if len(getattr(estimator, "classes_", [])) != 2:
+        raise CannotCompile("Only binary classifiers are supported")
+
+    if isinstance(estimator, LogisticRegression):
+        return LinearScorer(model, scale, offset, estimator)
+    if isinstance(estimator, (RandomForestClassifier, ExtraTreesClassifier)):
+        return ForestScorer(model, scale, offset, estimator.estimators_)
+    if isinstance(estimator, DecisionTreeClassifier):
+        return ForestScorer(model, scale, offset, [estimator])
+    raise CannotCompile(f"Unsupported estimator: {type(estimator).__name__}")
+
+
+def compile_model(model, check_rows: Optional[np.ndarray] = None) -> SklearnScorer:
+    """Build the fastest scorer that reproduces ``model`` on ``check_rows``"""
+    fallback = SklearnScorer(model)
+    try:
+        scorer = _compile(model)
+    except CannotCompile as e:
+        log.info("ℹ️ Using sklearn scorer: %s", e)
+        return fallback
+    except Exception as e:
+        log.warning("⚠️ Fast-path compile failed, using sklearn scorer: %s", e)
+        return fallback
+
+    if check_rows is not None and len(check_rows):
+        expected = fallback.predict_proba(check_rows)
+        actual = scorer.predict_proba(check_rows)
+        if not np.allclose(actual, expected, atol=1e-9):
+            log.warning("⚠️ Fast-path scorer disagrees with sklearn (max diff %.2e), using sklearn scorer",
+                        np.abs(actual - expected).max())
+            return fallback
+
+    log.info("⚡ Using compiled %s scorer", scorer.kind)
+    return scorer
@@ -0,0 +1,28 @@
+"""Fast JSON encoding for read endpoints.
+
+Returning a plain dict from a route makes FastAPI walk the whole payload with
+``jsonable_encoder`` before ``json.dumps`` encodes it again. Read endpoints
+return a ``FastJSONResponse`` instead, which encodes the database rows once
+with orjson (falling back to the standard library when orjson is not
+installed). ``dumps`` is the same encoder for NDJSON lines.
+"""
+import json
+from typing import Any
+
+from fastapi.responses import JSONResponse
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+    return json.dumps(content, default=str, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+class FastJSONResponse(JSONResponse):
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
@@ -0,0 +1,201 @@
+"""Multi-worker serving with the model loaded once, before fork.
+
+    python serve.py --workers 4 --host 0.0.0.0 --port 8000
+
+``uvicorn main:app --workers N`` starts every worker as a fresh interpreter,
+so each one imports sklearn and FastAPI and unpickles and compiles its own
+copy of the model. Here the parent imports the app and loads the model once,
+binds the port, then forks the workers. They share those pages copy-on-write:
+the fitted trees and the compiled scorer's arrays are never written after
+loading, and ``gc.freeze()`` keeps the collector from touching the objects
+that hold them. ``benchmarks/workers.py`` measures the difference.
+
+WEB_CONCURRENCY sets the default worker count (else one per CPU). The parent
+only supervises: it restarts workers that exit and stops them all on
+SIGTERM/SIGINT.
+
+Still per worker:
+
+* storage: each worker opens its own Supabase client or SQLite connection in
+  warm-up, since sockets and database handles must not cross a fork;
+* the write-behind spool: worker 0 uses SPOOL_PATH and worker i
+  ``<SPOOL_PATH>.<i>``, so a restarted worker drains what its predecessor
+  left;
+* caches, alert streams (see events.py), metrics and shadow-scoring stats;
+  /metrics and the admin endpoints describe whichever worker answered. A
+  profile edit invalidates only the cached copy of the worker that served
+  it, so without REDIS_URL the others can serve the old profile for up to
+  PROFILE_CACHE_TTL seconds (see cache.py);
+* the patient -> CHW routing index (see routing.py): an assignment updates
+  only the index of the worker that handled it. Every other worker can send
+  that patient's alerts to the previous CHW for up to ROUTING_TTL seconds,
+  or ROUTING_REFRESH_SECONDS when ROUTING_TTL is 0.
+
+/api/admin/model/reload reaches only the worker that served it; set
+MODEL_WATCH_SECONDS so every worker picks up a changed MODEL_PATH. A model
+loaded after fork is private to each worker until the server is restarted.
+"""
+import argparse
+import gc
+import logging
+import os
+import signal
+import socket
+import sys
+import time
+from typing import Dict
+
+import uvicorn
+
+from events import AlertBroker
+from logs import configure_from_env, stop_logging
+from registry import load_model
+from spool import Spool
+
+log = logging.getLogger("mamasafe.serve")
+
+# A worker that exits sooner than this after starting is restarted with a delay
+MIN_WORKER_LIFETIME = 5.0
+RESTART_DELAY = 1.0
+
+
+def default_workers() -> int:
+    return int(os.getenv("WEB_CONCURRENCY") or os.cpu_count() or 1)
+
+
+def preload():
+    """Import the app and load its model in this (parent) process"""
+    import main
+    try:
+        main.model_registry.install(load_model(main.model_path, main._equivalence_rows()))
+    except Exception as e:
+        # Each worker then retries during its own warm-up and reports the error there
+        log.exception("❌ Model preload failed: %s", e)
+    if main.spool is not None:
+        # Reopened per worker after fork
+        main.spool.close()
+    return main
+
+
+def bind(host: str, port: int, backlog: int) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(backlog)
+    sock.set_inheritable(True)
+    return sock
+
+
+def _reopen_spool(main, index: int):
+    if main.spool is None:
+        return
+    path = main.SPOOL_PATH if index == 0 else f"{main.SPOOL_PATH}.{index}"
+    main.spool = Spool(path, max_attempts=main.spool.max_attempts,
+                       base_delay=main.spool.base_delay, max_delay=main.spool.max_delay)
+    main.spool_drainer.spool = main.spool
+
+
+def run_worker(main, index: int, sock: socket.socket, args) -> int:
+    """Serve on the inherited socket until told to stop; runs in the forked child"""
+    # uvicorn installs its own handlers; until then a stop signal is ignored
+    # rather than killing the worker without a flush
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    main.log_sampler = configure_from_env()
+    _reopen_spool(main, index)
+    # Event ids name the broker's process, which was the parent's until now
+    main.alert_broker = AlertBroker(main.alert_broker.history_size, main.alert_broker.queue_size)
+    log.info("👷 Worker %d started (pid %d)", index, os.getpid())
+    config = uvicorn.Config(main.app, log_level=args.log_level, timeout_keep_alive=args.keep_alive)
+    try:
+        uvicorn.Server(config).run(sockets=[sock])
+        return 0
+    except SystemExit as e:
+        return e.code if isinstance(e.code, int) else 1
+    except Exception as e:
+        log.exception("❌ Worker %d failed: %s", index, e)
+        return 1
+    finally:
+        stop_logging()
+
+
+class Supervisor:
+    def __init__(self, main, sock: socket.socket, args):
+        self.main = main
+        self.sock = sock
+        self.args = args
+        self.workers: Dict[int, tuple] = {}  # pid -> (index, started at)
+        self.stopping = False
+
+    def spawn(self, index: int):
+        # The log listener thread does not survive fork; stop it around the
+        # fork and start a fresh one on each side
+        stop_logging()
+        pid = os.fork()
+        if pid == 0:
+            os._exit(run_worker(self.main, index, self.sock, self.args))
+        configure_from_env()
+        self.workers[pid] = (index, time.monotonic())
+
+    def stop(self, signum, frame):
+        self.stopping = True
+        for pid in list(self.workers):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    def run(self) -> int:
+        for index in range(self.args.workers):
+            self.spawn(index)
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        log.info("🚀 Serving on %s:%d with %d workers", self.args.host, self.args.port, self.args.workers)
+
+        while self.workers:
+            try:
+                pid, status = os.wait()
+            except ChildProcessError:
+                break
+            if pid not in self.workers:
+                continue
+            index, started = self.workers.pop(pid)
+            if self.stopping:
+                continue
+            log.warning("⚠️ Worker %d (pid %d) exited with status %d; restarting",
+                        index, pid, os.waitstatus_to_exitcode(status))
+            if time.monotonic() - started < MIN_WORKER_LIFETIME:
+                time.sleep(RESTART_DELAY)
+            if not self.stopping:
+                self.spawn(index)
+        log.info("👋 All workers stopped")
+        return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default=os.getenv("HOST", "127.0.0.1"))
+    parser.add_argument("--port", type=int, default=int(os.getenv("PORT", "8000")))
+    parser.add_argument("--workers", type=int, default=default_workers(), help="default: WEB_CONCURRENCY, else one per CPU")
+    parser.add_argument("--backlog", type=int, default=2048)
+    parser.add_argument("--keep-alive", type=int, default=5, help="seconds an idle keep-alive connection stays open")
+    parser.add_argument("--log-level", default="info")
+    args = parser.parse_args(argv)
+    if args.workers < 1:
+        parser.error("--workers must be at least 1")
+
+    app_module = preload()
+    sock = bind(args.host, args.port, args.backlog)
+    # Everything allocated so far is shared with the workers; keep the
+    # collector's bookkeeping writes off those pages
+    gc.collect()
+    gc.freeze()
+    try:
+        return Supervisor(app_module, sock, args).run()
+    finally:
+        sock.close()
+        stop_logging()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,172 @@
+"""Durable write-behind spool for prediction results.
+
+In write-behind mode /api/predict answers as soon as the result is scored and
+recorded here, in a local SQLite file. A background ``SpoolDrainer`` then
+pushes entries to Supabase in batches, retrying failed batches with
+exponential backoff. Entries survive a process restart and are picked up by
+the next drainer, so a slow or unreachable database delays persistence
+without losing results or slowing the response.
+"""
+import asyncio
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Awaitable, Callable, Dict, List, Optional
+
+log = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS spool (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS spool_due ON spool (status, next_attempt_at);
+"""
+
+
+class Spool:
+    def __init__(self, path: str, max_attempts: int = 10, base_delay: float = 1.0, max_delay: float = 300.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+
+    def enqueue(self, kind: str, payloads: List[dict]):
+        """Durably record payloads; returns once they are committed to disk"""
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO spool (kind, payload, next_attempt_at, created_at) VALUES (?, ?, ?, ?)",
+                [(kind, json.dumps(p), now, now) for p in payloads],
+            )
+
+    def due(self, limit: int) -> List[dict]:
+        """Oldest pending entries whose backoff has expired"""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, kind, payload, attempts FROM spool "
+                "WHERE status = 'pending' AND next_attempt_at <= ? ORDER BY id LIMIT ?",
+                (time.time(), limit),
+            ).fetchall()
+        return [
+            {"id": row[0], "kind": row[1], "payload": json.loads(row[2]), "attempts": row[3]}
+            for row in rows
+        ]
+
+    def ack(self, ids: List[int]):
+        with self._lock:
+            self._conn.executemany("DELETE FROM spool WHERE id = ?", [(i,) for i in ids])
+
+    def retry(self, entries: List[dict], error: str):
+        """Back off failed entries; ones out of attempts are kept as 'dead'"""
+        now = time.time()
+        updates = []
+        for entry in entries:
+            attempts = entry["attempts"] + 1
+            delay = min(self.base_delay * (2 ** (attempts - 1)), self.max_delay)
+            status = "dead" if attempts >= self.max_attempts else "pending"
+            updates.append((status, attempts, now + delay, error[:500], entry["id"]))
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE spool SET status = ?, attempts = ?, next_attempt_at = ?, last_error = ? WHERE id = ?",
+                updates,
+            )
+
+    def stats(self) -> dict:
+        with self._lock:
+            counts = dict(self._conn.execute("SELECT status, COUNT(*) FROM spool GROUP BY status").fetchall())
+            oldest = self._conn.execute("SELECT MIN(created_at) FROM spool WHERE status = 'pending'").fetchone()[0]
+        return {
+            "path": os.path.abspath(self.path),
+            "pending": counts.get("pending", 0),
+            "dead": counts.get("dead", 0),
+            "oldest_pending_age_s": round(time.time() - oldest, 1) if oldest else 0.0,
+        }
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class SpoolDrainer:
+    """Background task flushing spool entries through per-kind handlers.
+
+    A handler receives every due payload of its kind as one list, so it can
+    write them with a single bulk call. If it raises, the whole group is
+    retried later.
+    """
+
+    def __init__(
+        self,
+        spool: Spool,
+        handlers: Dict[str, Callable[[List[dict]], Awaitable[None]]],
+        batch_size: int = 100,
+        interval: float = 0.5,
+    ):
+        self.spool = spool
+        self.handlers = handlers
+        self.batch_size = batch_size
+        self.interval = interval
+        self.flushed = 0
+        self.failures = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        # Last chance to flush what is due; the rest waits for the next start
+        await self.drain_once()
+
+    async def _run(self):
+        while True:
+            flushed = await self.drain_once()
+            if flushed < self.batch_size:
+                await asyncio.sleep(self.interval)
+
+    async def drain_once(self) -> int:
+        entries = await asyncio.to_thread(self.spool.due, self.batch_size)
+        by_kind: Dict[str, List[dict]] = {}
+        for entry in entries:
+            by_kind.setdefault(entry["kind"], []).append(entry)
+
+        flushed = 0
+        for kind, group in by_kind.items():
+            handler = self.handlers.get(kind)
+            try:
+                if handler is None:
+                    raise RuntimeError(f"No handler for spool entries of kind '{kind}'")
+                await handler([entry["payload"] for entry in group])
+            except Exception as e:
+                self.failures += 1
+                log.warning("⚠️ Spool flush of %d '%s' entries failed: %s", len(group), kind, e)
+                await asyncio.to_thread(self.spool.retry, group, str(e))
+                continue
+            await asyncio.to_thread(self.spool.ack, [entry["id"] for entry in group])
+            flushed += len(group)
+        self.flushed += flushed
+        return flushed
+
+    def stats(self) -> dict:
+        return {"flushed": self.flushed, "failures": self.failures, **self.spool.stats()}
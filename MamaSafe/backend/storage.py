@@ -0,0 +1,617 @@
+"""Storage backends behind the API's reads and writes.
+
+Routes talk to a ``Store`` instead of building Supabase queries themselves.
+Two implementations ship:
+
+* ``SupabaseStore`` issues the same PostgREST queries as before through the
+  shared supabase-py client (executed off the event loop by ``run_query``).
+* ``SqliteStore`` keeps every table in one local SQLite file, so a clinic
+  server on a poor uplink can serve reads and writes at LAN latency. Rows are
+  stored as JSON documents next to indexed key columns (ids, foreign keys,
+  created_at, is_read), and every list query is answered from a
+  ``(key, created_at, id)`` index with the same keyset cursors as Supabase.
+
+Select the backend with STORAGE_BACKEND=supabase|sqlite (see main.py).
+Every backend's calls are counted and timed per table in /metrics.
+"""
+import asyncio
+import functools
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from db import run_query
+from metrics import Counter, Histogram
+from pagination import decode_cursor, encode_cursor, fetch_page
+
+Page = Tuple[List[dict], Optional[str]]
+
+_MISSING = object()
+
+# Fields of the latest prediction embedded in each triage row
+TRIAGE_PREDICTION_COLUMNS = ("id", "risk_level", "risk_percentage", "created_at")
+
+
+def select_clause(columns: Optional[List[str]], embeds: Optional[Dict[str, str]] = None) -> str:
+    """PostgREST select for a sparse fieldset; embeds maps a field to its embed clause"""
+    embeds = embeds or {}
+    if columns is None:
+        return ", ".join(["*", *embeds.values()])
+    return ",".join(embeds.get(column, column) for column in columns)
+
+
+def project(rows: List[dict], columns: Optional[List[str]]) -> List[dict]:
+    """Keep only the requested fields of each row (absent ones are left out, as PostgREST would)"""
+    if columns is None:
+        return rows
+    return [{column: row[column] for column in columns if column in row} for row in rows]
+
+
+STORAGE_CALLS = Counter(
+    "mamasafe_storage_calls_total", "Storage calls by backend, table and operation",
+    ("backend", "table", "operation"),
+)
+STORAGE_ERRORS = Counter(
+    "mamasafe_storage_errors_total", "Failed storage calls by backend, table and operation",
+    ("backend", "table", "operation"),
+)
+STORAGE_SECONDS = Histogram(
+    "mamasafe_storage_call_seconds", "Storage call latency by backend and table",
+    ("backend", "table"),
+)
+
+# Table each Store method reads or writes, used to label its metrics
+METHOD_TABLES = {
+    "insert_predictions": "predictions",
+    "upsert_predictions": "predictions",
+    "list_predictions": "predictions",
+    "page_all_predictions": "predictions",
+    "get_patient": "patients",
+    "update_patient": "patients",
+    "assign_patients": "patients",
+    "page_patients": "patients",
+    "page_health_data": "health_data",
+    "chw_triage": "patients",
+    "get_chw": "chw",
+    "chw_assignments": "patients",
+    "all_chw_assignments": "patients",
+    "insert_notifications": "notifications",
+    "upsert_notifications": "notifications",
+    "page_notifications": "notifications",
+    "count_notifications": "notifications",
+    "mark_notification_read": "notifications",
+}
+
+
+def _instrumented(method, table: str):
+    @functools.wraps(method)
+    async def call(self, *args, **kwargs):
+        labels = {"backend": self.kind, "table": table}
+        STORAGE_CALLS.inc(operation=method.__name__, **labels)
+        started = time.perf_counter()
+        try:
+            return await method(self, *args, **kwargs)
+        except Exception:
+            STORAGE_ERRORS.inc(operation=method.__name__, **labels)
+            raise
+        finally:
+            STORAGE_SECONDS.observe(time.perf_counter() - started, **labels)
+    return call
+
+
+class Store:
+    """Interface every storage backend implements; all methods are coroutines"""
+    kind = "base"
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Every backend gets the same call, error and latency metrics
+        for name, table in METHOD_TABLES.items():
+            if name in cls.__dict__:
+                setattr(cls, name, _instrumented(cls.__dict__[name], table))
+
+    async def insert_predictions(self, rows: List[dict]) -> List[dict]:
+        raise NotImplementedError
+
+    async def upsert_predictions(self, rows: List[dict]) -> None:
+        """Insert, or overwrite rows whose id already exists (retried batches)"""
+        raise NotImplementedError
+
+    async def list_predictions(self, patient_id: str, limit: int, columns: Optional[List[str]] = None) -> List[dict]:
+        """Newest first; ``columns`` narrows each row to those fields (all when None)"""
+        raise NotImplementedError
+
+    async def page_all_predictions(self, cursor: Optional[str], limit: int,
+                                   columns: Optional[List[str]] = None) -> Page:
+        """Every patient's predictions, oldest first after cursor (bulk jobs)"""
+        raise NotImplementedError
+
+    async def get_patient(self, patient_id: str) -> Optional[dict]:
+        """Patient row with its CHW embedded as ``chw`` (id, full_name, phone)"""
+        raise NotImplementedError
+
+    async def update_patient(self, patient_id: str, changes: dict) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def assign_patients(self, chw_id: str, patient_ids: Optional[List[str]] = None,
+                              from_chw_id: Optional[str] = None) -> List[str]:
+        """Point the given patients (or all of from_chw_id's) at chw_id; returns the ids updated"""
+        raise NotImplementedError
+
+    async def page_patients(self, chw_id: str, cursor: Optional[str], limit: int,
+                            columns: Optional[List[str]] = None) -> Page:
+        raise NotImplementedError
+
+    async def page_health_data(self, patient_id: str, cursor: Optional[str], limit: int,
+                               columns: Optional[List[str]] = None, ascending: bool = False) -> Page:
+        """Newest first, or oldest first after cursor with ``ascending`` (for incremental readers)"""
+        raise NotImplementedError
+
+    async def chw_triage(self, chw_id: str) -> List[dict]:
+        """Every patient of chw_id with their latest prediction as ``latest_prediction`` (or None), in one query"""
+        raise NotImplementedError
+
+    async def get_chw(self, chw_id: str) -> Optional[dict]:
+        raise NotImplementedError
+
+    async def chw_assignments(self, patient_ids: List[str]) -> Dict[str, str]:
+        """Assigned CHW of each given patient that has one"""
+        raise NotImplementedError
+
+    async def all_chw_assignments(self) -> List[Tuple[str, str]]:
+        """(patient_id, chw_id) for every assigned patient"""
+        raise NotImplementedError
+
+    async def insert_notifications(self, rows: List[dict]) -> List[dict]:
+        raise NotImplementedError
+
+    async def upsert_notifications(self, rows: List[dict]) -> List[dict]:
+        raise NotImplementedError
+
+    async def page_notifications(self, chw_id: str, cursor: Optional[str], limit: int, unread_only: bool = False,
+                                 since_column: str = "created_at", since: Optional[str] = None,
+                                 columns: Optional[List[str]] = None) -> Page:
+        """Notifications with the patient embedded as ``patient`` (full_name), unless ``columns`` leaves it out"""
+        raise NotImplementedError
+
+    async def count_notifications(self, chw_id: str, unread_only: bool = False,
+                                  since_column: str = "created_at", since: Optional[str] = None) -> int:
+        raise NotImplementedError
+
+    async def mark_notification_read(self, notification_id: str) -> None:
+        raise NotImplementedError
+
+
+class SupabaseStore(Store):
+    kind = "supabase"
+
+    # Page size when bulk-loading assignments for the routing index
+    ASSIGNMENT_PAGE_SIZE = 1000
+    # Patient ids per update when assigning a list of patients
+    ASSIGN_BATCH_SIZE = 100
+
+    def __init__(self, client):
+        self.client = client
+
+    async def insert_predictions(self, rows):
+        response = await run_query(self.client.table('predictions').insert(rows))
+        return list(response.data or [])
+
+    async def upsert_predictions(self, rows):
+        await run_query(self.client.table('predictions').upsert(rows))
+
+    async def list_predictions(self, patient_id, limit, columns=None):
+        response = await run_query(self.client.table('predictions')
+            .select(select_clause(columns))
+            .eq('patient_id', patient_id)
+            .order('created_at', desc=True)
+            .limit(limit))
+        return list(response.data or [])
+
+    async def page_all_predictions(self, cursor, limit, columns=None):
+        def build_query():
+            return self.client.table('predictions').select(select_clause(columns))
+        return await fetch_page(build_query, cursor, limit, ascending=True)
+
+    async def get_patient(self, patient_id):
+        response = await run_query(self.client.table('patients')
+            .select('*, chw:chw_id(id, full_name, phone)')
+            .eq('id', patient_id)
+            .single())
+        return response.data
+
+    async def update_patient(self, patient_id, changes):
+        response = await run_query(self.client.table('patients')
+            .update(changes)
+            .eq('id', patient_id))
+        return response.data[0] if response.data else None
+
+    async def assign_patients(self, chw_id, patient_ids=None, from_chw_id=None):
+        if patient_ids is None:
+            response = await run_query(self.client.table('patients')
+                .update({'chw_id': chw_id})
+                .eq('chw_id', from_chw_id))
+            return [row['id'] for row in (response.data or []) if row.get('id')]
+        # One update per batch keeps each id filter well inside URL length limits
+        updated = []
+        for start in range(0, len(patient_ids), self.ASSIGN_BATCH_SIZE):
+            response = await run_query(self.client.table('patients')
+                .update({'chw_id': chw_id})
+                .in_('id', patient_ids[start:start + self.ASSIGN_BATCH_SIZE]))
+            updated.extend(row['id'] for row in (response.data or []) if row.get('id'))
+        return updated
+
+    async def page_patients(self, chw_id, cursor, limit, columns=None):
+        def build_query():
+            return self.client.table('patients')\
+                .select(select_clause(columns))\
+                .eq('chw_id', chw_id)
+        return await fetch_page(build_query, cursor, limit)
+
+    async def page_health_data(self, patient_id, cursor, limit, columns=None, ascending=False):
+        def build_query():
+            return self.client.table('health_data')\
+                .select(select_clause(columns))\
+                .eq('patient_id', patient_id)
+        return await fetch_page(build_query, cursor, limit, ascending)
+
+    async def chw_triage(self, chw_id):
+        # One-to-many embed cut to the newest prediction per patient
+        response = await run_query(self.client.table('patients')
+            .select(f"*, predictions({','.join(TRIAGE_PREDICTION_COLUMNS)})")
+            .eq('chw_id', chw_id)
+            .order('created_at', desc=True, foreign_table='predictions')
+            .limit(1, foreign_table='predictions'))
+        rows = list(response.data or [])
+        for row in rows:
+            latest = row.pop('predictions', None) or []
+            row['latest_prediction'] = latest[0] if latest else None
+        return rows
+
+    async def get_chw(self, chw_id):
+        response = await run_query(self.client.table('chw')
+            .select('*')
+            .eq('id', chw_id)
+            .single())
+        return response.data
+
+    async def chw_assignments(self, patient_ids):
+        # Read from patients, which assign_patients writes
+        response = await run_query(self.client.table('patients')
+            .select('id,chw_id')
+            .in_('id', patient_ids))
+        return {row['id']: row['chw_id'] for row in (response.data or []) if row.get('chw_id')}
+
+    async def all_chw_assignments(self):
+        # Page through patients by id rather than pulling them in one response
+        pairs = []
+        last_id = None
+        while True:
+            query = self.client.table('patients')\
+                .select('id,chw_id')\
+                .not_.is_('chw_id', 'null')
+            if last_id is not None:
+                query = query.gt('id', last_id)
+            response = await run_query(query.order('id').limit(self.ASSIGNMENT_PAGE_SIZE))
+            rows = list(response.data or [])
+            pairs.extend((row['id'], row['chw_id']) for row in rows)
+            if len(rows) < self.ASSIGNMENT_PAGE_SIZE:
+                return pairs
+            last_id = rows[-1]['id']
+
+    async def insert_notifications(self, rows):
+        response = await run_query(self.client.table('notifications').insert(rows))
+        return response.data if isinstance(response.data, list) else []
+
+    async def upsert_notifications(self, rows):
+        response = await run_query(self.client.table('notifications').upsert(rows))
+        return response.data if isinstance(response.data, list) else []
+
+    def _filter_notifications(self, query, chw_id, unread_only, since_column, since):
+        query = query.eq('chw_id', chw_id)
+        if unread_only:
+            query = query.eq('is_read', False)
+        if since is not None:
+            query = query.gt(since_column, since)
+        return query
+
+    async def page_notifications(self, chw_id, cursor, limit, unread_only=False, since_column="created_at", since=None,
+                                 columns=None):
+        def build_query():
+            return self._filter_notifications(
+                self.client.table('notifications').select(select_clause(columns, {'patient': 'patient:patient_id(full_name)'})),
+                chw_id, unread_only, since_column, since
+            )
+        return await fetch_page(build_query, cursor, limit)
+
+    async def count_notifications(self, chw_id, unread_only=False, since_column="created_at", since=None):
+        # HEAD request with an exact count: no rows are transferred
+        query = self._filter_notifications(
+            self.client.table('notifications').select('id', count='exact', head=True),
+            chw_id, unread_only, since_column, since
+        )
+        response = await run_query(query)
+        return int(response.count or 0)
+
+    async def mark_notification_read(self, notification_id):
+        await run_query(self.client.table('notifications')
+            .update({'is_read': True})
+            .eq('id', notification_id))
+
+
+# Indexed key columns per table; every other field lives in the JSON document
+SQLITE_TABLES = {
+    "chw": ("id", "created_at"),
+    "patients": ("id", "chw_id", "created_at"),
+    "health_data": ("id", "patient_id", "created_at"),
+    "predictions": ("id", "patient_id", "created_at"),
+    "notifications": ("id", "chw_id", "patient_id", "is_read", "created_at"),
+}
+
+SQLITE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS chw (id TEXT PRIMARY KEY, created_at TEXT NOT NULL, data TEXT NOT NULL);
+CREATE TABLE IF NOT EXISTS patients (id TEXT PRIMARY KEY, chw_id TEXT, created_at TEXT NOT NULL, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS patients_by_chw ON patients (chw_id, created_at, id);
+CREATE TABLE IF NOT EXISTS health_data (id TEXT PRIMARY KEY, patient_id TEXT, created_at TEXT NOT NULL, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS health_data_by_patient ON health_data (patient_id, created_at, id);
+CREATE TABLE IF NOT EXISTS predictions (id TEXT PRIMARY KEY, patient_id TEXT, created_at TEXT NOT NULL, data TEXT NOT NULL);
+CREATE INDEX IF NOT EXISTS predictions_by_patient ON predictions (patient_id, created_at, id);
+CREATE INDEX IF NOT EXISTS predictions_by_time ON predictions (created_at, id);
+CREATE TABLE IF NOT EXISTS notifications (
+    id TEXT PRIMARY KEY, chw_id TEXT, patient_id TEXT, is_read INTEGER NOT NULL DEFAULT 0,
+    created_at TEXT NOT NULL, data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notifications_by_chw ON notifications (chw_id, created_at, id);
+CREATE INDEX IF NOT EXISTS notifications_unread ON notifications (chw_id, is_read, created_at, id);
+"""
+
+
+class SqliteStore(Store):
+    kind = "sqlite"
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SQLITE_SCHEMA)
+
+    # ---- synchronous core, run on a worker thread by the coroutines below
+
+    @staticmethod
+    def _key_values(table: str, row: dict) -> tuple:
+        values = []
+        for column in SQLITE_TABLES[table]:
+            value = row.get(column)
+            values.append(int(bool(value)) if column == "is_read" else value)
+        return tuple(values)
+
+    def _put(self, table: str, rows: Iterable[dict]):
+        columns = SQLITE_TABLES[table] + ("data",)
+        self._conn.executemany(
+            f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            [self._key_values(table, row) + (json.dumps(row, default=str),) for row in rows],
+        )
+
+    def _select(self, table: str, where: str, params: tuple = (), suffix: str = "") -> List[dict]:
+        rows = self._conn.execute(f"SELECT data FROM {table} WHERE {where} {suffix}", params).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def write(self, table: str, rows: List[dict], upsert: bool = False) -> List[dict]:
+        """Insert rows (filling id and created_at); with upsert, merge into existing ids"""
+        now = datetime.now(timezone.utc).isoformat()
+        written = []
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                for row in rows:
+                    existing = self._select(table, "id = ?", (row["id"],)) if upsert and row.get("id") else []
+                    base = existing[0] if existing else {"id": str(uuid.uuid4()), "created_at": now}
+                    written.append({**base, **row})
+                self._put(table, written)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return written
+
+    def update(self, table: str, where: str, params: tuple, changes: dict) -> List[dict]:
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                rows = [{**row, **changes} for row in self._select(table, where, params)]
+                self._put(table, rows)
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return rows
+
+    def query(self, table: str, where: str, params: tuple = (), suffix: str = "") -> List[dict]:
+        with self._lock:
+            return self._select(table, where, params, suffix)
+
+    def count(self, table: str, where: str, params: tuple = ()) -> int:
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {table} WHERE {where}", params).fetchone()[0]
+
+    def page(self, table: str, where: str, params: tuple, cursor: Optional[str], limit: int,
+             ascending: bool = False) -> Page:
+        """Keyset page over (created_at, id), descending unless ascending, like pagination.fetch_page"""
+        op, direction = (">", "ASC") if ascending else ("<", "DESC")
+        if cursor:
+            created_at, row_id = decode_cursor(cursor)
+            where += f" AND (created_at {op} ? OR (created_at = ? AND id {op} ?))"
+            params += (created_at, created_at, row_id)
+        rows = self.query(table, where, params + (limit + 1,), f"ORDER BY created_at {direction}, id {direction} LIMIT ?")
+        if len(rows) > limit:
+            rows = rows[:limit]
+            return rows, encode_cursor(rows[-1])
+        return rows, None
+
+    @staticmethod
+    def _column(table: str, column: str) -> str:
+        """SQL expression for a column: the indexed one, or a JSON field"""
+        if column in SQLITE_TABLES[table]:
+            return column
+        if not column.replace("_", "").isalnum():
+            raise ValueError(f"Invalid column name: {column}")
+        return f"json_extract(data, '$.{column}')"
+
+    def _notification_filter(self, chw_id, unread_only, since_column, since) -> Tuple[str, tuple]:
+        where, params = "chw_id = ?", (chw_id,)
+        if unread_only:
+            where += " AND is_read = 0"
+        if since is not None:
+            where += f" AND {self._column('notifications', since_column)} > ?"
+            params += (since,)
+        return where, params
+
+    def load(self, table: str, rows: List[dict]):
+        """Bulk-load rows as they are (e.g. from a Supabase export); existing ids are replaced"""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._put(table, rows)
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    # ---- Store interface
+
+    async def insert_predictions(self, rows):
+        return await asyncio.to_thread(self.write, "predictions", rows)
+
+    async def upsert_predictions(self, rows):
+        await asyncio.to_thread(self.write, "predictions", rows, True)
+
+    async def list_predictions(self, patient_id, limit, columns=None):
+        rows = await asyncio.to_thread(
+            self.query, "predictions", "patient_id = ?", (patient_id, limit), "ORDER BY created_at DESC, id DESC LIMIT ?"
+        )
+        return project(rows, columns)
+
+    async def page_all_predictions(self, cursor, limit, columns=None):
+        rows, next_cursor = await asyncio.to_thread(self.page, "predictions", "1 = 1", (), cursor, limit, True)
+        return project(rows, columns), next_cursor
+
+    def _get_patient(self, patient_id):
+        rows = self.query("patients", "id = ?", (patient_id,))
+        if not rows:
+            return None
+        patient = rows[0]
+        chw = self.query("chw", "id = ?", (patient.get("chw_id"),)) if patient.get("chw_id") else []
+        patient["chw"] = {key: chw[0].get(key) for key in ("id", "full_name", "phone")} if chw else None
+        return patient
+
+    async def get_patient(self, patient_id):
+        return await asyncio.to_thread(self._get_patient, patient_id)
+
+    async def update_patient(self, patient_id, changes):
+        rows = await asyncio.to_thread(self.update, "patients", "id = ?", (patient_id,), changes)
+        return rows[0] if rows else None
+
+    async def assign_patients(self, chw_id, patient_ids=None, from_chw_id=None):
+        if patient_ids is not None:
+            where, params = f"id IN ({', '.join('?' * len(patient_ids))})", tuple(patient_ids)
+        else:
+            where, params = "chw_id = ?", (from_chw_id,)
+        rows = await asyncio.to_thread(self.update, "patients", where, params, {"chw_id": chw_id})
+        return [row["id"] for row in rows]
+
+    async def page_patients(self, chw_id, cursor, limit, columns=None):
+        rows, next_cursor = await asyncio.to_thread(self.page, "patients", "chw_id = ?", (chw_id,), cursor, limit)
+        return project(rows, columns), next_cursor
+
+    async def page_health_data(self, patient_id, cursor, limit, columns=None, ascending=False):
+        rows, next_cursor = await asyncio.to_thread(
+            self.page, "health_data", "patient_id = ?", (patient_id,), cursor, limit, ascending
+        )
+        return project(rows, columns), next_cursor
+
+    def _chw_triage(self, chw_id):
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT p.data, (SELECT pr.data FROM predictions pr WHERE pr.patient_id = p.id"
+                " ORDER BY pr.created_at DESC, pr.id DESC LIMIT 1) FROM patients p WHERE p.chw_id = ?",
+                (chw_id,),
+            ).fetchall()
+        caseload = []
+        for patient, latest in rows:
+            patient = json.loads(patient)
+            patient["latest_prediction"] = project([json.loads(latest)], list(TRIAGE_PREDICTION_COLUMNS))[0] if latest else None
+            caseload.append(patient)
+        return caseload
+
+    async def chw_triage(self, chw_id):
+        return await asyncio.to_thread(self._chw_triage, chw_id)
+
+    async def get_chw(self, chw_id):
+        rows = await asyncio.to_thread(self.query, "chw", "id = ?", (chw_id,))
+        return rows[0] if rows else None
+
+    def _chw_assignments(self, patient_ids):
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, chw_id FROM patients WHERE chw_id IS NOT NULL AND id IN ({', '.join('?' * len(patient_ids))})",
+                tuple(patient_ids),
+            ).fetchall()
+        return dict(rows)
+
+    async def chw_assignments(self, patient_ids):
+        if not patient_ids:
+            return {}
+        return await asyncio.to_thread(self._chw_assignments, list(patient_ids))
+
+    def _all_chw_assignments(self):
+        with self._lock:
+            return [tuple(row) for row in self._conn.execute("SELECT id, chw_id FROM patients WHERE chw_id IS NOT NULL")]
+
+    async def all_chw_assignments(self):
+        return await asyncio.to_thread(self._all_chw_assignments)
+
+    async def insert_notifications(self, rows):
+        return await asyncio.to_thread(self.write, "notifications", rows)
+
+    async def upsert_notifications(self, rows):
+        return await asyncio.to_thread(self.write, "notifications", rows, True)
+
+    def _page_notifications(self, chw_id, cursor, limit, unread_only, since_column, since, columns):
+        where, params = self._notification_filter(chw_id, unread_only, since_column, since)
+        rows, next_cursor = self.page("notifications", where, params, cursor, limit)
+        if columns is not None and "patient" not in columns:
+            return project(rows, columns), next_cursor
+        names = self._patient_names({row.get("patient_id") for row in rows if row.get("patient_id")})
+        for row in rows:
+            name = names.get(row.get("patient_id"), _MISSING)
+            row["patient"] = None if name is _MISSING else {"full_name": name}
+        return project(rows, columns), next_cursor
+
+    def _patient_names(self, patient_ids) -> Dict[str, Optional[str]]:
+        if not patient_ids:
+            return {}
+        with self._lock:
+            rows = self._conn.execute(
+                f"SELECT id, json_extract(data, '$.full_name') FROM patients WHERE id IN ({', '.join('?' * len(patient_ids))})",
+                tuple(patient_ids),
+            ).fetchall()
+        return dict(rows)
+
+    async def page_notifications(self, chw_id, cursor, limit, unread_only=False, since_column="created_at", since=None,
+                                 columns=None):
+        return await asyncio.to_thread(
+            self._page_notifications, chw_id, cursor, limit, unread_only, since_column, since, columns
+        )
+
+    async def count_notifications(self, chw_id, unread_only=False, since_column="created_at", since=None):
+        where, params = self._notification_filter(chw_id, unread_only, since_column, since)
+        return await asyncio.to_thread(self.count, "notifications", where, params)
+
+    async def mark_notification_read(self, notification_id):
+        await asyncio.to_thread(self.update, "notifications", "id = ?", (notification_id,), {"is_read": True})
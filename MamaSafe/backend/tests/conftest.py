@@ -10,7 +10,13 @@ import numpy as np
 # Add parent directory to path so pytest can find "main.py"
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import main
 from main import app  # import your FastAPI app
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from artifacts import write_artifact
+from storage import SqliteStore
 
 
 # ------------------------------
@@ -158,13 +164,48 @@ def sample_notification():
     }
 
 
+# ------------------------------
+# STORAGE, MODELS AND ADMIN
+# ------------------------------
+
+@pytest.fixture
+def sqlite_store(tmp_path):
+    """Empty SQLite store in a temporary file"""
+    store = SqliteStore(str(tmp_path / "mamasafe.sqlite3"))
+    yield store
+    store.close()
+
+
+@pytest.fixture
+def model_artifacts(tmp_path):
+    """Two small models written as train.py artifacts to tmp_path; returns their manifest paths"""
+    rng = np.random.default_rng(0)
+    X = rng.uniform([18, 80, 40, 40], [50, 200, 130, 400], size=(200, 4))
+    y = (X[:, 3] > 150).astype(int)
+    paths = []
+    for C in (1.0, 0.001):
+        model = Pipeline([("scaler", StandardScaler()), ("classifier", LogisticRegression(C=C))]).fit(X, y)
+        paths.append(write_artifact(model, {"best": {"cv": {"f1": 1.0}}}, str(tmp_path))[1])
+    return paths
+
+
+@pytest.fixture
+def admin_headers():
+    """Headers for the admin endpoints, which are enabled for the test"""
+    with patch('main.ADMIN_TOKEN', 'secret'):
+        yield {"X-Admin-Token": "secret"}
+
+
 # ------------------------------
 # AUTO RESET MOCKS
 # ------------------------------
 
 @pytest.fixture(autouse=True)
 def reset_mocks(mock_model, mock_supabase):
-    """Reset mocks after each test"""
+    """Reset mocks and caches after each test"""
     yield
     mock_model.reset_mock()
     mock_supabase.reset_mock()
+    main.profile_cache.clear()
+    main.trend_analyzer.clear()
+    main.idempotency_store.clear()
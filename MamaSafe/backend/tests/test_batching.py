@@ -0,0 +1,39 @@
+# tests/test_batching.py
+import asyncio
+import time
+import numpy as np
+import pytest
+from unittest.mock import MagicMock
+from batching import MicroBatcher, BatcherOverloaded
+async def test_concurrent_requests_share_one_call():
+    """Requests arriving within the window are scored together"""
+    score_fn = MagicMock(side_effect=lambda X: np.column_stack([1 - X[:, 0] / 10, X[:, 0] / 10]))
+    batcher = MicroBatcher(score_fn, window_ms=50, max_batch_size=8)
+    rows = [np.array([float(i), 0, 0, 0]) for i in range(4)]
+    results = await asyncio.gather(*(batcher.submit(row) for row in rows))
+    await batcher.stop()
+    assert score_fn.call_count == 1
+    assert [round(r[1], 1) for r in results] == [0.0, 0.1, 0.2, 0.3]
+    assert batcher.stats()["batch_size_histogram"]["4"] == 1
+async def test_batch_is_capped_at_max_size():
+    """A full batch is dispatched without waiting for the window"""
+    score_fn = MagicMock(side_effect=lambda X: np.tile([0.5, 0.5], (len(X), 1)))
+    batcher = MicroBatcher(score_fn, window_ms=50, max_batch_size=2)
+    await asyncio.gather(*(batcher.submit(np.zeros(4)) for _ in range(5)))
+    await batcher.stop()
+    assert [len(call.args[0]) for call in score_fn.call_args_list] == [2, 2, 1]
+async def test_queue_depth_is_bounded():
+    """Requests beyond the queue depth are rejected"""
+    def slow_score(X):
+        time.sleep(0.05)
+        return np.tile([0.5, 0.5], (len(X), 1))
+    batcher = MicroBatcher(slow_score, window_ms=0, max_batch_size=1, max_queue_depth=1)
+    in_flight = asyncio.ensure_future(batcher.submit(np.zeros(4)))
+    await asyncio.sleep(0.01)  # picked up by the worker
+    queued = asyncio.ensure_future(batcher.submit(np.zeros(4)))
+    await asyncio.sleep(0.01)  # waiting in the queue
+    with pytest.raises(BatcherOverloaded):
+        await batcher.submit(np.zeros(4))
+    await asyncio.gather(in_flight, queued)
+    await batcher.stop()
+    assert batcher.stats()["rejected"] == 1
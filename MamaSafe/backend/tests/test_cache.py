@@ -0,0 +1,95 @@
+# tests/test_cache.py
+import asyncio
+import sys
+import time
+from types import SimpleNamespace
+from unittest.mock import patch
+from cache import TTLCache, ReadThroughCache
+def test_ttl_cache_evicts_least_recently_used():
+    """The least recently used entry is evicted when full"""
+    cache = TTLCache(maxsize=2, ttl=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.evictions == 1
+def test_ttl_cache_expires_entries():
+    """Entries older than the TTL are treated as misses"""
+    cache = TTLCache(ttl=0.01)
+    cache.set("a", 1)
+    time.sleep(0.02)
+    assert cache.get("a") is None
+    assert cache.expirations == 1
+async def test_read_through_loads_once_and_invalidates():
+    """Loader runs on a miss only, and again after invalidation"""
+    cache = ReadThroughCache()
+    loads = []
+    async def loader():
+        loads.append(1)
+        return {"id": "patient-1"}
+    await cache.get_or_load("patient:1", loader)
+    await cache.get_or_load("patient:1", loader)
+    await cache.invalidate("patient:1")
+    await cache.get_or_load("patient:1", loader)
+    assert len(loads) == 2
+    assert (cache.stats()["hits"], cache.stats()["misses"]) == (1, 2)
+async def test_read_through_does_not_cache_missing_rows():
+    """A loader returning None is retried on the next lookup"""
+    cache = ReadThroughCache()
+    async def loader():
+        return None
+    await cache.get_or_load("chw:1", loader)
+    await cache.get_or_load("chw:1", loader)
+    assert cache.stats()["misses"] == 2
+async def test_load_racing_an_invalidation_is_not_cached():
+    """A lookup that read the row before invalidate() returns it without caching it"""
+    cache = ReadThroughCache()
+    profile = {"name": "before"}
+    read = asyncio.Event()
+    release = asyncio.Event()
+    async def slow_loader():
+        value = dict(profile)
+        read.set()
+        await release.wait()
+        return value
+    in_flight = asyncio.ensure_future(cache.get_or_load("patient:1", slow_loader))
+    await read.wait()
+    profile["name"] = "after"
+    await cache.invalidate("patient:1")
+    release.set()
+    assert (await in_flight)["name"] == "before"
+    async def loader():
+        return dict(profile)
+    assert (await cache.get_or_load("patient:1", loader))["name"] == "after"
+    assert cache.stats()["stale_loads"] == 1
+
+class SharedStore:
+    """In-memory stand-in for the Redis client two workers share"""
+    def __init__(self):
+        self.data = {}
+    async def get(self, key):
+        return self.data.get(key)
+    async def set(self, key, value, ex=None):
+        self.data[key] = value
+    async def delete(self, *keys):
+        for key in keys:
+            self.data.pop(key, None)
+async def test_shared_store_bounds_staleness_in_other_workers():
+    """Another worker's in-process copy expires after local_ttl, not ttl"""
+    store = SharedStore()
+    redis = SimpleNamespace(from_url=lambda url: store)
+    with patch.dict(sys.modules, {"redis": SimpleNamespace(asyncio=redis), "redis.asyncio": redis}):
+        editor = ReadThroughCache(ttl=300, redis_url="redis://cache", local_ttl=0.01)
+        other = ReadThroughCache(ttl=300, redis_url="redis://cache", local_ttl=0.01)
+    profile = {"name": "before"}
+    async def loader():
+        return dict(profile)
+    await other.get_or_load("patient:1", loader)
+    profile["name"] = "after"
+    await editor.invalidate("patient:1")
+    assert (await other.get_or_load("patient:1", loader))["name"] == "before"
+    time.sleep(0.02)
+    assert (await other.get_or_load("patient:1", loader))["name"] == "after"
+    assert other.stats()["ttl_s"] == 300 and other.stats()["local_ttl_s"] == 0.01
\ No newline at end of file
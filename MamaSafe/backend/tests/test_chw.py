@@ -2,6 +2,8 @@
 # tests/test_chw.py
 from fastapi.testclient import TestClient
 from tests.mocks.mock_data import MockData as M
+from unittest.mock import MagicMock, patch
+import main
 def test_get_chw_details(client: TestClient):
     """Test GET /api/chw/{chw_id}"""
     resp = client.get(f"/api/chw/{M.CHW_ID}")
@@ -20,3 +22,35 @@ def test_assign_patient_to_chw(client: TestClient):
     resp = client.post(f"/api/chw/{M.CHW_ID}/assign-patient?patient_id={M.PATIENT_ID}")
     # May succeed or fail depending on database state
     assert resp.status_code in [200, 404, 500]
+def test_bulk_assign_patients(client: TestClient, mock_supabase):
+    """Test POST /api/chw/{chw_id}/assign-patients updates all ids in one call"""
+    update = mock_supabase.table.return_value.update.return_value
+    update.in_.return_value = update
+    with patch.object(update, "execute", return_value=MagicMock(data=[{"id": M.PATIENT_ID}])):
+        resp = client.post(f"/api/chw/{M.CHW_ID}/assign-patients",
+                           json={"patient_ids": [M.PATIENT_ID, M.PATIENT_ID_2]})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["assigned"], data["not_found"]) == (1, 1)
+    assert {r["patient_id"]: r["status"] for r in data["results"]} == {
+        M.PATIENT_ID: "assigned", M.PATIENT_ID_2: "not_found"}
+    update.in_.assert_called_once_with('id', [M.PATIENT_ID, M.PATIENT_ID_2])
+    assert main.routing_index.lookup(M.PATIENT_ID) == M.CHW_ID
+    main.routing_index.assign(M.PATIENT_ID, None)
+def test_bulk_move_caseload(client: TestClient, mock_supabase):
+    """Test moving every patient from one CHW to another"""
+    resp = client.post(f"/api/chw/{M.CHW_ID}/assign-patients", json={"from_chw_id": "chw-old"})
+    assert resp.status_code == 200
+    mock_supabase.table.return_value.update.return_value.eq.assert_called_with('chw_id', 'chw-old')
+def test_bulk_assign_requires_one_mode(client: TestClient):
+    """Test patient_ids and from_chw_id are mutually exclusive"""
+    resp = client.post(f"/api/chw/{M.CHW_ID}/assign-patients",
+                       json={"patient_ids": [M.PATIENT_ID], "from_chw_id": "chw-old"})
+    assert resp.status_code == 422
+    assert client.post(f"/api/chw/{M.CHW_ID}/assign-patients", json={}).status_code == 422
+def test_chw_triage_is_one_query(client: TestClient, mock_supabase):
+    """Test GET /api/chw/{chw_id}/triage embeds the latest prediction instead of a query per patient"""
+    resp = client.get(f"/api/chw/{M.CHW_ID}/triage")
+    assert resp.status_code == 200
+    assert "predictions(" in mock_supabase.table.return_value.select.call_args.args[0]
+    assert client.get(f"/api/chw/{M.CHW_ID}/triage?cursor=garbage").status_code == 400
\ No newline at end of file
@@ -0,0 +1,25 @@
+# tests/test_db.py
+import asyncio
+import threading
+import time
+from unittest.mock import MagicMock
+from db import run_query
+async def test_run_query_returns_response():
+    """run_query hands back whatever execute() returns"""
+    query = MagicMock()
+    query.execute.return_value = MagicMock(data=[{"id": "row-1"}])
+    response = await run_query(query)
+    assert response.data == [{"id": "row-1"}]
+    query.execute.assert_called_once()
+async def test_run_query_does_not_block_event_loop():
+    """Slow queries run off the event loop and overlap each other"""
+    main_thread = threading.get_ident()
+    threads = []
+    def slow_execute():
+        threads.append(threading.get_ident())
+        time.sleep(0.1)
+    queries = [MagicMock(execute=slow_execute) for _ in range(4)]
+    start = time.perf_counter()
+    await asyncio.gather(*(run_query(q) for q in queries))
+    assert time.perf_counter() - start < 0.3
+    assert main_thread not in threads
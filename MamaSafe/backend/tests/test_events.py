@@ -0,0 +1,46 @@
+# tests/test_events.py
+from fastapi.testclient import TestClient
+from tests.mocks.mock_data import MockData as M
+from events import OVERFLOW, AlertBroker, format_sse
+import main
+async def test_published_alert_reaches_subscriber():
+    """A CHW's open stream receives alerts published on its channel only"""
+    broker = AlertBroker()
+    with broker.subscribe("chw-1") as (missed, queue):
+        broker.publish("chw-2", {"title": "other"})
+        event_id = broker.publish("chw-1", {"title": "High Risk"})
+        assert missed == []
+        event = queue.get_nowait()
+    assert event == {"id": event_id, "data": {"title": "High Risk"}}
+    assert queue.empty()
+    assert broker.stats()["subscribers"] == 0
+def test_reconnect_replays_missed_alerts():
+    """Events after Last-Event-ID are replayed; unknown ids replay nothing"""
+    broker = AlertBroker()
+    first = broker.publish("chw-1", {"n": 1})
+    broker.publish("chw-1", {"n": 2})
+    broker.publish("chw-1", {"n": 3})
+    assert [e["data"]["n"] for e in broker.replay("chw-1", first)] == [2, 3]
+    assert broker.replay("chw-1", "0-1") == []
+async def test_slow_subscriber_is_cut_off():
+    """A full queue is replaced by an overflow marker so the client resumes"""
+    broker = AlertBroker(queue_size=1)
+    with broker.subscribe("chw-1") as (_, queue):
+        broker.publish("chw-1", {"n": 1})
+        broker.publish("chw-1", {"n": 2})
+        assert queue.get_nowait() is OVERFLOW
+def test_format_sse():
+    """Events are framed as id/event/data lines"""
+    assert format_sse({"id": "1-1", "data": {"a": 1}}) == 'id: 1-1\nevent: notification\ndata: {"a": 1}\n\n'
+def test_send_notification_is_pushed(client: TestClient):
+    """Test POST /api/notifications/send publishes to the CHW's stream"""
+    published = main.alert_broker.published
+    resp = client.post("/api/notifications/send", json={
+        "chw_id": M.CHW_ID,
+        "patient_id": M.PATIENT_ID,
+        "title": "Test Alert",
+        "message": "Test message"
+    })
+    assert resp.status_code == 200
+    assert main.alert_broker.published == published + 1
+    assert main.alert_broker.replay(M.CHW_ID, f"{main.alert_broker.boot}-0")[-1]["data"]["chw_id"] == M.CHW_ID
@@ -1,5 +1,9 @@
 # tests/test_health.py
 from fastapi.testclient import TestClient
+import os
+import subprocess
+import sys
+import pytest
 def test_root_endpoint(client: TestClient):
     # """Test GET / returns API information"""
     resp = client.get("/")
@@ -24,4 +28,17 @@ def test_health_check_supabase_connected(client: TestClient):
     #"""Test health check shows Supabase status"""
     resp = client.get("/api/health")
     data = resp.json()
-    assert data["supabase_status"] in ["connected", "failed"]
\ No newline at end of file
+    assert data["supabase_status"] in ["connected", "failed"]
+def test_readiness_check(client: TestClient):
+    #"""Test GET /api/health/ready reports warm-up state"""
+    resp = client.get("/api/health/ready")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["status"] == "ready"
+    assert data["warmup"]["status"] == "ready"
+@pytest.mark.slow
+def test_import_does_no_startup_io():
+    #"""Importing main must not load the model or connect to Supabase"""
+    code = "import main; assert main.model is None and main.supabase is None"
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    subprocess.run([sys.executable, "-c", code], cwd=backend_dir, check=True, timeout=30)
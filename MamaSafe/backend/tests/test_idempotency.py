@@ -0,0 +1,60 @@
+# tests/test_idempotency.py
+import asyncio
+import pytest
+from idempotency import IdempotencyStore, KeyReused, fingerprint
+async def test_concurrent_retry_waits_for_the_original():
+    """A retry arriving while the original runs gets its response instead of running again"""
+    store = IdempotencyStore()
+    calls = []
+    release = asyncio.Event()
+    async def handler():
+        calls.append(1)
+        await release.wait()
+        return {"prediction_id": "p-1"}
+    first = asyncio.create_task(store.run("key-1", fingerprint({"a": 1}), handler))
+    await asyncio.sleep(0)
+    second = asyncio.create_task(store.run("key-1", fingerprint({"a": 1}), handler))
+    await asyncio.sleep(0)
+    release.set()
+    assert await first == ({"prediction_id": "p-1"}, False)
+    assert await second == ({"prediction_id": "p-1"}, True)
+    assert await store.run("key-1", fingerprint({"a": 1}), handler) == ({"prediction_id": "p-1"}, True)
+    assert len(calls) == 1
+    assert (store.stats()["waited"], store.stats()["replayed"]) == (1, 1)
+    with pytest.raises(KeyReused):
+        await store.run("key-1", fingerprint({"a": 2}), handler)
+async def test_failed_requests_are_not_stored():
+    """An error is passed on, and the next retry runs the handler again"""
+    store = IdempotencyStore()
+    outcomes = [RuntimeError("database down"), {"prediction_id": "p-2"}]
+    async def handler():
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    with pytest.raises(RuntimeError):
+        await store.run("key-2", "fp", handler)
+    assert await store.run("key-2", "fp", handler) == ({"prediction_id": "p-2"}, False)
+    assert store.stats()["size"] == 1
+async def test_cancelled_original_releases_the_key():
+    """When the original is cancelled, one waiting retry runs the request and the other waits for it"""
+    store = IdempotencyStore()
+    calls = []
+    release = asyncio.Event()
+    async def handler():
+        calls.append(1)
+        await release.wait()
+        return {"prediction_id": f"p-{len(calls)}"}
+    first = asyncio.create_task(store.run("key-3", "fp", handler))
+    await asyncio.sleep(0)
+    retries = [asyncio.create_task(store.run("key-3", "fp", handler)) for _ in range(2)]
+    await asyncio.sleep(0)
+    first.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await first
+    await asyncio.sleep(0)
+    release.set()
+    results = await asyncio.gather(*retries)
+    assert sorted(results, key=lambda r: r[1]) == [({"prediction_id": "p-2"}, False), ({"prediction_id": "p-2"}, True)]
+    assert len(calls) == 2
+    assert store.stats()["in_flight"] == 0
\ No newline at end of file
@@ -0,0 +1,35 @@
+# tests/test_logs.py
+import json
+import logging
+from fastapi.testclient import TestClient
+from logs import ContextFilter, JsonFormatter, RequestSampler, bind_request, parse_sample_rates
+def _record(level=logging.INFO, msg="hello %s", args=("world",), **extra):
+    record = logging.LogRecord("mamasafe", level, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+def test_sample_rates_use_longest_prefix():
+    """A more specific prefix overrides a shorter one; other paths use the default"""
+    sampler = RequestSampler(parse_sample_rates("/api/predict=0, /api/predict/batch=1"), default=0.5)
+    assert sampler.rate("/api/predict") == 0.0
+    assert sampler.rate("/api/predict/batch") == 1.0
+    assert sampler.rate("/api/chw/1") == 0.5
+    assert sampler.sample("/api/predict") is False
+def test_unsampled_request_keeps_only_warnings():
+    """Info lines of an unsampled request are dropped, warnings are not"""
+    bind_request("/api/health", "req-1", RequestSampler({"/api/health": 0.0}))
+    context = ContextFilter()
+    assert context.filter(_record(logging.INFO)) is False
+    warning = _record(logging.WARNING)
+    assert context.filter(warning) is True
+    assert warning.request_id == "req-1"
+def test_json_line_has_request_id_and_extras():
+    """Each record is one JSON object with its request id and extra fields"""
+    record = _record(request_id="req-2", patient_id="patient-1")
+    entry = json.loads(JsonFormatter().format(record))
+    assert entry["msg"] == "hello world"
+    assert (entry["level"], entry["request_id"], entry["patient_id"]) == ("info", "req-2", "patient-1")
+def test_request_id_is_echoed(client: TestClient):
+    """Test every response carries the request id its log lines were tagged with"""
+    resp = client.get("/api/health", headers={"X-Request-ID": "trace-abc"})
+    assert resp.headers["x-request-id"] == "trace-abc"
+    assert len(client.get("/api/health").headers["x-request-id"]) == 32
\ No newline at end of file
@@ -0,0 +1,47 @@
+# tests/test_metrics.py
+import pytest
+from fastapi.testclient import TestClient
+from metrics import Counter, Histogram, Registry, stage, start_request
+def test_histogram_renders_cumulative_buckets():
+    """Buckets are cumulative and end with +Inf, _sum and _count"""
+    registry = Registry()
+    histogram = Histogram("demo_seconds", "Demo", ("route",), buckets=(0.1, 1.0), registry=registry)
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, route="/a")
+    text = registry.render()
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="1"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'demo_seconds_count{route="/a"} 3' in text
+def test_counter_requires_its_labels():
+    """Missing or unknown labels are rejected instead of silently merged"""
+    counter = Counter("demo_total", "Demo", ("table",), registry=Registry())
+    counter.inc(table='say "hi"')
+    assert counter.value(table='say "hi"') == 1
+    with pytest.raises(ValueError):
+        counter.inc(operation="insert")
+def test_stage_records_into_request_timings():
+    """Timed stages end up in the Server-Timing header, followed by the total"""
+    timings = start_request()
+    with stage("inference"):
+        pass
+    header = timings.header()
+    assert header.startswith("inference;dur=") and ", total;dur=" in header
+def test_predict_reports_server_timing(client: TestClient, sample_prediction_input):
+    """Test POST /api/predict returns a Server-Timing header with its stages"""
+    resp = client.post("/api/predict", json=sample_prediction_input)
+    assert resp.status_code == 200
+    stages = [entry.split(";")[0] for entry in resp.headers["server-timing"].split(", ")]
+    assert stages == ["validation", "inference", "predictions_insert", "total"]
+def test_metrics_endpoint(client: TestClient, sample_prediction_input):
+    """Test GET /metrics exposes route, stage, storage and model metrics"""
+    client.post("/api/predict", json=sample_prediction_input)
+    resp = client.get("/metrics")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("text/plain")
+    text = resp.text
+    assert 'mamasafe_request_duration_seconds_count{method="POST",route="/api/predict",status="200"}' in text
+    assert 'mamasafe_prediction_stage_seconds_count{stage="inference"}' in text
+    assert 'mamasafe_storage_calls_total{backend="supabase",table="predictions",operation="insert_predictions"}' in text
+    assert 'mamasafe_model_info{version="unknown"' in text
+    assert "mamasafe_requests_in_flight" in text
\ No newline at end of file
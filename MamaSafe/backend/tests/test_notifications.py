@@ -2,6 +2,7 @@
 # tests/test_notifications.py
 from fastapi.testclient import TestClient
 from tests.mocks.mock_data import MockData as M
+from unittest.mock import MagicMock, patch
 def test_send_notification(client: TestClient):
     """Test POST /api/notifications/send"""
     notification_data = {
@@ -27,4 +28,21 @@ def test_mark_notification_read(client: TestClient):
     """Test PUT /api/notifications/{notification_id}/mark-read"""
     resp = client.put(f"/api/notifications/{M.NOTIFICATION_ID}/mark-read")
     # May succeed or fail depending on database
-    assert resp.status_code in [200, 404, 500]
\ No newline at end of file
+    assert resp.status_code in [200, 404, 500]
+def test_get_notification_summary(client: TestClient, mock_supabase):
+    """Test GET /api/notifications/{chw_id}/summary counts in the database"""
+    select = mock_supabase.table.return_value.select.return_value
+    with patch.object(select, "execute", return_value=MagicMock(data=[], count=3)):
+        resp = client.get(f"/api/notifications/{M.CHW_ID}/summary")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["count"], data["unread_count"]) == (3, 3)
+    mock_supabase.table.return_value.select.assert_called_with('id', count='exact', head=True)
+def test_get_chw_notifications_since(client: TestClient, mock_supabase):
+    """Test GET /api/notifications/{chw_id}?since= only asks for newer rows"""
+    select = mock_supabase.table.return_value.select.return_value
+    with patch.object(select, "gt", return_value=select) as gt:
+        resp = client.get(f"/api/notifications/{M.CHW_ID}?since=2025-10-30T09:00:00")
+    assert resp.status_code == 200
+    assert resp.json()["next_since"] == "2025-10-30T10:00:00"
+    assert gt.call_args.args == ("created_at", "2025-10-30T09:00:00")
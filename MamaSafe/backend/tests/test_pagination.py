@@ -0,0 +1,40 @@
+# tests/test_pagination.py
+import json
+import pytest
+from unittest.mock import MagicMock
+from fastapi.testclient import TestClient
+from tests.mocks.mock_data import MockData as M
+from pagination import InvalidCursor, decode_cursor, encode_cursor, fetch_page
+def _query_returning(pages):
+    """Mock postgrest query whose execute() returns the given pages in turn"""
+    query = MagicMock()
+    for method in ("or_", "order", "limit"):
+        getattr(query, method).return_value = query
+    query.execute.side_effect = [MagicMock(data=page) for page in pages]
+    return query
+def test_cursor_round_trip():
+    """A cursor encodes the (created_at, id) sort key of a row"""
+    row = {"created_at": "2025-10-30T10:00:00+00:00", "id": "row-9"}
+    assert decode_cursor(encode_cursor(row)) == ("2025-10-30T10:00:00+00:00", "row-9")
+    with pytest.raises(InvalidCursor):
+        decode_cursor("not-a-cursor")
+async def test_fetch_page_returns_next_cursor():
+    """An extra row means another page follows; the cursor filters after the last row"""
+    rows = [{"created_at": f"2025-10-{d:02d}", "id": str(d)} for d in (30, 29, 28)]
+    query = _query_returning([rows, rows[2:]])
+    page, cursor = await fetch_page(lambda: query, None, 2)
+    assert [r["id"] for r in page] == ["30", "29"]
+    page, cursor = await fetch_page(lambda: query, cursor, 2)
+    assert cursor is None
+    assert '2025-10-29' in query.or_.call_args.args[0]
+def test_list_endpoint_rejects_bad_cursor(client: TestClient):
+    """Test GET /api/patients/{patient_id}/health-data with a malformed cursor"""
+    resp = client.get(f"/api/patients/{M.PATIENT_ID}/health-data?cursor=garbage")
+    assert resp.status_code == 400
+def test_list_endpoint_streams_ndjson(client: TestClient):
+    """Test GET /api/notifications/{chw_id}?stream=true yields one JSON row per line"""
+    resp = client.get(f"/api/notifications/{M.CHW_ID}?stream=true")
+    assert resp.status_code == 200
+    assert resp.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in resp.text.splitlines()]
+    assert rows[0]["id"] == "pred-123"
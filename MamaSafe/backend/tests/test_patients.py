@@ -40,3 +40,17 @@ def test_get_patient_health_data(client: TestClient):
     resp = client.get(f"/api/patients/{M.PATIENT_ID}/health-data")
     # May return 200 with data or 404/500 if table doesn't exist
     assert resp.status_code in [200, 404, 500]
+def test_get_patient_is_cached(client: TestClient, mock_supabase):
+    """Test repeated GET /api/patients/{patient_id} is served from the cache"""
+    client.get(f"/api/patients/{M.PATIENT_ID}")
+    client.get(f"/api/patients/{M.PATIENT_ID}")
+    assert mock_supabase.table.call_count == 1
+    stats = client.get("/api/cache/stats").json()["profiles"]
+    assert stats["hits"] >= 1
+def test_update_patient_invalidates_cache(client: TestClient, mock_supabase):
+    """Test PUT /api/patients/{patient_id} drops the cached profile"""
+    client.get(f"/api/patients/{M.PATIENT_ID}")
+    client.put(f"/api/patients/{M.PATIENT_ID}", json={"full_name": "Updated Name"})
+    client.get(f"/api/patients/{M.PATIENT_ID}")
+    tables = [c.args[0] for c in mock_supabase.table.call_args_list]
+    assert tables == ["patients", "patients", "patients"]
@@ -2,6 +2,9 @@
 from fastapi.testclient import TestClient
 from tests.mocks.mock_data import MockData as M
 import pytest
+import numpy as np
+from unittest.mock import patch
+from spool import Spool
 def test_create_prediction_valid(client: TestClient):
     #"""Test POST /api/predict with valid data"""
     resp = client.post("/api/predict", json=M.VALID_PREDICTION_INPUT)  # ✅ Fixed endpoint
@@ -52,4 +55,94 @@ def test_get_latest_prediction(client: TestClient):
     #"""Test GET /api/predictions/latest/{patient_id}"""
     resp = client.get(f"/api/predictions/latest/{M.PATIENT_ID}")
     # May return 200 with data or 404 if no predictions
-    assert resp.status_code in [200, 404]
\ No newline at end of file
+    assert resp.status_code in [200, 404]
+def test_create_batch_prediction(client: TestClient, mock_model, mock_supabase):
+    """Test POST /api/predict/batch scores valid rows together and reports invalid ones"""
+    probabilities = np.array([[0.7, 0.3], [0.2, 0.8]])
+    readings = [M.VALID_PREDICTION_INPUT, M.HIGH_RISK_INPUT, M.INVALID_GLUCOSE]
+    with patch.object(mock_model, "predict_proba", return_value=probabilities) as predict_proba:
+        resp = client.post("/api/predict/batch", json={"readings": readings})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["scored"] == 2
+    assert data["failed"] == 1
+    assert data["errors"][0]["index"] == 2
+    assert [r["risk_level"] for r in data["results"]] == ["Low", "High"]
+    predict_proba.assert_called_once()
+    # All prediction rows go out in a single insert
+    inserted = mock_supabase.table.return_value.insert.call_args_list[0].args[0]
+    assert len(inserted) == 2
+def test_create_batch_prediction_empty(client: TestClient):
+    """Test POST /api/predict/batch rejects an empty batch"""
+    resp = client.post("/api/predict/batch", json={"readings": []})
+    assert resp.status_code == 422
+def test_get_batching_stats(client: TestClient):
+    """Test GET /api/predict/batching reports whether micro-batching is on"""
+    resp = client.get("/api/predict/batching")
+    assert resp.status_code == 200
+    assert "enabled" in resp.json()
+def test_create_prediction_write_behind(client: TestClient, mock_supabase, tmp_path):
+    """Test POST /api/predict answers from the spool without touching the database"""
+    spool = Spool(str(tmp_path / "spool.sqlite3"))
+    with patch("main.spool", spool):
+        resp = client.post("/api/predict", json=M.VALID_PREDICTION_INPUT)
+    assert resp.status_code == 200
+    assert resp.json()["prediction_id"]
+    assert spool.stats()["pending"] == 1
+    mock_supabase.table.assert_not_called()
+    spool.close()
+def test_get_patient_predictions_sparse_fields(client: TestClient, mock_supabase):
+    """Test GET /api/predictions/{patient_id}?fields= selects only the requested columns"""
+    resp = client.get(f"/api/predictions/{M.PATIENT_ID}?fields=risk_level,risk_percentage,created_at")
+    assert resp.status_code == 200
+    mock_supabase.table.return_value.select.assert_called_with("risk_level,risk_percentage,created_at")
+    assert client.get(f"/api/predictions/{M.PATIENT_ID}?fields=risk_level;drop").status_code == 400
+def test_create_visit_predictions(client: TestClient, mock_model):
+    """Test POST /api/predict/visits averages each visit's readings, skipping gaps, and scores all visits at once"""
+    visits = [
+        {"patient_id": M.PATIENT_ID, "age": 29, "blood_pressure_systolic": [108, 125, None],
+         "blood_pressure_diastolic": [58, 65], "blood_glucose": [84, 81, 84]},
+        # Training-data layout, blanks included
+        {"patient_id": M.PATIENT_ID, "AGE": 31, "BP_SYS1": 100, "BP_SYS2": 128, "BP_SYS3": 113, "BP_SYS4": 129,
+         "BP_DYS1": 69, "BP_DYS2": 82, "BP_DYS3": "", "BP_DYS4": "", "BS1": 75, "BS2": 67, "BS3": 84, "BS4": ""},
+        {"patient_id": M.PATIENT_ID, "age": 30, "blood_pressure_systolic": [None],
+         "blood_pressure_diastolic": [70], "blood_glucose": [90]},
+    ]
+    with patch.object(mock_model, "predict_proba", return_value=np.array([[0.7, 0.3], [0.6, 0.4]])) as predict_proba:
+        resp = client.post("/api/predict/visits", json={"visits": visits})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["scored"], data["failed"], data["errors"][0]["index"]) == (2, 1, 2)
+    assert data["results"][0]["averaged"] == {"blood_pressure_systolic": 116.5, "blood_pressure_diastolic": 61.5, "blood_glucose": 83.0}
+    assert data["results"][1]["averaged"]["blood_pressure_systolic"] == 117.5
+    predict_proba.assert_called_once()
+def test_visit_rejects_impossible_single_readings(client: TestClient):
+    """Test POST /api/predict/visits checks every reading, not just the average, and names the bad one"""
+    visits = [
+        {"patient_id": M.PATIENT_ID, "age": 30, "blood_pressure_systolic": [250, 100],
+         "blood_pressure_diastolic": [70], "blood_glucose": [90]},
+        {"patient_id": M.PATIENT_ID, "age": 30, "blood_pressure_systolic": [120],
+         "blood_pressure_diastolic": [70], "blood_glucose": [90, None, 500, 90]},
+    ]
+    resp = client.post("/api/predict/visits", json={"visits": visits})
+    assert resp.status_code == 200
+    data = resp.json()
+    assert (data["scored"], data["failed"]) == (0, 2)
+    first, second = (error["errors"][0] for error in data["errors"])
+    assert first["field"] == "blood_pressure_systolic" and "Reading 0: Systolic BP" in first["message"]
+    assert second["field"] == "blood_glucose" and "Reading 2: Blood glucose" in second["message"]
+def test_create_prediction_idempotency_key(client: TestClient, mock_model, mock_supabase):
+    """Test POST /api/predict replays a retried request without scoring or saving it again"""
+    headers = {"Idempotency-Key": "retry-0001"}
+    first = client.post("/api/predict", json=M.HIGH_RISK_INPUT, headers=headers)
+    assert first.status_code == 200
+    calls = (mock_model.predict_proba.call_count, mock_supabase.table.call_count)
+    assert min(calls) > 0
+    retry = client.post("/api/predict", json=M.HIGH_RISK_INPUT, headers=headers)
+    assert retry.status_code == 200
+    assert retry.json() == first.json()
+    assert retry.headers["Idempotent-Replayed"] == "true"
+    assert (mock_model.predict_proba.call_count, mock_supabase.table.call_count) == calls
+    # Same key, different reading
+    assert client.post("/api/predict", json=M.VALID_PREDICTION_INPUT, headers=headers).status_code == 422
+    assert client.post("/api/predict", json=M.VALID_PREDICTION_INPUT, headers={"Idempotency-Key": ""}).status_code == 400
\ No newline at end of file
@@ -0,0 +1,42 @@
+# tests/test_registry.py
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from tests.mocks.mock_data import MockData as M
+import main
+@pytest.fixture
+def model_dir(model_artifacts, tmp_path):
+    """The two model artifacts, allowed for reload, with the serving model restored afterwards"""
+    serving = dict(model=main.model, scorer=main.scorer, model_version=main.model_version, model_manifest=main.model_manifest)
+    with patch.multiple(main, MODEL_DIR=str(tmp_path), **serving):
+        yield model_artifacts
+    main.model_registry.stop_shadow()
+def test_admin_endpoints_need_token(client: TestClient, model_dir, admin_headers):
+    """Test admin model endpoints reject a missing token and paths outside MODEL_DIR"""
+    assert client.get("/api/admin/model").status_code == 401
+    resp = client.post("/api/admin/model/reload", json={"path": "/etc/passwd"}, headers=admin_headers)
+    assert resp.status_code == 400
+def test_reload_swaps_serving_model(client: TestClient, model_dir, admin_headers):
+    """Test POST /api/admin/model/reload serves the new model without a restart"""
+    resp = client.post("/api/admin/model/reload", json={"path": model_dir[0]}, headers=admin_headers)
+    assert resp.status_code == 200
+    version = resp.json()["model"]["version"]
+    assert main.model_version == version and main.get_scorer().kind == "linear"
+    assert client.post("/api/predict", json=M.VALID_PREDICTION_INPUT).json()["risk_level"] == "Low"
+    assert client.get("/api/health").json()["model_version"] == version
+def test_shadow_model_compares_live_predictions(client: TestClient, model_dir, admin_headers):
+    """Test a shadow model re-scores live predictions off the request path and reports agreement"""
+    client.post("/api/admin/model/reload", json={"path": model_dir[0]}, headers=admin_headers)
+    assert client.post("/api/admin/model/shadow", json={"path": model_dir[1]}, headers=admin_headers).status_code == 200
+    for _ in range(3):
+        client.post("/api/predict", json=M.VALID_PREDICTION_INPUT)
+    deadline = time.monotonic() + 5
+    while time.monotonic() < deadline:
+        stats = client.get("/api/admin/model", headers=admin_headers).json()["shadow_stats"]
+        if stats["compared"] == 3:
+            break
+        time.sleep(0.02)
+    assert stats["compared"] == 3 and stats["agreement"] is not None
+    assert stats["mean_abs_probability_diff"] > 0
+    assert client.delete("/api/admin/model/shadow", headers=admin_headers).json()["shadow_stats"]["compared"] == 3
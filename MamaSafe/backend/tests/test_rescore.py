@@ -0,0 +1,96 @@
+# tests/test_rescore.py
+import time
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from rescore import CheckpointMismatch, RescoreJob
+import main
+OLD = {"risk_level": "Old", "risk_percentage": 0.0, "confidence": 0.0, "factors": "", "recommendations": ""}
+AGES = {"p-1": 30, "p-2": 41}
+def _inputs(i):
+    """Inputs stored with prediction i; p-3's predictions were saved before inputs were kept"""
+    patient_id = f"p-{i % 3 + 1}"
+    if patient_id not in AGES:
+        return {}
+    return {"age": AGES[patient_id], "blood_pressure_systolic": 110 + i, "blood_pressure_diastolic": 70,
+            "blood_glucose": 90 + 10 * i}
+@pytest.fixture
+def predictions_store(sqlite_store, model_artifacts):
+    """The two model artifacts and a store with 3 patients' old-model predictions"""
+    store = sqlite_store
+    # Current ages differ from those the predictions were scored with
+    store.load("patients", [
+        {"id": "p-1", "age": 31, "chw_id": "chw-1", "created_at": "2025-01-01T00:00:00+00:00"},
+        {"id": "p-2", "age": 42, "chw_id": "chw-1", "created_at": "2025-01-01T00:00:00+00:00"},
+        {"id": "p-3", "age": 35, "chw_id": "chw-1", "created_at": "2025-01-01T00:00:00+00:00"},
+    ])
+    # A reading that must not be used to re-score the input-less rows
+    store.load("health_data", [{"id": "h-1", "patient_id": "p-3", "created_at": "2025-01-10T08:00:00+00:00",
+                                "blood_pressure_systolic": 120, "blood_pressure_diastolic": 80, "blood_glucose": 100}])
+    store.load("predictions", [
+        {**OLD, **_inputs(i), "id": f"pr-{i:02d}", "patient_id": f"p-{i % 3 + 1}",
+         "created_at": f"2025-02-{i + 1:02d}T08:05:00+00:00"}
+        for i in range(12)
+    ] + [{**OLD, "id": "pr-early", "patient_id": "p-1", "created_at": "2025-01-15T08:00:00+00:00"}])
+    return store, model_artifacts
+@pytest.mark.parametrize("jobs", [0, 1])
+async def test_rescore_overwrites_predictions_in_place(predictions_store, tmp_path, client: TestClient, jobs):
+    """Each prediction is re-scored from its stored inputs under its own id; latest and triage show the new model"""
+    store, models = predictions_store
+    job = RescoreJob(store, models[0], main.rescored_record, main.FEATURE_RANGES,
+                     str(tmp_path / "checkpoint.json"), chunk_size=5, jobs=jobs)
+    status = await job.run()
+    assert (status["status"], status["predictions"], status["scored"], status["skipped"], status["chunks"]) == ("completed", 13, 8, 5, 3)
+    predictions = {row["id"]: row for row in store.query("predictions", "1 = 1")}
+    assert len(predictions) == 13
+    assert predictions["pr-10"]["created_at"] == "2025-02-11T08:05:00+00:00"
+    assert predictions["pr-10"]["risk_level"] == "High" and "Maternal age: 41" in predictions["pr-10"]["factors"]
+    assert (predictions["pr-10"]["age"], predictions["pr-10"]["blood_glucose"]) == (41, 190)
+    # Rows without stored inputs keep their result
+    assert predictions["pr-early"] == {**OLD, "id": "pr-early", "patient_id": "p-1", "created_at": "2025-01-15T08:00:00+00:00"}
+    assert predictions["pr-02"]["risk_level"] == "Old" and "age" not in predictions["pr-02"]
+    with patch("main.sqlite_store", store):
+        latest = client.get("/api/predictions/latest/p-2").json()["prediction"]
+        triage = {row["id"]: row["latest_prediction"] for row in client.get("/api/chw/chw-1/triage").json()["patients"]}
+    assert (latest["id"], latest["risk_level"]) == ("pr-10", "High")
+    assert triage["p-2"] == {key: latest[key] for key in ("id", "risk_level", "risk_percentage", "created_at")}
+    assert triage["p-1"]["risk_level"] != "Old" and triage["p-3"]["risk_level"] == "Old"
+async def test_rescore_resumes_from_checkpoint(predictions_store, tmp_path):
+    """A stopped job resumes after its last chunk, a finished one only re-scores new predictions, and another model must restart"""
+    store, models = predictions_store
+    checkpoint = str(tmp_path / "checkpoint.json")
+    def job(model=models[0]):
+        return RescoreJob(store, model, main.rescored_record, main.FEATURE_RANGES, checkpoint, chunk_size=5, jobs=0)
+    first = job()
+    first.cancel()
+    status = await first.run()
+    assert (status["status"], status["predictions"]) == ("cancelled", 5)
+    status = await job().run()
+    assert (status["status"], status["predictions"], status["run_predictions"], status["scored"]) == ("completed", 13, 8, 8)
+    store.load("predictions", [{**OLD, "id": "pr-new", "patient_id": "p-1", "created_at": "2025-03-01T08:05:00+00:00",
+                                "age": 30, "blood_pressure_systolic": 120, "blood_pressure_diastolic": 80, "blood_glucose": 100}])
+    status = await job().run()
+    assert (status["predictions"], status["run_predictions"], status["scored"]) == (14, 1, 9)
+    assert len(store.query("predictions", "1 = 1")) == 14
+    assert store.query("predictions", "id = ?", ("pr-new",))[0]["risk_level"] != "Old"
+    with pytest.raises(CheckpointMismatch):
+        await job(models[1]).run()
+    assert (await job(models[1]).run(restart=True))["predictions"] == 14
+def test_rescore_admin_endpoint(client: TestClient, predictions_store, tmp_path, admin_headers):
+    """Test POST /api/admin/rescore runs the job in the background and GET reports its progress"""
+    store, models = predictions_store
+    with patch.multiple(main, MODEL_DIR=str(tmp_path), sqlite_store=store,
+                        RESCORE_CHECKPOINT=str(tmp_path / "checkpoint.json")):
+        assert client.post("/api/admin/rescore", json={"jobs": 0}).status_code == 401
+        assert client.post("/api/admin/rescore", json={"path": "/etc/passwd"}, headers=admin_headers).status_code == 400
+        resp = client.post("/api/admin/rescore", json={"path": models[0], "chunk_size": 4, "jobs": 0}, headers=admin_headers)
+        assert resp.status_code == 202
+        deadline = time.monotonic() + 10
+        while time.monotonic() < deadline:
+            job = client.get("/api/admin/rescore", headers=admin_headers).json()["job"]
+            if job["status"] != "running":
+                break
+            time.sleep(0.02)
+        assert (job["status"], job["scored"], job["skipped"]) == ("completed", 8, 5)
+        assert job["predictions_per_s"] > 0
+        assert client.delete("/api/admin/rescore", headers=admin_headers).status_code == 404
\ No newline at end of file
@@ -0,0 +1,51 @@
+# tests/test_routing.py
+import numpy as np
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from tests.mocks.mock_data import MockData as M
+from routing import RoutingIndex
+from storage import SupabaseStore
+import main
+def test_routing_index_lookup_and_replace():
+    """Lookups hit assigned patients; replace swaps the whole mapping"""
+    index = RoutingIndex()
+    index.assign("patient-1", "chw-1")
+    assert index.lookup("patient-1") == "chw-1"
+    assert index.lookup("patient-2") is None
+    index.replace([("patient-2", "chw-2"), ("patient-3", None)])
+    assert (index.lookup("patient-1"), index.lookup("patient-2")) == (None, "chw-2")
+    assert len(index) == 1
+    assert (index.stats()["hits"], index.stats()["misses"]) == (2, 2)
+def test_routing_index_expires_entries_after_ttl():
+    """Entries older than the TTL are misses, so the caller re-reads the store"""
+    index = RoutingIndex(ttl=30)
+    with patch("routing.time.monotonic", return_value=100.0):
+        index.assign("patient-1", "chw-1")
+    with patch("routing.time.monotonic", return_value=120.0):
+        assert index.lookup("patient-1") == "chw-1"
+    with patch("routing.time.monotonic", return_value=131.0):
+        assert index.lookup("patient-1") is None
+    assert len(index) == 0
+    assert index.stats()["expirations"] == 1
+async def test_supabase_assignments_read_patients():
+    """CHW assignments are read from patients, the table assign_patients writes"""
+    client = MagicMock()
+    client.table.return_value.select.return_value.in_.return_value.execute.return_value.data = [
+        {"id": "patient-1", "chw_id": "chw-1"}]
+    assert await SupabaseStore(client).chw_assignments(["patient-1"]) == {"patient-1": "chw-1"}
+    client.table.assert_called_once_with("patients")
+def test_assign_patient_updates_index(client: TestClient):
+    """Test POST /api/chw/{chw_id}/assign-patient routes the patient's alerts at once"""
+    resp = client.post(f"/api/chw/{M.CHW_ID}/assign-patient?patient_id={M.PATIENT_ID}")
+    assert resp.status_code == 200
+    assert main.routing_index.lookup(M.PATIENT_ID) == M.CHW_ID
+    main.routing_index.assign(M.PATIENT_ID, None)
+def test_high_risk_alert_skips_chw_query(client: TestClient, mock_model, mock_supabase):
+    """Test a high-risk /api/predict resolves the CHW from the index"""
+    main.routing_index.assign(M.PATIENT_ID_2, M.CHW_ID)
+    with patch.object(mock_model, "predict_proba", return_value=np.array([[0.2, 0.8]])):
+        resp = client.post("/api/predict", json=M.HIGH_RISK_INPUT)
+    main.routing_index.assign(M.PATIENT_ID_2, None)
+    assert resp.json()["risk_level"] == "High"
+    tables = [c.args[0] for c in mock_supabase.table.call_args_list]
+    assert tables == ["predictions", "notifications"]
@@ -0,0 +1,46 @@
+# tests/test_scoring.py
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.linear_model import LogisticRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import StandardScaler
+from sklearn.svm import SVC
+from scoring import compile_model
+@pytest.fixture(scope="module")
+def training_data():
+    rng = np.random.default_rng(42)
+    X = np.column_stack([
+        rng.uniform(18, 50, 300),
+        rng.uniform(80, 200, 300),
+        rng.uniform(40, 130, 300),
+        rng.uniform(40, 400, 300),
+    ])
+    y = (X[:, 3] + rng.normal(0, 40, 300) > 220).astype(int)
+    return X, y
+@pytest.mark.model
+def test_compiles_scaled_logistic_regression(training_data):
+    """Scaler + LogisticRegression compiles to the linear fast path"""
+    X, y = training_data
+    model = Pipeline([("scaler", StandardScaler()), ("classifier", LogisticRegression())]).fit(X, y)
+    scorer = compile_model(model, X)
+    assert scorer.kind == "linear"
+    np.testing.assert_allclose(scorer.predict_proba(X), model.predict_proba(X), atol=1e-9)
+    labels, _ = scorer.score(X)
+    np.testing.assert_array_equal(labels, model.predict(X))
+@pytest.mark.model
+def test_compiles_random_forest(training_data):
+    """A random forest compiles to the stacked-tree fast path"""
+    X, y = training_data
+    model = RandomForestClassifier(n_estimators=20, max_depth=5, class_weight="balanced", random_state=0).fit(X, y)
+    scorer = compile_model(model, X)
+    assert scorer.kind == "forest"
+    np.testing.assert_allclose(scorer.predict_proba(X), model.predict_proba(X), atol=1e-9)
+    labels, _ = scorer.score(X)
+    np.testing.assert_array_equal(labels, model.predict(X))
+@pytest.mark.model
+def test_falls_back_for_unsupported_models(training_data, mock_model):
+    """Models the fast path cannot compile are scored through sklearn"""
+    X, y = training_data
+    assert compile_model(SVC(probability=True).fit(X, y), X).kind == "sklearn"
+    assert compile_model(mock_model).kind == "sklearn"
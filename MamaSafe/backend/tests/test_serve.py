@@ -0,0 +1,54 @@
+# tests/test_serve.py
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+import httpx
+import pytest
+from tests.mocks.mock_data import MockData as M
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+def _workers(pid):
+    with open(f"/proc/{pid}/task/{pid}/children") as f:
+        return sorted(int(child) for child in f.read().split())
+def _wait_for(check, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if check():
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    raise AssertionError("condition not met in time")
+@pytest.mark.slow
+@pytest.mark.skipif(not sys.platform.startswith("linux"), reason="reads worker pids from /proc")
+def test_prefork_workers_serve_and_restart(tmp_path):
+    """serve.py forks its workers after loading the model, restarts one that dies and stops cleanly"""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    env = dict(os.environ, STORAGE_BACKEND="sqlite", SQLITE_PATH=str(tmp_path / "db.sqlite3"), LOG_LEVEL="WARNING")
+    server = subprocess.Popen(
+        [sys.executable, "serve.py", "--workers", "2", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        _wait_for(lambda: httpx.get(f"{base_url}/api/health/ready").status_code == 200)
+        _wait_for(lambda: len(_workers(server.pid)) == 2)
+        resp = httpx.post(f"{base_url}/api/predict", json=M.VALID_PREDICTION_INPUT)
+        assert resp.status_code == 200
+        assert resp.json()["success"] is True
+        assert httpx.get(f"{base_url}/api/health").json()["model_status"] == "loaded"
+        first, second = _workers(server.pid)
+        os.kill(first, signal.SIGKILL)
+        _wait_for(lambda: len(_workers(server.pid)) == 2 and first not in _workers(server.pid))
+        assert second in _workers(server.pid)
+        _wait_for(lambda: httpx.get(f"{base_url}/api/health/ready").status_code == 200)
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=30) == 0
+    finally:
+        if server.poll() is None:
+            server.kill()
\ No newline at end of file
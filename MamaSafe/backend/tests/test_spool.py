@@ -0,0 +1,44 @@
+# tests/test_spool.py
+import pytest
+from spool import Spool, SpoolDrainer
+@pytest.fixture
+def spool(tmp_path):
+    spool = Spool(str(tmp_path / "spool.sqlite3"), max_attempts=2, base_delay=0)
+    yield spool
+    spool.close()
+def test_entries_survive_restart(tmp_path):
+    """Spooled entries are still pending after the file is reopened"""
+    path = str(tmp_path / "spool.sqlite3")
+    first = Spool(path)
+    first.enqueue("prediction", [{"record": {"id": "pred-1"}}])
+    first.close()
+    reopened = Spool(path)
+    assert [e["payload"]["record"]["id"] for e in reopened.due(10)] == ["pred-1"]
+    reopened.close()
+def test_failed_entries_back_off_then_go_dead(spool):
+    """Entries are retried until they run out of attempts"""
+    spool.enqueue("prediction", [{"n": 1}])
+    spool.retry(spool.due(10), "timeout")
+    assert spool.stats()["pending"] == 1
+    spool.retry(spool.due(10), "timeout")
+    stats = spool.stats()
+    assert (stats["pending"], stats["dead"]) == (0, 1)
+async def test_drainer_flushes_each_kind_in_one_call(spool):
+    """Due entries are grouped by kind and acked after their handler succeeds"""
+    calls = []
+    async def handle(payloads):
+        calls.append(payloads)
+    spool.enqueue("prediction", [{"n": 1}, {"n": 2}])
+    drainer = SpoolDrainer(spool, {"prediction": handle})
+    assert await drainer.drain_once() == 2
+    assert calls == [[{"n": 1}, {"n": 2}]]
+    assert spool.stats()["pending"] == 0
+async def test_drainer_keeps_entries_when_handler_fails(spool):
+    """A failing handler leaves its entries in the spool for a retry"""
+    async def fail(payloads):
+        raise RuntimeError("Database connection failed")
+    spool.enqueue("alert", [{"patient_id": "patient-1"}])
+    drainer = SpoolDrainer(spool, {"alert": fail})
+    assert await drainer.drain_once() == 0
+    assert spool.stats()["pending"] == 1
+    assert drainer.failures == 1
@@ -0,0 +1,113 @@
+# tests/test_storage.py
+import pytest
+from unittest.mock import MagicMock, patch
+from fastapi.testclient import TestClient
+from tests.mocks.mock_data import MockData as M
+import main
+from storage import SupabaseStore
+@pytest.fixture
+def store(sqlite_store):
+    store = sqlite_store
+    store.load("chw", [{"id": M.CHW_ID, "full_name": "Jane CHW", "phone": "+250788000000", "created_at": "2025-01-01T00:00:00"}])
+    store.load("patients", [
+        {"id": M.PATIENT_ID, "full_name": "Alice", "chw_id": M.CHW_ID, "created_at": "2025-01-02T00:00:00"},
+        {"id": M.PATIENT_ID_2, "full_name": "Beth", "chw_id": None, "created_at": "2025-01-03T00:00:00"},
+    ])
+    return store
+async def test_patient_embeds_chw(store):
+    """A patient is returned with its CHW's contact details embedded"""
+    patient = await store.get_patient(M.PATIENT_ID)
+    assert patient["chw"] == {"id": M.CHW_ID, "full_name": "Jane CHW", "phone": "+250788000000"}
+    assert (await store.get_patient(M.PATIENT_ID_2))["chw"] is None
+    assert await store.get_patient("missing") is None
+async def test_pages_follow_keyset_cursor(store):
+    """Pages are newest first and the cursor continues after the last row"""
+    store.load("health_data", [
+        {"id": f"hd-{d}", "patient_id": M.PATIENT_ID, "created_at": f"2025-02-{d:02d}T00:00:00"} for d in range(1, 6)
+    ])
+    rows, cursor = await store.page_health_data(M.PATIENT_ID, None, 3)
+    assert [r["id"] for r in rows] == ["hd-5", "hd-4", "hd-3"]
+    rows, cursor = await store.page_health_data(M.PATIENT_ID, cursor, 3)
+    assert [r["id"] for r in rows] == ["hd-2", "hd-1"] and cursor is None
+async def test_assign_updates_indexed_chw(store):
+    """Reassigned patients move to the new CHW's caseload and routing lookups"""
+    assert await store.assign_patients("chw-2", patient_ids=[M.PATIENT_ID, "missing"]) == [M.PATIENT_ID]
+    rows, _ = await store.page_patients("chw-2", None, 10)
+    assert [r["id"] for r in rows] == [M.PATIENT_ID]
+    assert await store.chw_assignments([M.PATIENT_ID, M.PATIENT_ID_2]) == {M.PATIENT_ID: "chw-2"}
+    assert await store.assign_patients(M.CHW_ID, from_chw_id="chw-2") == [M.PATIENT_ID]
+async def test_supabase_bulk_assign_batches_ids():
+    """Bulk assignment sends one bounded id filter per batch and merges the results"""
+    client = MagicMock()
+    update = client.table.return_value.update.return_value
+    update.in_.side_effect = lambda column, ids: MagicMock(**{"execute.return_value.data": [{"id": i} for i in ids]})
+    ids = [f"patient-{i:04d}" for i in range(250)]
+    assert await SupabaseStore(client).assign_patients("chw-2", patient_ids=ids) == ids
+    assert [len(c.args[1]) for c in update.in_.call_args_list] == [100, 100, 50]
+async def test_notifications_count_and_mark_read(store):
+    """Unread counts follow mark-read, and listed notifications embed the patient name"""
+    saved = await store.insert_notifications([
+        {"chw_id": M.CHW_ID, "patient_id": M.PATIENT_ID, "title": "Alert", "is_read": False},
+        {"chw_id": M.CHW_ID, "patient_id": M.PATIENT_ID_2, "title": "Alert", "is_read": False},
+    ])
+    assert all(row["id"] and row["created_at"] for row in saved)
+    await store.mark_notification_read(saved[0]["id"])
+    assert await store.count_notifications(M.CHW_ID) == 2
+    assert await store.count_notifications(M.CHW_ID, unread_only=True) == 1
+    rows, _ = await store.page_notifications(M.CHW_ID, None, 10, unread_only=True)
+    assert rows[0]["patient"] == {"full_name": "Beth"}
+async def test_upsert_merges_existing_rows(store):
+    """Upserting a retried batch overwrites rows instead of duplicating them"""
+    await store.upsert_predictions([{"id": "pred-1", "patient_id": M.PATIENT_ID, "risk_level": "Low"}])
+    await store.upsert_predictions([{"id": "pred-1", "patient_id": M.PATIENT_ID, "risk_level": "High"}])
+    predictions = await store.list_predictions(M.PATIENT_ID, 10)
+    assert [(p["id"], p["risk_level"]) for p in predictions] == [("pred-1", "High")]
+def test_api_serves_from_sqlite_store(client: TestClient, store, sample_prediction_input):
+    """Test the API end to end with STORAGE_BACKEND=sqlite"""
+    with patch("main.sqlite_store", store):
+        resp = client.post("/api/predict", json={**sample_prediction_input, "patient_id": M.PATIENT_ID})
+        assert resp.status_code == 200
+        prediction_id = resp.json()["prediction_id"]
+        resp = client.get(f"/api/predictions/latest/{M.PATIENT_ID}")
+        assert resp.json()["prediction"]["id"] == prediction_id
+        # Saved with the inputs it was scored from, for later re-scoring
+        assert resp.json()["prediction"]["blood_glucose"] == sample_prediction_input["blood_glucose"]
+        resp = client.get(f"/api/patients/{M.PATIENT_ID}")
+        assert resp.json()["patient"]["chw"]["id"] == M.CHW_ID
+async def test_sparse_fieldset_keeps_cursor_columns(store, client: TestClient):
+    """fields= narrows rows but paginated lists keep the columns their cursor needs"""
+    store.load("health_data", [
+        {"id": f"hd-{d}", "patient_id": M.PATIENT_ID, "blood_glucose": 90 + d, "created_at": f"2025-02-{d:02d}T00:00:00"}
+        for d in range(1, 4)
+    ])
+    with patch("main.sqlite_store", store):
+        resp = client.get(f"/api/patients/{M.PATIENT_ID}/health-data?fields=blood_glucose&limit=2")
+    assert resp.status_code == 200
+    data = resp.json()
+    assert data["health_data"][0] == {"blood_glucose": 93, "id": "hd-3", "created_at": "2025-02-03T00:00:00"}
+    assert data["has_more"] is True
+def test_list_without_limit_is_one_bounded_page(store, client: TestClient):
+    """A request without limit gets DEFAULT_PAGE_SIZE rows and a cursor to follow, never the whole history"""
+    store.load("health_data", [
+        {"id": f"hd-{i:03d}", "patient_id": M.PATIENT_ID, "blood_glucose": 90, "created_at": f"2025-02-01T00:{i // 60:02d}:{i % 60:02d}"}
+        for i in range(main.DEFAULT_PAGE_SIZE + 1)
+    ])
+    with patch("main.sqlite_store", store):
+        first = client.get(f"/api/patients/{M.PATIENT_ID}/health-data").json()
+        rest = client.get(f"/api/patients/{M.PATIENT_ID}/health-data?cursor={first['next_cursor']}").json()
+    assert (first["count"], first["has_more"]) == (main.DEFAULT_PAGE_SIZE, True)
+    assert (rest["count"], rest["has_more"]) == (1, False)
+async def test_chw_triage_ranks_by_latest_risk(store, client: TestClient):
+    """Test GET /api/chw/{chw_id}/triage orders by each patient's latest prediction, unscored last"""
+    store.load("patients", [{"id": "patient-3", "full_name": "Cara", "chw_id": M.CHW_ID, "created_at": "2025-01-04T00:00:00"}])
+    store.load("predictions", [
+        {"id": "p1", "patient_id": M.PATIENT_ID, "risk_percentage": 80.0, "created_at": "2025-03-01T00:00:00"},
+        {"id": "p2", "patient_id": M.PATIENT_ID, "risk_percentage": 20.0, "created_at": "2025-03-02T00:00:00"},
+        {"id": "p3", "patient_id": "patient-3", "risk_percentage": 65.0, "created_at": "2025-03-01T00:00:00"},
+    ])
+    with patch("main.sqlite_store", store):
+        first = client.get(f"/api/chw/{M.CHW_ID}/triage?limit=1").json()
+        rest = client.get(f"/api/chw/{M.CHW_ID}/triage?cursor={first['next_cursor']}").json()
+    assert (first["total"], first["patients"][0]["id"]) == (2, "patient-3")
+    assert rest["patients"][0]["latest_prediction"]["id"] == "p2"
+    assert rest["has_more"] is False
\ No newline at end of file
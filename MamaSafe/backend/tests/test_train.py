@@ -0,0 +1,49 @@
+# tests/test_train.py
+import csv
+import json
+import joblib
+import numpy as np
+import pytest
+from artifacts import ArtifactMismatch, resolve_model, verify
+from scoring import compile_model
+from train import DEFAULT_DATA, DatasetError, load_dataset, train
+def _write_notebook_csv(path, rows=120, seed=1):
+    rng = np.random.default_rng(seed)
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["Age", "Systolic BP", "Diastolic", "BS2", "Gestational Diabetes"])
+        for _ in range(rows):
+            label = int(rng.random() < 0.2)
+            writer.writerow([rng.integers(18, 45), round(rng.normal(115 + 15 * label, 10)),
+                             round(rng.normal(72 + 8 * label, 8)), round(rng.normal(95 + 50 * label, 20), 1), label])
+    return str(path)
+def test_visit_layout_is_reduced_to_means(tmp_path):
+    """Visit-layout rows become per-visit means; unlabelled rows are dropped"""
+    path = tmp_path / "visits.csv"
+    header = ["ID", "AGE"] + [f"{p}{i}" for p in ("BP_SYS", "BP_DYS", "BS") for i in range(1, 5)] + ["Presence_of_GDM"]
+    rows = [
+        ["1", "29", "108", "125", "", "", "58", "65", "", "", "84", "81", "84", "", "0"],
+        ["2", "26", "107", "123", "123", "", "75", "78", "67", "", "72", "68", "71", "", "1"],
+        ["3", "31", "100", "128", "", "", "69", "82", "", "", "75", "", "", "", ""],
+    ]
+    with open(path, "w", newline="") as f:
+        csv.writer(f).writerows([header] + rows * 2)
+    X, y, summary = load_dataset(str(path))
+    assert (summary["layout"], summary["usable_rows"]) == ("visits", 4)
+    assert X[0].tolist() == [29.0, 116.5, 61.5, 83.0]
+    with pytest.raises(DatasetError):
+        load_dataset(DEFAULT_DATA)  # labels are blank in the checked-in sheet
+@pytest.mark.parametrize("jobs", [1, 2])
+def test_train_writes_loadable_versioned_artifact(tmp_path, jobs):
+    """The best candidate is saved under its version with a manifest the API can load and compile"""
+    data = _write_notebook_csv(tmp_path / "train.csv")
+    model_path, manifest_path, manifest = train(data, str(tmp_path / "models"), ["lr"], jobs, repeats=1)
+    assert manifest["best"]["model"] == "lr" and len(manifest["candidates"]) == 8
+    assert model_path.endswith(f"gdm_model-{manifest['version']}.pkl")
+    pkl_path, loaded_manifest = resolve_model(manifest_path)
+    assert verify(pkl_path, loaded_manifest) == manifest["version"]
+    assert compile_model(joblib.load(pkl_path)).kind == "linear"
+    with open(manifest_path, "w") as f:
+        json.dump({**loaded_manifest, "sha256": "0" * 64}, f)
+    with pytest.raises(ArtifactMismatch):
+        verify(*resolve_model(manifest_path))
@@ -0,0 +1,40 @@
+# tests/test_trends.py
+import numpy as np
+import pytest
+from unittest.mock import patch
+from fastapi.testclient import TestClient
+from tests.mocks.mock_data import MockData as M
+from trends import TrendState, rolling_means
+def _readings(glucose, start=1):
+    return [
+        {"id": f"hd-{i:03d}", "patient_id": M.PATIENT_ID, "created_at": f"2025-03-{i:02d}T08:00:00+00:00",
+         "blood_glucose": value, "blood_pressure_systolic": 120, "blood_pressure_diastolic": None}
+        for i, value in enumerate(glucose, start)
+    ]
+def test_incremental_fold_matches_full_history():
+    """Folding readings in batches gives the same trend as folding them all at once"""
+    rows = _readings([100, 150, 120, 160, 170, 110, 145])
+    whole, batched = TrendState(), TrendState()
+    whole.fold(rows)
+    batched.fold(rows[:3])
+    batched.fold(rows[2:])  # overlapping batch: already-seen rows are skipped
+    assert batched.summary(3) == whole.summary(3)
+    glucose = whole.summary(3)["metrics"]["blood_glucose"]
+    assert (glucose["above_threshold"], glucose["threshold_crossings"]) == (4, 3)
+    assert glucose["rolling_mean"] == pytest.approx((170 + 110 + 145) / 3, abs=1e-3)
+    assert whole.summary(3)["metrics"]["blood_pressure_diastolic"]["count"] == 0
+def test_rolling_means_skip_missing_readings():
+    """A window's mean uses only the readings present in it"""
+    values = np.array([[1.0], [np.nan], [3.0], [5.0]])
+    assert rolling_means(values, 2)[:, 0].tolist() == [1.0, 3.0, 4.0]
+def test_trends_endpoint_fetches_only_new_readings(sqlite_store, client: TestClient):
+    """Test GET /api/patients/{patient_id}/trends folds in only readings added since the last call"""
+    sqlite_store.load("health_data", _readings([100 + 2 * i for i in range(10)]))
+    with patch("main.sqlite_store", sqlite_store):
+        first = client.get(f"/api/patients/{M.PATIENT_ID}/trends?window=5").json()
+        sqlite_store.load("health_data", _readings([200], start=11))
+        second = client.get(f"/api/patients/{M.PATIENT_ID}/trends?window=5").json()
+        stats = client.get("/api/cache/stats").json()["trends"]
+    assert first["metrics"]["blood_glucose"]["slope_per_day"] == pytest.approx(2.0)
+    assert second["readings"] == 11 and second["metrics"]["blood_glucose"]["latest"] == 200
+    assert stats["readings_fetched"] == 11
@@ -0,0 +1,356 @@
+"""Train the GDM model from the command line.
+
+Replaces the notebook run: reads the dataset from ``data/``, cross-validates
+a hyperparameter grid for each model family in parallel, refits the best
+candidate and writes a versioned artifact plus manifest (see artifacts.py).
+
+    python train.py                                   # every family, all cores
+    python train.py --models lr,rf --jobs 4 --output-dir models
+    MODEL_PATH=models/gdm_model-<version>.json uvicorn main:app
+
+Two dataset layouts are understood:
+
+* the visit layout of ``data/dataset - Sheet1.csv`` (AGE, BP_SYS1..4,
+  BP_DYS1..4, BS1..4, Presence_of_GDM), reduced to per-visit means like
+  /api/predict/visits does;
+* the notebook's export (Age, Systolic BP, Diastolic, BS2, Gestational
+  Diabetes).
+
+Rows without a 0/1 label or with a missing feature are dropped, as the
+notebook's ``dropna()`` did.
+
+Like the notebook, every candidate is scored with RepeatedStratifiedKFold
+and SMOTE oversampling of the training folds. The folds, their scaling and
+their SMOTE output are computed once and shared by every candidate, so the
+worker processes only fit and score models.
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from artifacts import file_sha256, write_artifact
+from visits import from_dataset_row, visit_means
+
+log = logging.getLogger("mamasafe.train")
+
+FEATURES = ["age", "blood_pressure_systolic", "blood_pressure_diastolic", "blood_glucose"]
+
+# Column names of the notebook's training export
+NOTEBOOK_COLUMNS = ["Age", "Systolic BP", "Diastolic", "BS2"]
+NOTEBOOK_LABEL = "Gestational Diabetes"
+VISIT_LABEL = "Presence_of_GDM"
+
+POSITIVE_LABELS = {"1", "1.0", "yes", "true", "positive"}
+NEGATIVE_LABELS = {"0", "0.0", "no", "false", "negative"}
+
+DEFAULT_DATA = os.path.join(os.path.dirname(__file__), "data", "dataset - Sheet1.csv")
+DEFAULT_OUTPUT = os.path.join(os.path.dirname(__file__), "models")
+
+# Notebook settings: minority class oversampled to half the majority
+SMOTE_RATIO = 0.5
+
+
+class DatasetError(ValueError):
+    pass
+
+
+# ---- data
+
+def _label(value) -> Optional[int]:
+    value = str(value or "").strip().lower()
+    if value in POSITIVE_LABELS:
+        return 1
+    if value in NEGATIVE_LABELS:
+        return 0
+    return None
+
+
+def _number(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def load_dataset(path: str) -> Tuple[np.ndarray, np.ndarray, dict]:
+    """(X in FEATURES order, y, summary) from a CSV in either supported layout"""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        rows = list(csv.DictReader(f))
+    if not rows:
+        raise DatasetError(f"{path} has no rows")
+    columns = set(rows[0])
+
+    if set(NOTEBOOK_COLUMNS) <= columns and NOTEBOOK_LABEL in columns:
+        layout = "notebook"
+        labels = [_label(row[NOTEBOOK_LABEL]) for row in rows]
+        X = np.array([[_number(row[column]) for column in NOTEBOOK_COLUMNS] for row in rows])
+    elif "AGE" in columns and VISIT_LABEL in columns:
+        layout = "visits"
+        labels = [_label(row[VISIT_LABEL]) for row in rows]
+        visits = [from_dataset_row(row) for row in rows]
+        for visit in visits:
+            for field in FEATURES[1:]:
+                visit[field] = [_number(value) if value is not None else None for value in visit[field]]
+        ages = np.array([_number(visit.get("age")) for visit in visits])
+        X = np.column_stack([ages, visit_means(visits)])
+    else:
+        raise DatasetError(f"{path}: unrecognised columns {sorted(columns)}")
+
+    y = np.array([np.nan if label is None else label for label in labels])
+    keep = ~np.isnan(y) & ~np.isnan(X).any(axis=1)
+    X, y = X[keep], y[keep].astype(int)
+    summary = {
+        "path": os.path.abspath(path),
+        "sha256": file_sha256(path),
+        "layout": layout,
+        "rows": len(rows),
+        "usable_rows": int(keep.sum()),
+        "positives": int(y.sum()),
+    }
+    if len(np.unique(y)) < 2 or np.bincount(y).min() < 2:
+        raise DatasetError(
+            f"{path}: need at least two labelled rows of each class, found "
+            f"{summary['usable_rows']} usable rows with {summary['positives']} positive"
+        )
+    return X, y, summary
+
+
+# ---- candidates
+
+def _logistic(params, seed):
+    from sklearn.linear_model import LogisticRegression
+    return LogisticRegression(max_iter=2000, random_state=seed, **params)
+
+
+def _forest(params, seed):
+    from sklearn.ensemble import RandomForestClassifier
+    return RandomForestClassifier(random_state=seed, n_jobs=1, **params)
+
+
+def _svm(params, seed):
+    from sklearn.svm import SVC
+    return SVC(probability=True, random_state=seed, **params)
+
+
+def _xgboost(params, seed):
+    from xgboost import XGBClassifier
+    return XGBClassifier(random_state=seed, n_jobs=1, eval_metric="logloss", **params)
+
+
+# name -> (build(params, seed), parameter grid, needs scaled features)
+CANDIDATES = {
+    "lr": (_logistic, {"C": [0.01, 0.1, 1.0, 10.0], "class_weight": [None, "balanced"]}, True),
+    "rf": (_forest, {"n_estimators": [100, 300], "max_depth": [None, 5, 10], "min_samples_leaf": [1, 3]}, False),
+    "svm": (_svm, {"C": [0.1, 1.0, 10.0], "kernel": ["rbf", "linear"]}, True),
+    "xgb": (_xgboost, {"n_estimators": [100, 300], "max_depth": [3, 5], "learning_rate": [0.05, 0.1]}, False),
+}
+
+
+def available_models() -> List[str]:
+    names = list(CANDIDATES)
+    try:
+        import xgboost  # noqa: F401
+    except ImportError:
+        names.remove("xgb")
+    return names
+
+
+def candidate_grid(names: List[str]) -> List[Tuple[str, dict]]:
+    from sklearn.model_selection import ParameterGrid
+    return [(name, dict(params)) for name in names for params in ParameterGrid(CANDIDATES[name][1])]
+
+
+# ---- folds, prepared once
+
+def _oversample(X, y, seed):
+    """SMOTE the minority class up to SMOTE_RATIO of the majority, if it is below that"""
+    from imblearn.over_sampling import SMOTE
+    counts = np.bincount(y)
+    if counts.min() / counts.max() >= SMOTE_RATIO:
+        return X, y
+    return SMOTE(random_state=seed, sampling_strategy=SMOTE_RATIO, k_neighbors=1).fit_resample(X, y)
+
+
+def prepare_folds(X, y, splits: int, repeats: int, seed: int) -> Dict[bool, list]:
+    """Per fold, for unscaled and scaled features: (X_train, y_train after SMOTE, X_test, y_test)"""
+    from sklearn.model_selection import RepeatedStratifiedKFold
+    from sklearn.preprocessing import StandardScaler
+
+    folds = {False: [], True: []}
+    cv = RepeatedStratifiedKFold(n_splits=splits, n_repeats=repeats, random_state=seed)
+    for train_idx, test_idx in cv.split(X, y):
+        X_train, X_test, y_train, y_test = X[train_idx], X[test_idx], y[train_idx], y[test_idx]
+        folds[False].append((*_oversample(X_train, y_train, seed), X_test, y_test))
+        scaler = StandardScaler().fit(X_train)
+        folds[True].append((*_oversample(scaler.transform(X_train), y_train, seed), scaler.transform(X_test), y_test))
+    return folds
+
+
+_FOLDS: Dict[bool, list] = {}
+_SEED = 42
+
+
+def _init_worker(folds, seed):
+    global _FOLDS, _SEED
+    _FOLDS, _SEED = folds, seed
+
+
+def _scores(y_true, y_pred, positive) -> dict:
+    from sklearn.metrics import accuracy_score, f1_score, precision_score, recall_score, roc_auc_score
+    scores = {
+        "f1": f1_score(y_true, y_pred, zero_division=0),
+        "precision": precision_score(y_true, y_pred, zero_division=0),
+        "recall": recall_score(y_true, y_pred, zero_division=0),
+        "accuracy": accuracy_score(y_true, y_pred),
+    }
+    if len(np.unique(y_true)) == 2:
+        scores["roc_auc"] = roc_auc_score(y_true, positive)
+    return scores
+
+
+def evaluate(candidate: Tuple[str, dict]) -> dict:
+    """Mean and spread of each metric over the prepared folds"""
+    name, params = candidate
+    build, _, scaled = CANDIDATES[name]
+    started = time.perf_counter()
+    per_fold = []
+    for X_train, y_train, X_test, y_test in _FOLDS[scaled]:
+        estimator = build(params, _SEED).fit(X_train, y_train)
+        per_fold.append(_scores(y_test, estimator.predict(X_test), estimator.predict_proba(X_test)[:, 1]))
+    metrics = {}
+    for metric in per_fold[0]:
+        values = [fold[metric] for fold in per_fold if metric in fold]
+        metrics[metric] = round(float(np.mean(values)), 4)
+        metrics[f"{metric}_std"] = round(float(np.std(values)), 4)
+    return {"model": name, "params": params, "cv": metrics, "seconds": round(time.perf_counter() - started, 3)}
+
+
+def search(folds, candidates: List[Tuple[str, dict]], jobs: int, seed: int) -> List[dict]:
+    """Evaluate every candidate, across ``jobs`` worker processes"""
+    if jobs <= 1:
+        _init_worker(folds, seed)
+        return [evaluate(candidate) for candidate in candidates]
+    # Folds are sent to each worker once, not with every candidate
+    with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker, initargs=(folds, seed)) as pool:
+        return list(pool.map(evaluate, candidates, chunksize=max(1, len(candidates) // (jobs * 4))))
+
+
+def build_pipeline(name: str, params: dict, y, seed: int):
+    """The deployable model: [scaler] -> [SMOTE] -> classifier, as scoring.compile_model expects"""
+    from imblearn.over_sampling import SMOTE
+    from imblearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    build, _, scaled = CANDIDATES[name]
+    steps = [("scaler", StandardScaler())] if scaled else []
+    counts = np.bincount(y)
+    if counts.min() / counts.max() < SMOTE_RATIO:
+        steps.append(("smote", SMOTE(random_state=seed, sampling_strategy=SMOTE_RATIO, k_neighbors=1)))
+    steps.append(("classifier", build(params, seed)))
+    return Pipeline(steps)
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__)), timeout=5).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def train(data: str, output_dir: str, models: List[str], jobs: int, splits: int = 3, repeats: int = 5,
+          holdout: float = 0.2, metric: str = "f1", seed: int = 42) -> Tuple[str, str, dict]:
+    """Run the search, refit the best candidate and write it; returns (model_path, manifest_path, manifest)"""
+    from sklearn.model_selection import train_test_split
+    import sklearn
+
+    started = time.perf_counter()
+    X, y, dataset = load_dataset(data)
+    if holdout > 0:
+        X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=holdout, random_state=seed, stratify=y)
+    else:
+        X_train, y_train, X_test, y_test = X, y, None, None
+
+    folds = prepare_folds(X_train, y_train, splits, repeats, seed)
+    candidates = candidate_grid(models)
+    log.info("Evaluating %d candidates on %d folds with %d workers", len(candidates), splits * repeats, jobs)
+    results = search(folds, candidates, jobs, seed)
+    results.sort(key=lambda r: (r["cv"].get(metric, 0.0), r["cv"].get("roc_auc", 0.0)), reverse=True)
+    best = results[0]
+
+    model = build_pipeline(best["model"], best["params"], y_train, seed).fit(X_train, y_train)
+    holdout_scores = None
+    if X_test is not None:
+        scores = _scores(y_test, model.predict(X_test), model.predict_proba(X_test)[:, 1])
+        holdout_scores = {key: round(float(value), 4) for key, value in scores.items()}
+
+    manifest = {
+        "created_at": datetime.now(timezone.utc).isoformat(),
+        "features": FEATURES,
+        "dataset": dataset,
+        "selection": {"metric": metric, "splits": splits, "repeats": repeats, "holdout": holdout, "seed": seed},
+        "best": best,
+        "holdout": holdout_scores,
+        "candidates": results,
+        "training_seconds": round(time.perf_counter() - started, 2),
+        "sklearn_version": sklearn.__version__,
+        "git_commit": _git_commit(),
+    }
+    model_path, manifest_path = write_artifact(model, manifest, output_dir)
+    with open(manifest_path) as f:
+        return model_path, manifest_path, json.load(f)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", default=DEFAULT_DATA, help="training CSV (default: %(default)s)")
+    parser.add_argument("--output-dir", default=DEFAULT_OUTPUT, help="where the artifact and manifest are written")
+    parser.add_argument("--models", default=",".join(available_models()),
+                        help="comma-separated model families (default: %(default)s)")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count() or 1, help="worker processes (default: all cores)")
+    parser.add_argument("--splits", type=int, default=3)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--holdout", type=float, default=0.2, help="test fraction held out of the search (0 to disable)")
+    parser.add_argument("--metric", default="f1", choices=("f1", "roc_auc", "recall", "precision", "accuracy"))
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    models = [name.strip() for name in args.models.split(",") if name.strip()]
+    unknown = [name for name in models if name not in CANDIDATES]
+    if unknown:
+        parser.error(f"unknown models: {', '.join(unknown)}")
+    missing = [name for name in models if name not in available_models()]
+    if missing:
+        parser.error(f"not installed: {', '.join(missing)}")
+
+    try:
+        model_path, manifest_path, manifest = train(
+            args.data, args.output_dir, models, args.jobs, args.splits, args.repeats,
+            args.holdout, args.metric, args.seed
+        )
+    except DatasetError as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    best = manifest["best"]
+    print(f"best: {best['model']} {best['params']}  cv {args.metric}={best['cv'][args.metric]}")
+    if manifest["holdout"]:
+        print(f"holdout: {manifest['holdout']}")
+    print(f"wrote {model_path}\n      {manifest_path}  (version {manifest['version']}, {manifest['training_seconds']}s)")
+    print(f"serve it with MODEL_PATH={manifest_path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,204 @@
+"""Longitudinal trends over a patient's health_data readings.
+
+``TrendState`` keeps running aggregates per tracked reading: count, sums for
+the mean and the least-squares slope over time, readings above the elevated
+threshold and upward threshold crossings, plus the last ``TAIL_SIZE``
+readings for rolling means. New readings are folded in as one NumPy batch,
+so the work per request is proportional to what arrived since the last one.
+
+``TrendAnalyzer`` caches a state per patient. Each request only fetches the
+readings recorded after the newest one already folded in (an ascending
+keyset page from the state's cursor), so a warm trend for a long history
+costs one small query. Cached states expire after TREND_CACHE_TTL seconds,
+which also picks up edits to old rows.
+"""
+import math
+from datetime import datetime, timezone
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from cache import TTLCache
+from pagination import encode_cursor
+
+# Readings tracked, with the level above which a reading counts as elevated
+# (the same cut-offs the prediction endpoint lists as risk factors)
+TREND_METRICS = {
+    "blood_glucose": 140.0,
+    "blood_pressure_systolic": 130.0,
+    "blood_pressure_diastolic": 85.0,
+}
+TREND_COLUMNS = ["id", "created_at", *TREND_METRICS]
+THRESHOLDS = np.array(list(TREND_METRICS.values()))
+
+# Most recent readings kept for rolling means; the largest allowed window
+TAIL_SIZE = 60
+FETCH_PAGE_SIZE = 1000
+SECONDS_PER_DAY = 86400.0
+
+
+def _epoch(value) -> float:
+    stamp = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if stamp.tzinfo is None:
+        stamp = stamp.replace(tzinfo=timezone.utc)
+    return stamp.timestamp()
+
+
+def _reading(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _number(value, digits: int = 3) -> Optional[float]:
+    value = float(value)
+    return None if math.isnan(value) else round(value, digits)
+
+
+def rolling_means(values: np.ndarray, window: int) -> np.ndarray:
+    """Mean of each run of ``window`` readings, per column, ignoring missing (NaN) readings"""
+    if len(values) < window:
+        return np.empty((0, values.shape[1]))
+    valid = ~np.isnan(values)
+    sums = np.cumsum(np.where(valid, values, 0.0), axis=0)
+    counts = np.cumsum(valid, axis=0)
+    sums = np.vstack([np.zeros(values.shape[1]), sums])
+    counts = np.vstack([np.zeros(values.shape[1]), counts])
+    window_sums = sums[window:] - sums[:-window]
+    window_counts = counts[window:] - counts[:-window]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(window_counts > 0, window_sums / window_counts, np.nan)
+
+
+class TrendState:
+    """Running aggregates of one patient's readings, oldest to newest"""
+
+    def __init__(self):
+        k = len(TREND_METRICS)
+        self.cursor: Optional[Tuple[str, str]] = None  # (created_at, id) of the newest reading folded in
+        self.readings = 0
+        self.origin: Optional[float] = None  # epoch seconds of the first reading; times are days since it
+        self.count = np.zeros(k)
+        self.sum_t = np.zeros(k)
+        self.sum_y = np.zeros(k)
+        self.sum_tt = np.zeros(k)
+        self.sum_ty = np.zeros(k)
+        self.above = np.zeros(k)
+        self.crossings = np.zeros(k)
+        self.last = np.full(k, np.nan)  # latest value of each reading
+        self.tail_at: List[str] = []
+        self.tail_values = np.empty((0, k))
+
+    def token(self) -> Optional[str]:
+        """Keyset cursor after the newest reading folded in"""
+        if self.cursor is None:
+            return None
+        return encode_cursor({"created_at": self.cursor[0], "id": self.cursor[1]})
+
+    def fold(self, rows: List[dict]):
+        """Add readings (oldest first); rows already folded in are skipped"""
+        if self.cursor is not None:
+            rows = [row for row in rows if (str(row["created_at"]), str(row["id"])) > self.cursor]
+        if not rows:
+            return
+        if self.origin is None:
+            self.origin = _epoch(rows[0]["created_at"])
+
+        t = (np.array([_epoch(row["created_at"]) for row in rows]) - self.origin) / SECONDS_PER_DAY
+        y = np.array([[_reading(row.get(name)) for name in TREND_METRICS] for row in rows])
+        valid = ~np.isnan(y)
+        ty = np.where(valid, t[:, None], 0.0)
+        yy = np.where(valid, y, 0.0)
+
+        self.count += valid.sum(axis=0)
+        self.sum_t += ty.sum(axis=0)
+        self.sum_y += yy.sum(axis=0)
+        self.sum_tt += (ty * ty).sum(axis=0)
+        self.sum_ty += (ty * yy).sum(axis=0)
+
+        # Carry each reading's last value forward so every row sees the previous
+        # value of that reading, including one from an earlier batch
+        history = np.vstack([self.last, y])
+        steps = np.arange(len(history))[:, None]
+        latest = np.maximum.accumulate(np.where(~np.isnan(history), steps, 0), axis=0)
+        filled = history[latest, np.arange(history.shape[1])]
+        previous = filled[:-1]
+        with np.errstate(invalid="ignore"):
+            above = valid & (y > THRESHOLDS)
+            was_above = previous > THRESHOLDS
+        self.above += above.sum(axis=0)
+        self.crossings += (above & ~np.isnan(previous) & ~was_above).sum(axis=0)
+        self.last = filled[-1]
+
+        self.readings += len(rows)
+        self.tail_at = (self.tail_at + [str(row["created_at"]) for row in rows])[-TAIL_SIZE:]
+        self.tail_values = np.vstack([self.tail_values, y])[-TAIL_SIZE:]
+        self.cursor = (str(rows[-1]["created_at"]), str(rows[-1]["id"]))
+
+    def slopes(self) -> np.ndarray:
+        """Least-squares change per day of each reading (NaN with fewer than two distinct times)"""
+        n = self.count
+        denominator = n * self.sum_tt - self.sum_t ** 2
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where((n >= 2) & (denominator > 1e-12),
+                            (n * self.sum_ty - self.sum_t * self.sum_y) / denominator, np.nan)
+
+    def summary(self, window: int) -> dict:
+        rolling = rolling_means(self.tail_values, window)
+        slopes = self.slopes()
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = self.sum_y / self.count
+        metrics = {}
+        for j, (name, threshold) in enumerate(TREND_METRICS.items()):
+            series = rolling[:, j]
+            recent = series[~np.isnan(series)]
+            metrics[name] = {
+                "count": int(self.count[j]),
+                "latest": _number(self.last[j]),
+                "mean": _number(means[j]),
+                "slope_per_day": _number(slopes[j], 4),
+                "rolling_mean": _number(recent[-1]) if len(recent) else None,
+                "rolling_means": [_number(value) for value in series],
+                "threshold": threshold,
+                "above_threshold": int(self.above[j]),
+                "threshold_crossings": int(self.crossings[j]),
+            }
+        return {
+            "readings": self.readings,
+            "window": window,
+            "last_reading_at": self.cursor[0] if self.cursor else None,
+            # created_at of the last reading in each rolling window
+            "rolling_at": self.tail_at[window - 1:],
+            "metrics": metrics,
+        }
+
+
+class TrendAnalyzer:
+    def __init__(self, maxsize: int = 5000, ttl: float = 3600.0):
+        self.states = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.readings_fetched = 0
+
+    async def refresh(self, store, patient_id: str) -> TrendState:
+        """The patient's state with every reading recorded so far folded in"""
+        state = self.states.get(patient_id) or TrendState()
+        cursor = state.token()
+        while True:
+            rows, cursor = await store.page_health_data(
+                patient_id, cursor, FETCH_PAGE_SIZE, columns=TREND_COLUMNS, ascending=True
+            )
+            self.readings_fetched += len(rows)
+            state.fold(rows)
+            if cursor is None:
+                break
+        self.states.set(patient_id, state)
+        return state
+
+    def invalidate(self, patient_id: str):
+        self.states.delete(patient_id)
+
+    def clear(self):
+        self.states.clear()
+
+    def stats(self) -> dict:
+        return {"patients": len(self.states), "readings_fetched": self.readings_fetched}
@@ -0,0 +1,57 @@
+"""CHW caseload triage: assigned patients ranked by their latest prediction.
+
+The store returns a CHW's whole caseload with each patient's latest
+prediction embedded, in one query (``Store.chw_triage``). Ranking happens
+here: patients with a prediction come first, highest risk_percentage first,
+then the most recent prediction, with the patient id as a tie-breaker.
+Patients never scored come last.
+
+Pages use a keyset cursor over that sort key, like pagination.py does over
+(created_at, id), so a page boundary stays put when a patient elsewhere in
+the list is rescored between requests.
+"""
+import base64
+import json
+from typing import List, Optional, Tuple
+
+from pagination import InvalidCursor
+
+TriageKey = Tuple[int, float, str, str]
+
+
+def triage_key(row: dict) -> TriageKey:
+    latest = row.get("latest_prediction")
+    if not latest:
+        return (0, 0.0, "", str(row["id"]))
+    return (1, float(latest.get("risk_percentage") or 0.0), str(latest.get("created_at") or ""), str(row["id"]))
+
+
+def encode_triage_cursor(key: TriageKey) -> str:
+    raw = json.dumps(list(key)).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_triage_cursor(cursor: str) -> TriageKey:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        scored, risk, created_at, patient_id = json.loads(raw)
+        return (int(scored), float(risk), str(created_at), str(patient_id))
+    except Exception:
+        raise InvalidCursor("Invalid cursor")
+
+
+def rank(rows: List[dict]) -> List[dict]:
+    """Caseload in triage order, most urgent first"""
+    return sorted(rows, key=triage_key, reverse=True)
+
+
+def page(rows: List[dict], cursor: Optional[str], limit: int) -> Tuple[List[dict], Optional[str]]:
+    """One page of the ranked caseload after cursor; returns (rows, next_cursor or None)"""
+    ranked = rank(rows)
+    if cursor:
+        after = decode_triage_cursor(cursor)
+        ranked = [row for row in ranked if triage_key(row) < after]
+    if len(ranked) > limit:
+        ranked = ranked[:limit]
+        return ranked, encode_triage_cursor(triage_key(ranked[-1]))
+    return ranked, None
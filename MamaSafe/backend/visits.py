@@ -0,0 +1,54 @@
+"""Multi-reading visits, in the layout of the training data.
+
+A screening visit records up to four systolic, diastolic and glucose
+readings, some of them missing (``data/dataset - Sheet1.csv``: BP_SYS1..4,
+BP_DYS1..4, BS1..4). The model takes one value of each, so a visit is
+reduced the way the dataset's *_MEAN columns are: the mean of the readings
+that are present. ``visit_means`` does this for a whole batch at once on a
+NaN-padded (visits, readings, slots) array.
+"""
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+MAX_READINGS = 4
+
+# Reading field -> column prefix in the training data
+DATASET_PREFIXES = {
+    "blood_pressure_systolic": "BP_SYS",
+    "blood_pressure_diastolic": "BP_DYS",
+    "blood_glucose": "BS",
+}
+
+
+def is_dataset_row(row: Dict[str, Any]) -> bool:
+    return "AGE" in row or any(f"{prefix}1" in row for prefix in DATASET_PREFIXES.values())
+
+
+def from_dataset_row(row: Dict[str, Any]) -> Dict[str, Any]:
+    """Map a training-data style row (AGE, BP_SYS1..4, ...) to reading lists; blanks become None"""
+    def value(key):
+        item = row.get(key)
+        return None if item is None or item == "" else item
+
+    visit = {key: item for key, item in row.items() if key.islower()}
+    if "AGE" in row:
+        visit["age"] = value("AGE")
+    for field, prefix in DATASET_PREFIXES.items():
+        visit[field] = [value(f"{prefix}{slot}") for slot in range(1, MAX_READINGS + 1)]
+    return visit
+
+
+def visit_means(visits: List[Dict[str, List[Optional[float]]]]) -> np.ndarray:
+    """(n_visits, 3) mean of each reading field, in DATASET_PREFIXES order, ignoring missing readings"""
+    readings = np.full((len(visits), len(DATASET_PREFIXES), MAX_READINGS), np.nan)
+    for row, visit in enumerate(visits):
+        for column, field in enumerate(DATASET_PREFIXES):
+            values = [np.nan if value is None else value for value in visit[field]]
+            readings[row, column, :len(values)] = values
+    # nanmean without its all-NaN warning: a field with no readings gives NaN
+    present = ~np.isnan(readings)
+    counts = present.sum(axis=2)
+    sums = np.where(present, readings, 0.0).sum(axis=2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(counts > 0, sums / counts, np.nan)
@@ -12,6 +12,35 @@ class ApiService {
     HttpOverrides.global = _MyHttpOverrides();
   }
 
+  /// Fetch every row of a paginated list endpoint by following next_cursor
+  static Future<List<Map<String, dynamic>>> _getAllPages(
+    String path,
+    String key, {
+    Map<String, String> query = const {},
+  }) async {
+    final rows = <Map<String, dynamic>>[];
+    String? cursor;
+    do {
+      final response = await http
+          .get(
+            Uri.parse('$baseUrl$path').replace(queryParameters: {
+              ...query,
+              if (cursor != null) 'cursor': cursor,
+            }),
+            headers: {'Accept': 'application/json'},
+          )
+          .timeout(timeoutDuration);
+
+      if (response.statusCode != 200) {
+        throw Exception('Failed to fetch $key: ${response.body}');
+      }
+      final data = jsonDecode(response.body);
+      rows.addAll(List<Map<String, dynamic>>.from(data[key] ?? []));
+      cursor = data['next_cursor'];
+    } while (cursor != null);
+    return rows;
+  }
+
   // ==================== PREDICTION ENDPOINTS ====================
 
   /// Make a GDM prediction and save to database
@@ -163,19 +192,8 @@ class ApiService {
   static Future<List<Map<String, dynamic>>> getPatientHealthData(
       String patientId) async {
     try {
-      final response = await http
-          .get(
-            Uri.parse('$baseUrl/api/patients/$patientId/health-data'),
-            headers: {'Accept': 'application/json'},
-          )
-          .timeout(timeoutDuration);
-
-      if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
-        return List<Map<String, dynamic>>.from(data['health_data'] ?? []);
-      } else {
-        throw Exception('Failed to fetch health data: ${response.body}');
-      }
+      return await _getAllPages(
+          '/api/patients/$patientId/health-data', 'health_data');
     } catch (e) {
       throw Exception('Error fetching health data: $e');
     }
@@ -208,19 +226,7 @@ class ApiService {
   static Future<List<Map<String, dynamic>>> getCHWPatients(
       String chwId) async {
     try {
-      final response = await http
-          .get(
-            Uri.parse('$baseUrl/api/chw/patients/$chwId'),
-            headers: {'Accept': 'application/json'},
-          )
-          .timeout(timeoutDuration);
-
-      if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
-        return List<Map<String, dynamic>>.from(data['patients'] ?? []);
-      } else {
-        throw Exception('Failed to fetch CHW patients: ${response.body}');
-      }
+      return await _getAllPages('/api/chw/patients/$chwId', 'patients');
     } catch (e) {
       throw Exception('Error fetching CHW patients: $e');
     }
@@ -293,19 +299,8 @@ class ApiService {
     bool unreadOnly = false,
   }) async {
     try {
-      final response = await http
-          .get(
-            Uri.parse('$baseUrl/api/notifications/$chwId?unread_only=$unreadOnly'),
-            headers: {'Accept': 'application/json'},
-          )
-          .timeout(timeoutDuration);
-
-      if (response.statusCode == 200) {
-        final data = jsonDecode(response.body);
-        return List<Map<String, dynamic>>.from(data['notifications'] ?? []);
-      } else {
-        throw Exception('Failed to fetch notifications: ${response.body}');
-      }
+      return await _getAllPages('/api/notifications/$chwId', 'notifications',
+          query: {'unread_only': '$unreadOnly'});
     } catch (e) {
       throw Exception('Error fetching notifications: $e');
     }